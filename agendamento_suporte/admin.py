@@ -2,6 +2,7 @@ import datetime
 from datetime import timedelta
 from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
 from django.conf import settings
 from agendamento_suporte.models import (
     AgendamentoSuporte,
@@ -9,7 +10,7 @@ from agendamento_suporte.models import (
     DiaSemana,
     IntervaloHoras,
 )
-from agendamento_suporte.emails import envia_email_alerta_novo_agendamento
+from agendamento_suporte.services import salvar_agendamento
 import nested_admin
 
 
@@ -46,6 +47,21 @@ class AgendamentoSuporteForm(forms.ModelForm):
                 "%H:%M"
             )
 
+    def clean(self):
+        # O horário escolhido vem do select montado pelo select_horas.js; ele
+        # entra no cleaned_data para que a restrição única (data, hora) seja
+        # validada aqui e a colisão volte como erro do formulário.
+        cleaned_data = super().clean()
+        hora = self.data.get("select_hora_agendada")
+        if hora:
+            try:
+                cleaned_data["hora_agendada"] = datetime.datetime.strptime(
+                    hora, "%H:%M"
+                ).time()
+            except ValueError:
+                self.add_error("hora_agendada", "Horário inválido.")
+        return cleaned_data
+
 
 class AgendamentoSuporteAdmin(admin.ModelAdmin):
     model = AgendamentoSuporte
@@ -69,22 +85,20 @@ class AgendamentoSuporteAdmin(admin.ModelAdmin):
             return AgendamentoSuporte.objects.filter(agendado_por=request.user)
         return AgendamentoSuporte.objects.all()
 
-    def get_value_of_custom_field(self, request):
-        time_str = request.POST.get("select_hora_agendada")
-        time_date = datetime.datetime.strptime(time_str, "%H:%M")
-        return time_date
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except ValidationError:
+            # Outro usuário reservou o horário entre a validação e a gravação
+            # (a transação da view já foi desfeita). Na nova execução a
+            # validação do formulário encontra o horário ocupado e o
+            # formulário volta com o erro, sem registrar a inclusão.
+            return super().changeform_view(request, object_id, form_url, extra_context)
 
     def save_model(self, request, obj, form, change):
         # TODO trabalhar cenário em que usuário tenta agendar uma segunda reunião, sendo que ainda existe uma futura.
         # possibilidades: Pedir permissão para substituir | Bloquear usuário de marcar
-        time_date = self.get_value_of_custom_field(request)
-        obj.hora_agendada = time_date
-        if obj.id is None:
-            obj.agendado_por = request.user
-            envia_email_alerta_novo_agendamento()
-            super().save_model(request, obj, form, change)
-        else:
-            super().save_model(request, obj, form, change)
+        salvar_agendamento(obj, request.user)
 
 
 class IntervaloHorasInline(nested_admin.NestedStackedInline):
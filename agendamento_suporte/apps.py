@@ -5,3 +5,6 @@ class AgendamentoSuporteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agendamento_suporte'
     verbose_name = 'Suporte'
+
+    def ready(self):
+        from . import signals
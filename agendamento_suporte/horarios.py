@@ -0,0 +1,136 @@
+"""
+Cálculo dos horários disponíveis da agenda de suporte.
+
+A grade semanal (horários de cada dia da semana, compilados dos
+IntervaloHoras) fica em cache até a configuração da agenda mudar
+(TAG_AGENDA_CONFIGURACAO), então o cálculo de um período só consulta os
+agendamentos, numa única consulta (índice da restrição
+agendamento_data_hora_unico); os horários livres são a diferença entre os
+dois conjuntos de `time`. O resultado por período fica em cache até o
+próximo agendamento (TAG_AGENDA_SUPORTE) ou mudança na agenda; o corte dos
+horários que já passaram é feito depois do cache.
+
+Com locmem nem a grade nem os horários por período ficam em cache: a
+invalidação feita no worker que gravou não chega aos outros, que continuariam
+oferecendo horários já reservados ou fora da agenda.
+"""
+
+import datetime
+
+from agendamento_suporte.constants import (
+    FRIDAY,
+    MONDAY,
+    SATURDAY,
+    SUNDAY,
+    THURSDAY,
+    TUESDAY,
+    WEDNESDAY,
+)
+from dados_comuns.cache import (
+    TAG_AGENDA_CONFIGURACAO,
+    TAG_AGENDA_SUPORTE,
+    compartilhado,
+    obter_ou_calcular,
+)
+
+INCREMENTO = datetime.timedelta(minutes=30)
+DIAS_DA_SEMANA = [MONDAY, TUESDAY, WEDNESDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY]
+PERIODO_MAXIMO_DIAS = 31
+
+
+def horarios_do_intervalo(inicio, fim, incremento=INCREMENTO):
+    """Horários de `inicio` a `fim` (inclusive) a cada `incremento`."""
+    atual = datetime.datetime.combine(datetime.date.min, inicio)
+    limite = datetime.datetime.combine(datetime.date.min, fim)
+    horarios = []
+    while atual <= limite:
+        horarios.append(atual.time())
+        atual += incremento
+    return horarios
+
+
+def horarios_livres(grade, ocupados, data, agora):
+    """Horários da `grade` não `ocupados`, sem os que já passaram em `agora`."""
+    if data < agora.date():
+        return []
+    livres = set(grade) - set(ocupados)
+    if data == agora.date():
+        livres = {horario for horario in livres if horario > agora.time()}
+    return sorted(livres)
+
+
+def dias_do_periodo(data_inicio, data_fim):
+    return [
+        data_inicio + datetime.timedelta(days=i)
+        for i in range((data_fim - data_inicio).days + 1)
+    ]
+
+
+def compilar_grade(intervalos):
+    """{dia_semana: frozenset(time)} a partir de (dia_semana, inicio, fim)."""
+    grade = {}
+    for dia_semana, inicio, fim in intervalos:
+        grade.setdefault(dia_semana, set()).update(horarios_do_intervalo(inicio, fim))
+    return {dia_semana: frozenset(horarios) for dia_semana, horarios in grade.items()}
+
+
+def grade_semanal():
+    """Grade da agenda configurada, em cache compartilhado até a próxima alteração."""
+    from agendamento_suporte.models import IntervaloHoras
+
+    def calcular():
+        intervalos = IntervaloHoras.objects.filter(agenda__agenda__isnull=False)
+        return compilar_grade(
+            intervalos.values_list("agenda__dia_semana", "hora_inicio", "hora_fim")
+        )
+
+    if not compartilhado():
+        return calcular()
+    return obter_ou_calcular(
+        "agenda_grade_semanal", [], calcular, tags=[TAG_AGENDA_CONFIGURACAO]
+    )
+
+
+def _ocupados_por_data(data_inicio, data_fim):
+    from agendamento_suporte.models import AgendamentoSuporte
+
+    ocupados = {}
+    for data, hora in AgendamentoSuporte.objects.filter(
+        data_agendada__range=(data_inicio, data_fim)
+    ).values_list("data_agendada", "hora_agendada"):
+        ocupados.setdefault(data, set()).add(hora)
+    return ocupados
+
+
+def _disponiveis_sem_corte(data_inicio, data_fim):
+    grades = grade_semanal()
+    ocupados = _ocupados_por_data(data_inicio, data_fim)
+    return {
+        data: sorted(
+            grades.get(DIAS_DA_SEMANA[data.weekday()], set())
+            - ocupados.get(data, set())
+        )
+        for data in dias_do_periodo(data_inicio, data_fim)
+    }
+
+
+def horarios_disponiveis(data_inicio, data_fim=None, agora=None):
+    """
+    {data: [time, ...]} com os horários livres de cada dia do período
+    (só a consulta dos agendamentos, ou nenhuma com o cache válido).
+    """
+    data_fim = data_fim or data_inicio
+    agora = agora or datetime.datetime.now()
+    if compartilhado():
+        disponiveis = obter_ou_calcular(
+            "agenda_horarios_disponiveis",
+            [data_inicio.isoformat(), data_fim.isoformat()],
+            lambda: _disponiveis_sem_corte(data_inicio, data_fim),
+            tags=[TAG_AGENDA_SUPORTE, TAG_AGENDA_CONFIGURACAO],
+        )
+    else:
+        disponiveis = _disponiveis_sem_corte(data_inicio, data_fim)
+    return {
+        data: horarios_livres(horarios, (), data, agora)
+        for data, horarios in disponiveis.items()
+    }
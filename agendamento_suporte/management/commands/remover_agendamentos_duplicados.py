@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from agendamento_suporte.models import AgendamentoSuporte
+
+
+class Command(BaseCommand):
+    help = '''Lista os agendamentos de suporte no mesmo horário (data e hora), que
+impedem a migração 0003 de criar a restrição única. Com --remover, mantém o
+agendamento mais antigo de cada horário e exclui os demais.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--remover', action='store_true')
+
+    def handle(self, *args, **options):
+        duplicados = (
+            AgendamentoSuporte.objects.values('data_agendada', 'hora_agendada')
+            .annotate(total=Count('id'))
+            .filter(total__gt=1)
+            .order_by('data_agendada', 'hora_agendada')
+        )
+        excluidos = 0
+        with transaction.atomic():
+            for item in duplicados:
+                agendamentos = list(
+                    AgendamentoSuporte.objects.filter(
+                        data_agendada=item['data_agendada'],
+                        hora_agendada=item['hora_agendada'],
+                    ).order_by('id')
+                )
+                mantido, *demais = agendamentos
+                self.stdout.write(
+                    f"{item['data_agendada']} {item['hora_agendada']}: mantém {mantido.id}"
+                    f" ({mantido.agendado_por_id}), duplicados "
+                    + ', '.join(f'{a.id} ({a.agendado_por_id})' for a in demais)
+                )
+                if options['remover']:
+                    excluidos += AgendamentoSuporte.objects.filter(
+                        id__in=[a.id for a in demais]
+                    ).delete()[0]
+
+        if not options['remover']:
+            self.stdout.write('Nada foi excluído; use --remover para excluir os duplicados.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{excluidos} agendamento(s) excluído(s).'))
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento_suporte', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agendamentosuporte',
+            index=models.Index(fields=['data_agendada', 'hora_agendada'], name='agendamento_data_hora_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verifica_agendamentos_duplicados(apps, schema_editor):
+    # A restrição não pode ser criada com horários repetidos. Os agendamentos
+    # não são apagados aqui: resolva-os antes com o comando
+    # remover_agendamentos_duplicados (ou manualmente) e rode o migrate de novo.
+    AgendamentoSuporte = apps.get_model('agendamento_suporte', 'AgendamentoSuporte')
+    duplicados = (
+        AgendamentoSuporte.objects.values('data_agendada', 'hora_agendada')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .order_by('data_agendada', 'hora_agendada')
+    )
+    conflitos = []
+    for item in duplicados:
+        ids = list(
+            AgendamentoSuporte.objects.filter(
+                data_agendada=item['data_agendada'], hora_agendada=item['hora_agendada']
+            )
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+        conflitos.append(f"{item['data_agendada']} {item['hora_agendada']}: ids {ids}")
+    if conflitos:
+        raise RuntimeError(
+            "Há agendamentos de suporte no mesmo horário; a restrição única não pode "
+            "ser criada. Resolva-os (python manage.py remover_agendamentos_duplicados) "
+            "e rode o migrate novamente:\n" + "\n".join(conflitos)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agendamento_suporte', '0002_agendamentosuporte_agendamento_data_hora_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(verifica_agendamentos_duplicados, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='agendamentosuporte',
+            name='agendamento_data_hora_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='agendamentosuporte',
+            constraint=models.UniqueConstraint(fields=('data_agendada', 'hora_agendada'), name='agendamento_data_hora_unico'),
+        ),
+    ]
@@ -87,6 +87,11 @@ class AgendamentoSuporte(models.Model):
     class Meta:
         verbose_name = 'agendamento de suporte'
         verbose_name_plural = 'agendamentos de suporte'
+        # Um agendamento por horário; o índice da restrição também atende a
+        # leitura dos agendamentos do período (horarios.py).
+        constraints = [
+            models.UniqueConstraint(fields=['data_agendada', 'hora_agendada'], name='agendamento_data_hora_unico'),
+        ]
 
     def save(self, *args, **kwargs):
         self.updated_at = datetime.now()
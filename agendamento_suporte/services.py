@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from agendamento_suporte.emails import envia_email_alerta_novo_agendamento
+from agendamento_suporte.models import AgendamentoSuporte
+
+MENSAGEM_HORARIO_OCUPADO = "Este horário já foi reservado. Escolha outro horário."
+
+
+def salvar_agendamento(agendamento, usuario):
+    """
+    Grava o agendamento de forma otimista: a restrição única
+    (data_agendada, hora_agendada) decide quem fica com o horário, sem
+    consulta prévia nem lock; a colisão vira ValidationError.
+    """
+    novo = agendamento.pk is None
+    if novo:
+        agendamento.agendado_por = usuario
+    try:
+        with transaction.atomic():
+            agendamento.save()
+    except IntegrityError:
+        ocupado = (
+            AgendamentoSuporte.objects.filter(
+                data_agendada=agendamento.data_agendada,
+                hora_agendada=agendamento.hora_agendada,
+            )
+            .exclude(pk=agendamento.pk)
+            .exists()
+        )
+        if not ocupado:
+            raise
+        raise ValidationError(MENSAGEM_HORARIO_OCUPADO)
+
+    if novo:
+        envia_email_alerta_novo_agendamento()
+    return agendamento
@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from agendamento_suporte.models import (
+    AgendamentoSuporte,
+    ConfigAgendaSuporte,
+    DiaSemana,
+    IntervaloHoras,
+)
+from dados_comuns.cache import TAG_AGENDA_CONFIGURACAO, TAG_AGENDA_SUPORTE, invalidar_apos_commit
+
+
+@receiver(post_save, sender=AgendamentoSuporte)
+@receiver(post_delete, sender=AgendamentoSuporte)
+def invalida_cache_agenda_suporte(sender, instance, **kwargs):
+    invalidar_apos_commit(TAG_AGENDA_SUPORTE)
+
+
+# Também cobre os inlines aninhados do admin, que gravam e excluem objeto a
+# objeto. A exclusão da agenda solta os dias com UPDATE (SET_NULL), sem
+# signals dos dias, por isso ConfigAgendaSuporte também invalida.
+@receiver(post_save, sender=ConfigAgendaSuporte)
+@receiver(post_delete, sender=ConfigAgendaSuporte)
+@receiver(post_save, sender=DiaSemana)
+@receiver(post_delete, sender=DiaSemana)
+@receiver(post_save, sender=IntervaloHoras)
+@receiver(post_delete, sender=IntervaloHoras)
+def invalida_cache_configuracao_agenda(sender, instance, **kwargs):
+    invalidar_apos_commit(TAG_AGENDA_CONFIGURACAO)
@@ -1,3 +1,245 @@
-from django.test import TestCase
+import datetime
+import threading
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+
+from agendamento_suporte.constants import MONDAY, TUESDAY
+from agendamento_suporte.horarios import (
+    compilar_grade,
+    dias_do_periodo,
+    horarios_disponiveis,
+    horarios_do_intervalo,
+    horarios_livres,
+)
+from dados_comuns.cache import estatisticas
+
+
+class HorariosTest(SimpleTestCase):
+    def test_horarios_do_intervalo_inclui_o_fim(self):
+        self.assertEqual(
+            horarios_do_intervalo(datetime.time(9), datetime.time(10)),
+            [datetime.time(9), datetime.time(9, 30), datetime.time(10)],
+        )
+
+    def test_horarios_livres_remove_ocupados_e_passados(self):
+        grade = horarios_do_intervalo(datetime.time(9), datetime.time(11))
+        hoje = datetime.date(2024, 5, 6)
+        agora = datetime.datetime.combine(hoje, datetime.time(9, 15))
+
+        self.assertEqual(
+            horarios_livres(grade, {datetime.time(10)}, hoje, agora),
+            [datetime.time(9, 30), datetime.time(10, 30), datetime.time(11)],
+        )
+        self.assertEqual(
+            horarios_livres(grade, (), hoje + datetime.timedelta(days=1), agora), grade
+        )
+        self.assertEqual(
+            horarios_livres(grade, (), hoje - datetime.timedelta(days=1), agora), []
+        )
+
+    def test_compilar_grade_une_intervalos_do_dia(self):
+        grade = compilar_grade(
+            [
+                (MONDAY, datetime.time(9), datetime.time(9, 30)),
+                (MONDAY, datetime.time(9, 30), datetime.time(10)),
+                (TUESDAY, datetime.time(14), datetime.time(14)),
+            ]
+        )
+
+        self.assertEqual(
+            grade,
+            {
+                MONDAY: frozenset(
+                    [datetime.time(9), datetime.time(9, 30), datetime.time(10)]
+                ),
+                TUESDAY: frozenset([datetime.time(14)]),
+            },
+        )
+
+    def test_dias_do_periodo(self):
+        inicio = datetime.date(2024, 5, 6)
+        self.assertEqual(
+            dias_do_periodo(inicio, inicio + datetime.timedelta(days=6))[-1],
+            datetime.date(2024, 5, 12),
+        )
+
+
+@skipUnless(apps.is_installed("agendamento_suporte"), "Módulo de suporte desabilitado")
+@skipIf(connection.vendor == "sqlite", "SQLite serializa as escritas; rode com PostgreSQL")
+class AgendamentoConcorrenteTest(TransactionTestCase):
+    """Teste de carga: vários usuários disputando o mesmo horário ao mesmo tempo."""
+
+    QUANTIDADE = 20
+
+    def test_apenas_um_agendamento_por_horario(self):
+        from agendamento_suporte.models import AgendamentoSuporte
+        from agendamento_suporte.services import salvar_agendamento
+        from usuario.models import Usuario
+
+        usuario = Usuario.objects.create_user(username="concorrente", password="x")
+        data, hora = datetime.date(2031, 1, 6), datetime.time(9, 30)
+        barreira = threading.Barrier(self.QUANTIDADE)
+        resultados = []
+
+        def agendar():
+            try:
+                barreira.wait()
+                salvar_agendamento(
+                    AgendamentoSuporte(data_agendada=data, hora_agendada=hora), usuario
+                )
+                resultados.append(True)
+            except ValidationError:
+                resultados.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=agendar) for _ in range(self.QUANTIDADE)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(resultados), self.QUANTIDADE)
+        self.assertEqual(resultados.count(True), 1)
+        self.assertEqual(
+            AgendamentoSuporte.objects.filter(data_agendada=data, hora_agendada=hora).count(),
+            1,
+        )
+
+
+@skipUnless(apps.is_installed("agendamento_suporte"), "Módulo de suporte desabilitado")
+class HorariosDisponiveisLocmemTest(TestCase):
+    def setUp(self):
+        from agendamento_suporte.models import ConfigAgendaSuporte, DiaSemana, IntervaloHoras
+
+        agenda = ConfigAgendaSuporte.objects.create(nome="Agenda")
+        self.segunda = DiaSemana.objects.create(agenda=agenda, dia_semana=MONDAY)
+        IntervaloHoras.objects.create(
+            agenda=self.segunda,
+            hora_inicio=datetime.time(9, 0),
+            hora_fim=datetime.time(10, 0),
+        )
+        self.data = datetime.date(2031, 1, 6)
+        self.agora = datetime.datetime(2031, 1, 1)
+
+    def test_reflete_alteracoes_sem_depender_da_invalidacao(self):
+        # Sem executar os on_commit: com locmem a invalidação não chegaria
+        # aos outros workers, então o cálculo não pode vir do cache.
+        from agendamento_suporte.models import AgendamentoSuporte, IntervaloHoras
+        from usuario.models import Usuario
+
+        self.assertEqual(
+            horarios_disponiveis(self.data, agora=self.agora)[self.data],
+            [datetime.time(9, 0), datetime.time(9, 30), datetime.time(10, 0)],
+        )
+
+        AgendamentoSuporte.objects.create(
+            agendado_por=Usuario.objects.create_user(username="agenda_locmem", password="x"),
+            data_agendada=self.data,
+            hora_agendada=datetime.time(9, 30),
+        )
+        IntervaloHoras.objects.create(
+            agenda=self.segunda,
+            hora_inicio=datetime.time(14, 0),
+            hora_fim=datetime.time(14, 0),
+        )
+
+        self.assertEqual(
+            horarios_disponiveis(self.data, agora=self.agora)[self.data],
+            [datetime.time(9, 0), datetime.time(10, 0), datetime.time(14, 0)],
+        )
+        self.assertNotIn("agenda_horarios_disponiveis", estatisticas())
+        self.assertNotIn("agenda_grade_semanal", estatisticas())
+
+
+@skipUnless(apps.is_installed("agendamento_suporte"), "Módulo de suporte desabilitado")
+class AgendamentoAdminTest(TestCase):
+    def setUp(self):
+        from django.contrib.admin.sites import AdminSite
+
+        from agendamento_suporte.admin import AgendamentoSuporteAdmin
+        from agendamento_suporte.models import AgendamentoSuporte
+        from usuario.models import Usuario
+
+        self.usuario = Usuario.objects.create_user(username="agenda_admin", password="x")
+        self.model_admin = AgendamentoSuporteAdmin(AgendamentoSuporte, AdminSite())
+        self.request = RequestFactory().post("/")
+        self.request.user = self.usuario
+        AgendamentoSuporte.objects.create(
+            agendado_por=self.usuario,
+            data_agendada=datetime.date(2031, 1, 6),
+            hora_agendada=datetime.time(9, 30),
+        )
+
+    def _form(self, hora):
+        form_class = self.model_admin.get_form(self.request)
+        return form_class(
+            data={
+                "data_agendada": "2031-01-06",
+                "hora_agendada": "10:00",
+                "select_hora_agendada": hora,
+                "url": "http://localhost/api",
+            }
+        )
+
+    def test_horario_ocupado_e_erro_do_formulario(self):
+        form = self._form("09:30")
+
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.non_field_errors())
+
+    def test_horario_escolhido_no_select_e_o_gravado(self):
+        form = self._form("11:00")
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.instance.hora_agendada, datetime.time(11, 0))
+
+    def test_integrity_error_na_gravacao_reexibe_o_formulario_com_o_erro(self):
+        from contextlib import nullcontext
+
+        from django.contrib.admin.models import LogEntry
+
+        from agendamento_suporte import admin as agendamento_admin
+        from agendamento_suporte.models import AgendamentoSuporte
+        from usuario.models import Usuario
+
+        outro = Usuario.objects.create_user(username="agenda_outro", password="x")
+        request = RequestFactory().post("/", self._form("11:00").data)
+        request.user = Usuario.objects.create_superuser(username="agenda_super", password="x")
+        request._dont_enforce_csrf_checks = True
+        salvar = agendamento_admin.salvar_agendamento
+
+        def reservado_apos_a_validacao(agendamento, usuario):
+            # Outro usuário grava o mesmo horário depois que o formulário foi
+            # validado; a gravação esbarra na restrição única do banco.
+            if not AgendamentoSuporte.objects.filter(agendado_por=outro).exists():
+                AgendamentoSuporte.objects.create(
+                    agendado_por=outro,
+                    data_agendada=agendamento.data_agendada,
+                    hora_agendada=agendamento.hora_agendada,
+                )
+            return salvar(agendamento, usuario)
+
+        # Sem a transação da view a reserva do outro usuário sobrevive à
+        # colisão, como se tivesse sido confirmada por outra requisição.
+        with mock.patch("django.contrib.admin.options.transaction") as transacao, \
+                mock.patch.object(
+                    agendamento_admin, "salvar_agendamento",
+                    side_effect=reservado_apos_a_validacao,
+                ) as salvar_agendamento:
+            transacao.atomic.return_value = nullcontext()
+            resposta = self.model_admin.changeform_view(request)
+
+        self.assertEqual(salvar_agendamento.call_count, 1)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.context_data["adminform"].form.non_field_errors())
+        self.assertFalse(LogEntry.objects.exists())
+        self.assertQuerysetEqual(
+            AgendamentoSuporte.objects.filter(hora_agendada=datetime.time(11, 0)),
+            [outro.pk],
+            transform=lambda agendamento: agendamento.agendado_por_id,
+        )
@@ -5,4 +5,5 @@ app_name = "agenda"
 
 urlpatterns = [
     path('horarios_disponiveis/', ConfigAgendaSuporteViewSet.as_view({'get': 'retorna_horarios_disponiveis_por_dia'})),
+    path('horarios_disponiveis/periodo/', ConfigAgendaSuporteViewSet.as_view({'get': 'retorna_horarios_disponiveis_por_periodo'})),
 ]
@@ -1,35 +1,39 @@
 import datetime
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework import viewsets
-from agendamento_suporte.models import ConfigAgendaSuporte, AgendamentoSuporte
-from agendamento_suporte.utils import gerar_horarios, dia_da_semana
+from agendamento_suporte.horarios import PERIODO_MAXIMO_DIAS, horarios_disponiveis
+
+
+def _data(request, parametro, padrao=None):
+    valor = request.GET.get(parametro)
+    if not valor:
+        if padrao is None:
+            raise ValidationError({parametro: 'Informe a data (AAAA-MM-DD).'})
+        return padrao
+    try:
+        return datetime.datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError({parametro: 'Data inválida (AAAA-MM-DD).'})
+
+
+def _formatar(horarios):
+    return [horario.strftime('%H:%M') for horario in horarios]
 
 
 class ConfigAgendaSuporteViewSet(viewsets.ViewSet):
 
     def retorna_horarios_disponiveis_por_dia(self, request):
-        data = request.GET.get('data')
-
-        agenda = ConfigAgendaSuporte.objects.first()
-        dia = dia_da_semana(data)
-
-        try:
-            dia_semana = agenda.diasemana_set.get(dia_semana=dia)
-        except Exception as e:
-            dia_semana = None
-
-        horarios = []
-
-        if dia_semana:
-            intervalos = dia_semana.intervalohoras_set.all()
-            for item in intervalos:
-                _horarios = gerar_horarios(item.hora_inicio, item.hora_fim)
-                for _hr in _horarios:
-                    horario_ja_esta_agendado = AgendamentoSuporte.objects.filter(data_agendada=data, hora_agendada=_hr).exists()
-                    horario_valido = datetime.datetime.now().time() < datetime.datetime.strptime(_hr, '%H:%M').time()
-                    if not horario_ja_esta_agendado and horario_valido:
-                        horarios.append(_hr)
-
-        horarios_ordenados = sorted(horarios, key=lambda x: datetime.datetime.strptime(x, '%H:%M'))
-        return Response(horarios_ordenados)
+        data = _data(request, 'data')
+        return Response(_formatar(horarios_disponiveis(data)[data]))
+
+    def retorna_horarios_disponiveis_por_periodo(self, request):
+        '''Horários livres de data_inicio até data_fim (padrão: 7 dias) numa chamada.'''
+        data_inicio = _data(request, 'data_inicio')
+        data_fim = _data(request, 'data_fim', data_inicio + datetime.timedelta(days=6))
+        if data_fim < data_inicio or (data_fim - data_inicio).days >= PERIODO_MAXIMO_DIAS:
+            raise ValidationError(
+                {'data_fim': f'Informe um período de até {PERIODO_MAXIMO_DIAS} dias.'}
+            )
+        disponiveis = horarios_disponiveis(data_inicio, data_fim)
+        return Response({data.isoformat(): _formatar(horarios) for data, horarios in disponiveis.items()})
@@ -1,7 +1,13 @@
 from django.contrib import admin
-from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    ResumoInventarioUnidade,
+)
 from .admins.bem_patrimonial import BemPatrimonialAdmin
 from .admins.movimentacao_bem_patrimonial import MovimentacaoBemPatrimonialAdmin
+from .admins.resumo_inventario import ResumoInventarioUnidadeAdmin
 
 admin.site.register(BemPatrimonial, BemPatrimonialAdmin)
 admin.site.register(MovimentacaoBemPatrimonial, MovimentacaoBemPatrimonialAdmin)
+admin.site.register(ResumoInventarioUnidade, ResumoInventarioUnidadeAdmin)
@@ -2,17 +2,45 @@ from django.contrib import admin, messages
 from django.db import transaction
 from django.http import HttpResponse
 import re, csv
+import logging
 from django.template.response import TemplateResponse
+from django.conf import settings
 from django.contrib.admin import helpers
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.utils import timezone
 from collections import Counter
+from types import SimpleNamespace
+
+from dados_comuns.context import get_user
+from dados_comuns.db_router import leitura_replica
+from dados_comuns.models import HistoricoGeral
+from dados_comuns.utils import dict_changes, iterar_em_lotes
+
+logger = logging.getLogger(__name__)
 
 
 NEW_PATTERN_STRICT = re.compile(r"^\d{3}\.\d{9}-\d$")
 ALPHA_RE = re.compile(r"[A-Za-zÁ-ú]")
 
+CAMPOS_ATUALIZADOS_EXTRACAO = [
+    "numero_patrimonial",
+    "numero_formato_antigo",
+    "sem_numeracao",
+    "nome",
+    "atualizado_em",
+]
+CAMPOS_AUDITADOS_EXTRACAO = [
+    "numero_patrimonial",
+    "numero_formato_antigo",
+    "sem_numeracao",
+    "nome",
+]
+# FKs e arquivo não são alterados pela extração; validá-los custaria uma query por bem.
+CAMPOS_SEM_VALIDACAO_EXTRACAO = ["unidade_administrativa", "criado_por", "foto"]
+
 
 def _digits_only(s: str) -> str:
     import re
@@ -138,9 +166,14 @@ def _extract(nome: str, descricao: str):
 @admin.action(
     description="Simular extração do Número Patrimonial → CSV (TODOS os bens)"
 )
+@leitura_replica()
 def simular_extracao_numero(modeladmin, request, queryset):
 
-    qs = modeladmin.model.objects.filter(numero_patrimonial__isnull=False).iterator()
+    qs = iterar_em_lotes(
+        modeladmin.model.objects.filter(numero_patrimonial__isnull=False).only(
+            "id", "nome", "descricao", "numero_patrimonial"
+        )
+    )
 
     response = HttpResponse(content_type="text/csv; charset=utf-8")
     response["Content-Disposition"] = 'attachment; filename="simulacao_135782_all.csv"'
@@ -323,14 +356,13 @@ def aplicar_extracao_numero(modeladmin, request, queryset):
         )
         return TemplateResponse(request, "admin/confirm_action.html", context)
 
-    atualizados, erros, ignorados_duplicados = 0, 0, 0
-
     posted_ids = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
     if not posted_ids:
         messages.warning(
             request, "Nenhum item foi enviado na confirmação. Ação cancelada."
         )
         return None
+    posted_ids = [int(pk) for pk in posted_ids]
 
     existentes = set(
         Model.objects.exclude(numero_patrimonial__isnull=True)
@@ -338,18 +370,16 @@ def aplicar_extracao_numero(modeladmin, request, queryset):
         .values_list("numero_patrimonial", flat=True)
     )
 
-    objs_post = list(
-        Model.objects.filter(pk__in=posted_ids).only(
-            "id", "nome", "descricao", "numero_patrimonial"
-        )
+    objs_post = Model.objects.filter(pk__in=posted_ids).values_list(
+        "id", "nome", "descricao"
     )
     propostos_post = {}
     numeros_post = []
-    for bem in objs_post:
+    for pk, nome, descricao in objs_post:
         numero, cls, nome_sug, fonte, pos, raw, aplicar_auto = _extract(
-            bem.nome, getattr(bem, "descricao", "")
+            nome, descricao
         )
-        propostos_post[bem.pk] = (numero, cls, aplicar_auto, nome_sug)
+        propostos_post[pk] = (numero, cls, aplicar_auto, nome_sug)
         if cls in ("PADRAO_ATUAL", "PADRAO_ANTERIOR") and numero:
             numeros_post.append(numero)
 
@@ -362,66 +392,193 @@ def aplicar_extracao_numero(modeladmin, request, queryset):
         and (numero in existentes or contagem_post.get(numero, 0) > 1)
     }
 
-    ids_to_process = [pk for pk in posted_ids if pk not in dup_ids_runtime]
+    ids_to_process = sorted(
+        pk for pk in posted_ids if pk in propostos_post and pk not in dup_ids_runtime
+    )
     ignorados_duplicados = len(posted_ids) - len(ids_to_process)
 
-    with transaction.atomic():
-        qs = (
-            Model.objects.filter(pk__in=ids_to_process)
-            .select_for_update(skip_locked=True)
-            .order_by("pk")
+    resultado = aplicar_extracao_em_lotes(
+        Model, ids_to_process, propostos_post, existentes
+    )
+
+    messages.info(
+        request,
+        f"Extração aplicada em {resultado['lotes']} lote(s). "
+        f"Atualizados: {resultado['atualizados']}. Erros: {resultado['erros']}. "
+        f"Ignorados (duplicados): {ignorados_duplicados}. "
+        f"Ignorados (em edição por outro usuário): {resultado['bloqueados']}.",
+    )
+    return None
+
+
+def _tamanho_lote():
+    return getattr(settings, "EXTRACAO_NUMERO_TAMANHO_LOTE", 500)
+
+
+def _gerar_sem_numero(pk, numeros_em_uso):
+    """Mesma regra de BemPatrimonial.save, usando o conjunto já carregado em memória."""
+    base_id = pk
+    while f"SEM-NUMERO-{base_id}" in numeros_em_uso:
+        base_id += 1
+    numero = f"SEM-NUMERO-{base_id}"
+    numeros_em_uso.add(numero)
+    return numero
+
+
+def _aplicar_proposta(bem, proposta, numeros_em_uso):
+    """
+    Aplica em memória a proposta de extração ao bem.
+    Retorna False quando não há nada a gravar para o bem.
+    """
+    numero, cls, aplicar_auto, nome_sug = proposta
+
+    if not aplicar_auto:
+        if cls != "SEM_NUMERO" and numero:
+            return False
+        bem.sem_numeracao = True
+    else:
+        if cls == "PADRAO_ATUAL":
+            bem.numero_patrimonial = numero
+            bem.numero_formato_antigo = False
+            bem.sem_numeracao = False
+        elif cls == "PADRAO_ANTERIOR":
+            bem.numero_patrimonial = numero
+            bem.numero_formato_antigo = True
+            bem.sem_numeracao = False
+        else:
+            bem.sem_numeracao = True
+
+        if nome_sug and nome_sug != bem.nome:
+            bem.nome = nome_sug
+
+    if bem.sem_numeracao and not bem.numero_patrimonial:
+        bem.numero_patrimonial = _gerar_sem_numero(bem.pk, numeros_em_uso)
+    return True
+
+
+def _historico_alteracoes(ct, bem, original, usuario, alterado_em):
+    changes = dict_changes(
+        original,
+        bem,
+        fields=CAMPOS_AUDITADOS_EXTRACAO,
+        ignore=bem.AUDIT_IGNORE_FIELDS,
+    )
+    return [
+        HistoricoGeral(
+            content_type=ct,
+            object_id=str(bem.pk),
+            campo=field,
+            valor_antigo=old,
+            valor_novo=new,
+            alterado_por=usuario,
+            alterado_em=alterado_em,
         )
+        for field, (old, new) in changes.items()
+    ]
+
 
-        for bem in qs:
+def _gravar_lote(Model, alterados, historico):
+    """
+    Grava o lote com um único UPDATE em massa. Se algum número colidir
+    (ex.: cadastrado por outro usuário após a pré-visualização), regrava
+    linha a linha para isolar apenas as linhas com erro.
+    """
+    try:
+        with transaction.atomic():
+            Model.objects.bulk_update(alterados, CAMPOS_ATUALIZADOS_EXTRACAO)
+            HistoricoGeral.objects.bulk_create(historico)
+        return len(alterados), 0
+    except IntegrityError:
+        pass
+
+    historico_por_bem = {}
+    for registro in historico:
+        historico_por_bem.setdefault(registro.object_id, []).append(registro)
+
+    atualizados, erros = 0, 0
+    for bem in alterados:
+        try:
             with transaction.atomic():
+                Model.objects.filter(pk=bem.pk).update(
+                    **{
+                        campo: getattr(bem, campo)
+                        for campo in CAMPOS_ATUALIZADOS_EXTRACAO
+                    }
+                )
+                HistoricoGeral.objects.bulk_create(
+                    historico_por_bem.get(str(bem.pk), [])
+                )
+            atualizados += 1
+        except IntegrityError:
+            erros += 1
+    return atualizados, erros
+
+
+def aplicar_extracao_em_lotes(
+    Model, ids, propostos, numeros_em_uso, tamanho_lote=None, progresso=None
+):
+    """
+    Fase de aplicação da extração, em lotes de `tamanho_lote` bens.
+    Cada lote roda em uma transação curta: um SELECT ... FOR UPDATE SKIP LOCKED,
+    um bulk_update e um bulk_create do histórico, sem passar por BemPatrimonial.save.
+    `progresso(processados, total)` é chamado ao fim de cada lote.
+    """
+    tamanho_lote = tamanho_lote or _tamanho_lote()
+    ct = ContentType.objects.get_for_model(Model)
+    usuario = get_user()
+    total = len(ids)
+    resultado = {"atualizados": 0, "erros": 0, "bloqueados": 0, "lotes": 0}
+
+    for inicio in range(0, total, tamanho_lote):
+        lote_ids = ids[inicio : inicio + tamanho_lote]
+
+        with transaction.atomic():
+            bens = list(
+                Model.objects.filter(pk__in=lote_ids)
+                .select_for_update(skip_locked=True)
+                .order_by("pk")
+            )
+            resultado["bloqueados"] += len(lote_ids) - len(bens)
+
+            agora = timezone.now()
+            alterados, historico = [], []
+            for bem in bens:
+                original = SimpleNamespace(
+                    **{c: getattr(bem, c) for c in CAMPOS_AUDITADOS_EXTRACAO}
+                )
+                proposta = propostos.get(bem.pk, (None, "SEM_NUMERO", False, None))
+                if not _aplicar_proposta(bem, proposta, numeros_em_uso):
+                    continue
                 try:
-                    numero, cls, aplicar_auto, nome_sug = propostos_post.get(
-                        bem.pk, (None, "SEM_NUMERO", False, None)
+                    bem.full_clean(
+                        exclude=CAMPOS_SEM_VALIDACAO_EXTRACAO, validate_unique=False
                     )
+                except ValidationError:
+                    resultado["erros"] += 1
+                    continue
+                bem.atualizado_em = agora
+                alterados.append(bem)
+                historico.extend(
+                    _historico_alteracoes(ct, bem, original, usuario, agora)
+                )
+
+            if alterados:
+                atualizados, erros = _gravar_lote(Model, alterados, historico)
+                resultado["atualizados"] += atualizados
+                resultado["erros"] += erros
+
+        resultado["lotes"] += 1
+        processados = min(inicio + tamanho_lote, total)
+        logger.info(
+            "Extração de número patrimonial: %s/%s bens processados "
+            "(atualizados=%s, erros=%s, bloqueados=%s)",
+            processados,
+            total,
+            resultado["atualizados"],
+            resultado["erros"],
+            resultado["bloqueados"],
+        )
+        if progresso:
+            progresso(processados, total)
 
-                    if not aplicar_auto:
-                        if cls == "SEM_NUMERO" or not numero:
-                            bem.sem_numeracao = True
-                            bem.full_clean()
-                            bem.save(update_fields=["sem_numeracao", "atualizado_em"])
-                            atualizados += 1
-                        continue
-
-                    if cls == "PADRAO_ATUAL":
-                        bem.numero_patrimonial = numero
-                        bem.numero_formato_antigo = False
-                        bem.sem_numeracao = False
-                    elif cls == "PADRAO_ANTERIOR":
-                        bem.numero_patrimonial = numero
-                        bem.numero_formato_antigo = True
-                        bem.sem_numeracao = False
-                    else:
-                        bem.sem_numeracao = True
-
-                    if nome_sug and nome_sug != bem.nome:
-                        bem.nome = nome_sug
-
-                    bem.full_clean()
-                    bem.save(
-                        update_fields=[
-                            "numero_patrimonial",
-                            "numero_formato_antigo",
-                            "sem_numeracao",
-                            "nome",
-                            "atualizado_em",
-                        ]
-                    )
-                    atualizados += 1
-
-                except (ValidationError, IntegrityError):
-                    transaction.set_rollback(True)
-                    erros += 1
-                except Exception:
-                    transaction.set_rollback(True)
-                    erros += 1
-
-    messages.info(
-        request,
-        f"Extração aplicada. Atualizados: {atualizados}. Erros: {erros}. Ignorados (duplicados): {ignorados_duplicados}.",
-    )
-    return None
+    return resultado
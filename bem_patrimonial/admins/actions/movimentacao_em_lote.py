@@ -0,0 +1,117 @@
+from collections import Counter
+
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from bem_patrimonial.admins.forms.movimentacao_em_lote_form import (
+    MovimentacaoEmLoteForm,
+)
+from bem_patrimonial.models import BemPatrimonial
+from bem_patrimonial.services import criar_movimentacoes_em_lote
+
+LIMITE_ITENS_MENSAGEM = 10
+
+
+def _resumo(itens):
+    texto = ", ".join(str(i) for i in itens[:LIMITE_ITENS_MENSAGEM])
+    if len(itens) > LIMITE_ITENS_MENSAGEM:
+        texto += f" e mais {len(itens) - LIMITE_ITENS_MENSAGEM}"
+    return texto
+
+
+def _bens_por_numero(numeros):
+    encontrados = dict(
+        BemPatrimonial.objects.filter(numero_patrimonial__in=numeros).values_list(
+            "numero_patrimonial", "pk"
+        )
+    )
+    nao_encontrados = [n for n in numeros if n not in encontrados]
+    return list(encontrados.values()), nao_encontrados
+
+
+@admin.action(description="Solicitar movimentação em lote")
+def solicitar_movimentacao_em_lote(modeladmin, request, queryset):
+    selecionados = list(queryset.values_list("pk", flat=True))
+
+    if "confirm" in request.POST:
+        form = MovimentacaoEmLoteForm(request.POST, request.FILES)
+        if form.is_valid() and not (
+            selecionados or form.cleaned_data["numeros_patrimoniais"]
+        ):
+            form.add_error(
+                None, "Selecione bens na lista ou informe os números patrimoniais."
+            )
+        if form.is_valid():
+            ids_numeros, nao_encontrados = _bens_por_numero(
+                form.cleaned_data["numeros_patrimoniais"]
+            )
+            ua_destino = form.cleaned_data["unidade_administrativa_destino"]
+            try:
+                resultado = criar_movimentacoes_em_lote(
+                    set(selecionados) | set(ids_numeros),
+                    ua_destino,
+                    request.user,
+                    observacao=form.cleaned_data["observacao"],
+                )
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
+                return None
+
+            criadas = resultado["movimentacoes"]
+            ignorados = resultado["ignorados"]
+            if criadas:
+                messages.success(
+                    request,
+                    f"{len(criadas)} movimentação(ões) criada(s) para '{ua_destino}'. "
+                    "Os bens foram bloqueados até o aceite.",
+                )
+            if ignorados:
+                motivos = Counter(motivo for _, motivo in ignorados)
+                messages.warning(
+                    request,
+                    f"{len(ignorados)} bem(ns) ignorado(s) — "
+                    + "; ".join(f"{m}: {q}" for m, q in motivos.items())
+                    + f". Bens: {_resumo([bem for bem, _ in ignorados])}.",
+                )
+            if nao_encontrados:
+                messages.warning(
+                    request,
+                    f"Números patrimoniais não encontrados: {_resumo(nao_encontrados)}.",
+                )
+            return None
+    else:
+        form = MovimentacaoEmLoteForm()
+
+    context = modeladmin.admin_site.each_context(request)
+    context.update(
+        {
+            "title": "Solicitar movimentação em lote",
+            "form": form,
+            "selected_ids": selecionados,
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "opts": modeladmin.model._meta,
+            "action": "solicitar_movimentacao_em_lote",
+        }
+    )
+    return TemplateResponse(request, "admin/movimentacao_em_lote.html", context)
+
+
+def movimentacao_em_lote_view(modeladmin, request):
+    """
+    A mesma tela, aberta pelo botão da lista de bens sem nenhum bem
+    selecionado: os bens vêm dos números digitados ou do arquivo.
+    """
+    if not request.user.has_perm("bem_patrimonial.add_movimentacaobempatrimonial"):
+        raise PermissionDenied
+    response = solicitar_movimentacao_em_lote(
+        modeladmin, request, BemPatrimonial.objects.none()
+    )
+    if response is None:
+        return HttpResponseRedirect(
+            reverse("admin:bem_patrimonial_bempatrimonial_changelist")
+        )
+    return response
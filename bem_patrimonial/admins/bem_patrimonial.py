@@ -3,13 +3,17 @@ from django.core.exceptions import ValidationError
 from django.db import IntegrityError, models
 from django.db.models import OuterRef, Subquery
 from django.http import HttpResponseRedirect
-from django.urls import reverse
+from django.urls import path, reverse
 from django.utils.html import format_html
 
 from bem_patrimonial.admins.actions.extracao_numeros import (
     aplicar_extracao_numero,
     simular_extracao_numero,
 )
+from bem_patrimonial.admins.actions.movimentacao_em_lote import (
+    movimentacao_em_lote_view,
+    solicitar_movimentacao_em_lote,
+)
 from bem_patrimonial.admins.forms.bem_patrimonial_form import BemPatrimonialAdminForm
 from bem_patrimonial.models import (
     BemPatrimonial,
@@ -25,15 +29,33 @@ from django.contrib.auth import get_user_model
 
 from django.contrib.contenttypes.admin import GenericTabularInline
 from django.db.models.functions import Cast
-from bem_patrimonial import constants
+from bem_patrimonial import constants, eventos, imagens
+from dados_comuns import metricas
+from dados_comuns.db_router import leitura_replica
 from dados_comuns.models import HistoricoGeral, UnidadeAdministrativa
 
 
+def _picture(urls, estilo):
+    """Miniatura em WebP com JPEG (ou o original, enquanto não processada) como alternativa."""
+    if not urls["webp"]:
+        return format_html('<img src="{}" style="{}" />', urls["jpg"], estilo)
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp" />'
+        '<img src="{}" style="{}" loading="lazy" /></picture>',
+        urls["webp"],
+        urls["jpg"],
+        estilo,
+    )
+
+
 class StatusBemPatrimonialInline(admin.TabularInline):
     model = StatusBemPatrimonial
     extra = 0
     readonly_fields = ("atualizado_por", "atualizado_em")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("atualizado_por")
+
 
 class HistoricoGeralInline(GenericTabularInline):
     model = HistoricoGeral
@@ -52,6 +74,12 @@ class HistoricoGeralInline(GenericTabularInline):
     def has_view_or_change_permission(self, request, obj=None):
         return True
 
+    def get_queryset(self, request):
+        # content_type é lido no __str__ de cada linha do inline. Lido do
+        # banco principal: o GET que segue o redirect de um save é outra
+        # requisição, e a réplica atrasada não mostraria a alteração recém-feita.
+        return super().get_queryset(request).select_related("alterado_por", "content_type")
+
 
 class BemPatrimonialResource(resources.ModelResource):
     class Meta:
@@ -98,6 +126,8 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
     )
     search_help_text = "Pesquise por número patrimonial, nome, descrição, marca, modelo, localização ou número de processo."
     resource_class = BemPatrimonialResource
+    # Base da lista do import-export: acrescenta o botão de movimentação em lote.
+    change_list_template = "admin/bem_patrimonial_change_list.html"
 
     list_filter = (
         "status",
@@ -111,7 +141,11 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
         "criado_por",
         "criado_em",
     )
-    actions = [simular_extracao_numero, aplicar_extracao_numero]
+    actions = [
+        simular_extracao_numero,
+        aplicar_extracao_numero,
+        solicitar_movimentacao_em_lote,
+    ]
 
     class Media:
         js = ("admin/bem_patrimonial.js",)
@@ -121,8 +155,24 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
         actions = super().get_actions(request)
         if not request.user.is_gestor_patrimonio:
             actions.pop("aplicar_extracao_numero", None)
+        if not request.user.has_perm("bem_patrimonial.add_movimentacaobempatrimonial"):
+            actions.pop("solicitar_movimentacao_em_lote", None)
         return actions
 
+    def get_urls(self):
+        # Movimentação em lote sem seleção (só números digitados ou arquivo);
+        # a ação do admin exige ao menos um bem selecionado na lista.
+        return [
+            path(
+                "movimentacao-em-lote/",
+                self.admin_site.admin_view(self.movimentacao_em_lote),
+                name="bem_patrimonial_bempatrimonial_movimentacao_em_lote",
+            ),
+        ] + super().get_urls()
+
+    def movimentacao_em_lote(self, request):
+        return movimentacao_em_lote_view(self, request)
+
     def get_list_display(self, request):
         if getattr(request.user, "is_operador_inventario", False):
             return (
@@ -309,6 +359,10 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
 
         return queryset
 
+    def export_action(self, request, *args, **kwargs):
+        with leitura_replica():
+            return super().export_action(request, *args, **kwargs)
+
     def get_export_formats(self):
         return [CSV, XLSX, XLS, HTML, PDFFormat]
 
@@ -317,17 +371,34 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
         rk["request"] = request
         return rk
 
+    def get_data_for_export(self, request, queryset, *args, **kwargs):
+        data = super().get_data_for_export(request, queryset, *args, **kwargs)
+        request._linhas_exportadas = len(data)
+        return data
+
     def get_export_data(self, file_format, queryset, *args, **kwargs):
+        request = kwargs.get("request")
         if isinstance(file_format, PDFFormat):
-            request = kwargs.get("request")
+            # O PDFFormat registra as próprias métricas.
             file_format._export_request = request
             file_format._export_queryset = queryset
-        return super().get_export_data(file_format, queryset, *args, **kwargs)
+            return super().get_export_data(file_format, queryset, *args, **kwargs)
+
+        formato = file_format.get_title()
+        with metricas.EXPORTACAO_DURACAO.cronometrar(formato=formato):
+            export_data = super().get_export_data(
+                file_format, queryset, *args, **kwargs
+            )
+        metricas.EXPORTACAO_LINHAS.inc(
+            getattr(request, "_linhas_exportadas", 0), formato=formato
+        )
+        return export_data
 
     def save_formset(self, request, form, formset, change):
         if formset.model is StatusBemPatrimonial:
             self.save_status(request, form, formset, change)
-        formset.save()
+        else:
+            formset.save()
 
     def save_status(self, request, form, formset, change):
         instances = formset.save(commit=False)
@@ -335,7 +406,7 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
             obj.delete()
         for instance in instances:
             instance.atualizado_por = request.user
-            instance.save()
+        StatusBemPatrimonial.objects.registrar(instances)
         formset.save_m2m()
 
     def add_view(self, request, form_url="", extra_context=None):
@@ -406,7 +477,8 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
             from django.db import transaction, IntegrityError
             from django.core.exceptions import ValidationError
 
-            with transaction.atomic():
+            # Status iniciais dos N bens gravados em lote ao final do bloco.
+            with eventos.unidade_de_trabalho():
                 for idx, row in enumerate(linhas, start=1):
 
                     def to_bool(v):
@@ -554,30 +626,24 @@ class BemPatrimonialAdmin(ImportExportModelAdmin):
 
     @admin.display(description="Foto")
     def thumb(self, obj):
-        if getattr(obj, "foto", None) and hasattr(obj.foto, "url") and obj.foto.url:
-            return format_html(
-                '<img src="{}" style="height:48px;width:48px;object-fit:cover;border-radius:6px;border:1px solid #e5e7eb;" />',
-                obj.foto.url,
-            )
-        return "—"
+        urls = imagens.urls_miniatura(obj, "lista") if obj else None
+        if not urls:
+            return "—"
+        return _picture(
+            urls,
+            "height:48px;width:48px;object-fit:cover;border-radius:6px;border:1px solid #e5e7eb;",
+        )
 
     @admin.display(description="Pré-visualização")
     def foto_preview(self, obj):
-        try:
-            if (
-                obj
-                and obj.pk
-                and getattr(obj, "foto", None)
-                and hasattr(obj.foto, "url")
-                and obj.foto.url
-            ):
-                return format_html(
-                    '<a href="{}" target="_blank" rel="noopener">'
-                    '<img src="{}" style="max-height:200px;border-radius:8px;border:1px solid #e5e7eb;padding:4px;background:#fff;" />'
-                    "</a>",
-                    obj.foto.url,
-                    obj.foto.url,
-                )
-        except Exception:
-            pass
-        return "—"
+        urls = imagens.urls_miniatura(obj, "previa") if obj and obj.pk else None
+        if not urls:
+            return "—"
+        return format_html(
+            '<a href="{}" target="_blank" rel="noopener">{}</a>',
+            obj.foto.url,
+            _picture(
+                urls,
+                "max-height:200px;border-radius:8px;border:1px solid #e5e7eb;padding:4px;background:#fff;",
+            ),
+        )
@@ -1,7 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
-from bem_patrimonial.constants import APROVADO, BLOQUEADO, ENVIADA, AGUARDANDO_APROVACAO
+from bem_patrimonial.services import carregar_dados_movimentacao, validar_movimentacao
 from dados_comuns.models import UnidadeAdministrativa
 
 
@@ -23,60 +23,20 @@ class MovimentacaoBemPatrimonialForm(forms.ModelForm):
         except Exception as e:
             raise ValidationError(e)
 
-        try:
-            bem_patrimonial = BemPatrimonial.objects.get(pk=bem_patrimonial)
-        except BemPatrimonial.DoesNotExist:
-            raise ValidationError(
-                "Bem patrimonial não encontrado. Verifique se o bem está aprovado e sem movimentações pendentes."
-            )
-
-        try:
-            ua_origem = UnidadeAdministrativa.objects.get(pk=unidade_origem)
-            if not ua_origem.is_ativa:
-                raise ValidationError(
-                    f"A unidade de origem '{ua_origem.nome}' está inativa. "
-                    "Não é possível criar movimentações a partir de unidades inativas."
-                )
-        except UnidadeAdministrativa.DoesNotExist:
-            raise ValidationError("Unidade de origem não encontrada.")
-
-        try:
-            ua_destino = UnidadeAdministrativa.objects.get(pk=unidade_destino)
-            if not ua_destino.is_ativa:
-                raise ValidationError(
-                    f"A unidade de destino '{ua_destino.nome}' está inativa. "
-                    "Não é possível criar movimentações para unidades inativas."
-                )
-        except UnidadeAdministrativa.DoesNotExist:
-            raise ValidationError("Unidade de destino não encontrada.")
-
-        if bem_patrimonial.status == AGUARDANDO_APROVACAO:
-            raise ValidationError(
-                f"O bem '{bem_patrimonial.nome}' está aguardando aprovação do cadastro. "
-                f"Apenas bens aprovados podem ser movimentados."
-            )
-
-        if bem_patrimonial.status == BLOQUEADO:
-            raise ValidationError(
-                f"O bem '{bem_patrimonial.nome}' está bloqueado para movimentação. "
-                f"Aguarde a resolução da movimentação pendente."
-            )
-
-        if bem_patrimonial.status != APROVADO:
-            raise ValidationError(
-                f"O bem '{bem_patrimonial.nome}' não pode ser movimentado. "
-                f"Status atual: {bem_patrimonial.get_status_display()}. "
-                f"Apenas bens aprovados podem ser movimentados."
-            )
-
-        if bem_patrimonial.tem_movimentacao_pendente:
-            raise ValidationError(
-                f"O bem '{bem_patrimonial.nome}' já possui uma movimentação pendente. "
-                f"Aguarde a aprovação ou rejeição antes de criar nova movimentação."
-            )
-
-        if ua_destino == ua_origem:
-            raise ValidationError("Operação não permitida.")
+        # Reaproveita os objetos já validados pelos campos; só consulta o que
+        # foi recusado por eles, para montar a mensagem de erro específica.
+        bem_validado = self.cleaned_data.get("bem_patrimonial")
+        bem, ua_origem, ua_destino = carregar_dados_movimentacao(
+            bem_patrimonial,
+            unidade_origem,
+            unidade_destino,
+            bem=bem_validado,
+            ua_origem=self.cleaned_data.get("unidade_administrativa_origem"),
+            ua_destino=self.cleaned_data.get("unidade_administrativa_destino"),
+        )
+        # O queryset do campo (movimentaveis) já exclui bens com pendência.
+        pendente = False if bem_validado else bem.movimentacao_pendente
+        validar_movimentacao(bem, ua_origem, ua_destino, pendente)
 
         if created:
             if user.is_operador_inventario and (
@@ -88,13 +48,23 @@ class MovimentacaoBemPatrimonialForm(forms.ModelForm):
 
         super(MovimentacaoBemPatrimonialForm, self).clean()
 
+    def _get_validation_exclusions(self):
+        # Os campos de FK já foram validados pelos ModelChoiceField (com
+        # querysets mais restritos); evita que o model repita uma consulta
+        # de existência para cada um.
+        exclusoes = super()._get_validation_exclusions()
+        for campo in (
+            "bem_patrimonial",
+            "unidade_administrativa_origem",
+            "unidade_administrativa_destino",
+        ):
+            if campo in self.cleaned_data:
+                exclusoes.add(campo)
+        return exclusoes
+
     def __init__(self, *args, **kwargs):
         super(MovimentacaoBemPatrimonialForm, self).__init__(*args, **kwargs)
-        self.fields["bem_patrimonial"].queryset = (
-            BemPatrimonial.objects.filter(status=APROVADO)
-            .exclude(movimentacaobempatrimonial__status=ENVIADA)
-            .distinct()
-        )
+        self.fields["bem_patrimonial"].queryset = BemPatrimonial.objects.movimentaveis()
         # Filtrar apenas unidades administrativas ativas para os campos de autocomplete
         self.fields["unidade_administrativa_origem"].queryset = (
             UnidadeAdministrativa.objects.filter(status=UnidadeAdministrativa.ATIVA)
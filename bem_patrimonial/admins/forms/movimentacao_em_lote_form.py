@@ -0,0 +1,57 @@
+import re
+
+from django import forms
+from django.core.exceptions import ValidationError
+
+from dados_comuns.models import UnidadeAdministrativa
+
+SEPARADORES_NUMEROS = re.compile(r"[\s,;]+")
+
+
+class MovimentacaoEmLoteForm(forms.Form):
+    unidade_administrativa_destino = forms.ModelChoiceField(
+        label="Unidade administrativa destino",
+        queryset=UnidadeAdministrativa.objects.filter(
+            status=UnidadeAdministrativa.ATIVA
+        ),
+    )
+    numeros = forms.CharField(
+        label="Números patrimoniais adicionais",
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 4, "cols": 60}),
+        help_text="Um por linha (ou separados por vírgula/ponto e vírgula).",
+    )
+    arquivo = forms.FileField(
+        label="Arquivo com números patrimoniais",
+        required=False,
+        help_text="Arquivo .txt ou .csv; usa a primeira coluna de cada linha.",
+    )
+    observacao = forms.CharField(
+        label="Observação",
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 2, "cols": 60}),
+    )
+
+    def clean_arquivo(self):
+        arquivo = self.cleaned_data.get("arquivo")
+        if not arquivo:
+            return []
+        try:
+            conteudo = arquivo.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValidationError("O arquivo deve estar em UTF-8.")
+        return [
+            re.split(r"[,;]", linha, maxsplit=1)[0].strip()
+            for linha in conteudo.splitlines()
+            if linha.strip()
+        ]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        numeros = SEPARADORES_NUMEROS.split(cleaned_data.get("numeros") or "")
+        numeros += cleaned_data.get("arquivo") or []
+        # Mantém a ordem informada, sem repetições.
+        cleaned_data["numeros_patrimoniais"] = list(
+            dict.fromkeys(n.strip() for n in numeros if n.strip())
+        )
+        return cleaned_data
@@ -1,23 +1,26 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db.models import Q
-from django.db import transaction
 from bem_patrimonial.admins.forms.movimentacao_bem_patrimonial_form import (
     MovimentacaoBemPatrimonialForm,
 )
 from bem_patrimonial.models import MovimentacaoBemPatrimonial
+from bem_patrimonial.services import criar_movimentacao
 from bem_patrimonial.emails import (
     envia_email_solicitacao_movimentacao_aceita,
     envia_email_solicitacao_movimentacao_rejeitada,
     envia_email_solicitacao_movimentacao_cancelada,
 )
 
+from dados_comuns import metricas
 from dados_comuns.libs.unidade_administrativa import uas_do_usuario
 from dados_comuns.models import UnidadeAdministrativa
 
 UNIDADE_ADMINISTRATIVA_ORIGEM_AUTOCOMPLETE = "unidade_administrativa_origem"
 
 
+@metricas.cronometrado(metricas.ACAO_ADMIN_DURACAO, acao="aprovar_movimentacao")
 def aprovar_solicitacao(modeladmin, request, queryset):
     for item in queryset:
         if item.aceita:
@@ -95,6 +98,7 @@ def aprovar_solicitacao(modeladmin, request, queryset):
 aprovar_solicitacao.short_description = "Aprovar movimentação selecionada"
 
 
+@metricas.cronometrado(metricas.ACAO_ADMIN_DURACAO, acao="rejeitar_movimentacao")
 def rejeitar_solicitacao(modeladmin, request, queryset):
     for item in queryset:
         if item.rejeitada:
@@ -172,6 +176,7 @@ def rejeitar_solicitacao(modeladmin, request, queryset):
 rejeitar_solicitacao.short_description = "Rejeitar movimentação selecionada"
 
 
+@metricas.cronometrado(metricas.ACAO_ADMIN_DURACAO, acao="cancelar_movimentacao")
 def cancelar_solicitacao(modeladmin, request, queryset):
     for item in queryset:
         if item.cancelada:
@@ -271,10 +276,10 @@ class MovimentacaoBemPatrimonialAdmin(admin.ModelAdmin):
 
         if obj is None:
             uas = uas_do_usuario(request.user)
-            uas = uas.filter(status=UnidadeAdministrativa.ATIVA)
+            uas = list(uas.filter(status=UnidadeAdministrativa.ATIVA)[:2])
 
-            if uas.count() == 1:
-                ua = uas.first()
+            if len(uas) == 1:
+                ua = uas[0]
                 if (
                     hasattr(form, "base_fields")
                     and UNIDADE_ADMINISTRATIVA_ORIGEM_AUTOCOMPLETE in form.base_fields
@@ -299,23 +304,10 @@ class MovimentacaoBemPatrimonialAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         if obj.id is None:
             # Proteção contra duplicação usando lock transacional
-            with transaction.atomic():
-                from bem_patrimonial.models import BemPatrimonial
-
-                bem_locked = BemPatrimonial.objects.select_for_update().get(
-                    pk=obj.bem_patrimonial.pk
-                )
-
-                if bem_locked.tem_movimentacao_pendente:
-                    messages.add_message(
-                        request,
-                        messages.WARNING,
-                        f"O bem '{bem_locked}' já possui uma movimentação pendente. Aguarde a conclusão antes de criar uma nova.",
-                    )
-                    return
-
-                obj.solicitado_por = request.user
-                super().save_model(request, obj, form, change)
+            try:
+                criar_movimentacao(obj, request.user)
+            except ValidationError as e:
+                messages.add_message(request, messages.WARNING, e.messages[0])
         else:
             super().save_model(request, obj, form, change)
 
@@ -0,0 +1,59 @@
+from django.contrib import admin
+from django.db.models import Sum
+
+from bem_patrimonial.resumo import CAMPOS_RESUMO
+from dados_comuns.db_router import db_leitura
+from dados_comuns.libs.unidade_administrativa import ids_uas_permitidas
+
+
+class ResumoInventarioUnidadeAdmin(admin.ModelAdmin):
+    """
+    Totais por unidade lidos da tabela materializada (bem_patrimonial/resumo.py):
+    a lista e o total da rede saem sem varrer os bens.
+    """
+
+    change_list_template = "admin/resumo_inventario_change_list.html"
+    list_display = (
+        "unidade_administrativa",
+        "total_bens",
+        "valor_total",
+        "total_aprovados",
+        "total_aguardando_aprovacao",
+        "total_nao_aprovados",
+        "total_bloqueados",
+        "movimentacoes_pendentes_saida",
+        "movimentacoes_pendentes_entrada",
+        "atualizado_em",
+    )
+    search_fields = (
+        "unidade_administrativa__sigla",
+        "unidade_administrativa__nome",
+        "unidade_administrativa__codigo",
+    )
+    ordering = ("unidade_administrativa__codigo",)
+    list_select_related = ("unidade_administrativa",)
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request).using(db_leitura())
+        ids_permitidos = ids_uas_permitidas(request.user)
+        if ids_permitidos is not None:
+            qs = qs.filter(unidade_administrativa_id__in=ids_permitidos)
+        return qs
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, "context_data", {}).get("cl")
+        if changelist is not None:
+            response.context_data["totais"] = changelist.queryset.aggregate(
+                **{campo: Sum(campo) for campo in CAMPOS_RESUMO}
+            )
+        return response
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
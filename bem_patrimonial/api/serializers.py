@@ -0,0 +1,130 @@
+from rest_framework import serializers
+
+from bem_patrimonial import imagens
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    BemPatrimonialExcluido,
+    MovimentacaoBemPatrimonial,
+)
+from dados_comuns.models import UnidadeAdministrativa
+
+
+def campos_solicitados(request):
+    """Campos pedidos em ?fields=a,b (None quando não informado)."""
+    if request is None:
+        return None
+    valor = request.query_params.get("fields")
+    if not valor:
+        return None
+    return {campo.strip() for campo in valor.split(",") if campo.strip()}
+
+
+class CamposDinamicosMixin:
+    """Limita a representação aos campos de ?fields= (sparse fieldsets)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_solicitados(self.context.get("request"))
+        if campos is not None:
+            for nome in set(self.fields) - campos:
+                self.fields.pop(nome)
+
+
+class UnidadeAdministrativaResumidaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UnidadeAdministrativa
+        fields = ("id", "codigo", "sigla", "nome")
+
+
+class UnidadeAdministrativaSerializer(
+    CamposDinamicosMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = UnidadeAdministrativa
+        fields = ("id", "codigo", "sigla", "nome", "status", "updated_at")
+
+
+class BemPatrimonialResumidoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BemPatrimonial
+        fields = ("id", "numero_patrimonial", "nome")
+
+
+class BemPatrimonialSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    unidade_administrativa = UnidadeAdministrativaResumidaSerializer(read_only=True)
+    criado_por = serializers.CharField(source="criado_por.nome", default=None)
+    foto_miniatura = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BemPatrimonial
+        fields = (
+            "id",
+            "numero_patrimonial",
+            "numero_formato_antigo",
+            "sem_numeracao",
+            "nome",
+            "descricao",
+            "marca",
+            "modelo",
+            "valor_unitario",
+            "numero_processo",
+            "localizacao",
+            "foto",
+            "foto_miniatura",
+            "status",
+            "unidade_administrativa",
+            "criado_por",
+            "criado_em",
+            "atualizado_em",
+        )
+
+    def get_foto_miniatura(self, obj):
+        urls = imagens.urls_miniatura(obj, "lista")
+        request = self.context.get("request")
+        if urls and request is not None:
+            urls = {
+                extensao: url and request.build_absolute_uri(url)
+                for extensao, url in urls.items()
+            }
+        return urls
+
+
+class BemPatrimonialExcluidoSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="bem_id")
+
+    class Meta:
+        model = BemPatrimonialExcluido
+        fields = ("id", "numero_patrimonial", "excluido_em")
+
+
+class MovimentacaoBemPatrimonialSerializer(
+    CamposDinamicosMixin, serializers.ModelSerializer
+):
+    bem_patrimonial = BemPatrimonialResumidoSerializer(read_only=True)
+    unidade_administrativa_origem = UnidadeAdministrativaResumidaSerializer(
+        read_only=True
+    )
+    unidade_administrativa_destino = UnidadeAdministrativaResumidaSerializer(
+        read_only=True
+    )
+    solicitado_por = serializers.CharField(source="solicitado_por.nome", default=None)
+    aprovado_por = serializers.CharField(source="aprovado_por.nome", default=None)
+    rejeitado_por = serializers.CharField(source="rejeitado_por.nome", default=None)
+    cancelado_por = serializers.CharField(source="cancelado_por.nome", default=None)
+
+    class Meta:
+        model = MovimentacaoBemPatrimonial
+        fields = (
+            "id",
+            "bem_patrimonial",
+            "unidade_administrativa_origem",
+            "unidade_administrativa_destino",
+            "status",
+            "observacao",
+            "solicitado_por",
+            "aprovado_por",
+            "rejeitado_por",
+            "cancelado_por",
+            "criado_em",
+            "atualizado_em",
+        )
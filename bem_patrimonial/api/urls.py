@@ -0,0 +1,24 @@
+from rest_framework.routers import SimpleRouter
+
+from bem_patrimonial.api.views import (
+    BemPatrimonialViewSet,
+    MovimentacaoBemPatrimonialViewSet,
+    UnidadeAdministrativaViewSet,
+)
+
+app_name = "api"
+
+router = SimpleRouter()
+router.register("bens", BemPatrimonialViewSet, basename="bem-patrimonial")
+router.register(
+    "movimentacoes",
+    MovimentacaoBemPatrimonialViewSet,
+    basename="movimentacao-bem-patrimonial",
+)
+router.register(
+    "unidades-administrativas",
+    UnidadeAdministrativaViewSet,
+    basename="unidade-administrativa",
+)
+
+urlpatterns = router.urls
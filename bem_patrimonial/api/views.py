@@ -0,0 +1,209 @@
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from bem_patrimonial import feed
+from bem_patrimonial.api.serializers import (
+    BemPatrimonialExcluidoSerializer,
+    BemPatrimonialSerializer,
+    MovimentacaoBemPatrimonialSerializer,
+    UnidadeAdministrativaSerializer,
+    campos_solicitados,
+)
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    BemPatrimonialExcluido,
+    MovimentacaoBemPatrimonial,
+)
+from dados_comuns.db_router import db_leitura
+from dados_comuns.libs.unidade_administrativa import ids_uas_permitidas
+from dados_comuns.models import UnidadeAdministrativa
+
+
+class CursorPaginacao(CursorPagination):
+    """Paginação por cursor sobre o id: sem COUNT(*) nem OFFSET."""
+
+    ordering = "-id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class PermissaoVisualizacao(DjangoModelPermissions):
+    """Usuário da equipe com a permissão "view" do model (a mesma do admin)."""
+
+    perms_map = {
+        method: ["%(app_label)s.view_%(model_name)s"]
+        for method in ("GET", "HEAD", "OPTIONS")
+    }
+
+    def has_permission(self, request, view):
+        return request.user.is_staff and super().has_permission(request, view)
+
+
+class ViewSetSomenteLeitura(viewsets.ReadOnlyModelViewSet):
+    """
+    Base dos endpoints: lê da réplica, faz select_related só das relações
+    pedidas em ?fields=, aplica os filtros simples de `filtros` e responde
+    com ETag (If-None-Match devolve 304 sem corpo).
+    """
+
+    permission_classes = (PermissaoVisualizacao,)
+    renderer_classes = (JSONRenderer,)
+    pagination_class = CursorPaginacao
+    # campo do serializer -> caminhos de select_related
+    relacoes = {}
+    # parâmetro da query string -> lookup do filtro
+    filtros = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset().using(db_leitura())
+        campos = campos_solicitados(self.request)
+        caminhos = [
+            caminho
+            for campo, caminhos_campo in self.relacoes.items()
+            if campos is None or campo in campos
+            for caminho in caminhos_campo
+        ]
+        if caminhos:
+            queryset = queryset.select_related(*caminhos)
+        return self.restringir(self.filtrar(queryset))
+
+    def filtrar(self, queryset):
+        for parametro, lookup in self.filtros.items():
+            valor = self.request.query_params.get(parametro)
+            if valor in (None, ""):
+                continue
+            try:
+                queryset = queryset.filter(**{lookup: valor})
+            except (ValueError, DjangoValidationError):
+                raise ValidationError({parametro: "Valor inválido."})
+        return queryset
+
+    def restringir(self, queryset):
+        return queryset
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ("GET", "HEAD") and response.status_code == 200:
+            response.render()
+            etag = '"%s"' % hashlib.md5(response.content).hexdigest()
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            response = get_conditional_response(
+                request._request, etag=etag, response=response
+            )
+        return response
+
+
+class BemPatrimonialViewSet(ViewSetSomenteLeitura):
+    queryset = BemPatrimonial.objects.all()
+    serializer_class = BemPatrimonialSerializer
+    relacoes = {
+        "unidade_administrativa": ["unidade_administrativa"],
+        "criado_por": ["criado_por"],
+    }
+    filtros = {
+        "status": "status",
+        "unidade_administrativa": "unidade_administrativa_id",
+        "numero_patrimonial": "numero_patrimonial",
+    }
+
+    def restringir(self, queryset):
+        ids_permitidos = ids_uas_permitidas(self.request.user)
+        if ids_permitidos is not None:
+            queryset = queryset.filter(unidade_administrativa_id__in=ids_permitidos)
+        return queryset
+
+    @action(detail=False, url_path="alteracoes")
+    def alteracoes(self, request):
+        """
+        Bens gravados e excluídos desde ?desde= (ISO 8601), paginados por
+        ?cursor=; quando `proximo` é null, use `marca` como o próximo `desde`.
+        """
+        parametros = request.query_params
+        desde, cursor = None, None
+        try:
+            if parametros.get("desde"):
+                desde = feed.ler_momento(parametros["desde"])
+            if parametros.get("cursor"):
+                cursor = feed.decodificar_cursor(parametros["cursor"])
+            limite = int(parametros.get("limite", feed.LIMITE_PADRAO))
+        except ValueError:
+            raise ValidationError("Parâmetros desde, cursor ou limite inválidos.")
+        if limite < 1:
+            raise ValidationError({"limite": "Valor inválido."})
+        limite = min(limite, feed.LIMITE_MAXIMO)
+
+        pagina = feed.pagina_de_alteracoes(
+            desde,
+            cursor,
+            limite,
+            bens=self.get_queryset(),
+            excluidos=self.restringir(
+                BemPatrimonialExcluido.objects.using(db_leitura())
+            ),
+        )
+        proximo = None
+        if pagina.proximo is not None:
+            proximo = replace_query_param(
+                request.build_absolute_uri(),
+                "cursor",
+                feed.codificar_cursor(pagina.proximo),
+            )
+        return Response(
+            {
+                "alterados": self.get_serializer(pagina.alterados, many=True).data,
+                "excluidos": BemPatrimonialExcluidoSerializer(
+                    pagina.excluidos, many=True
+                ).data,
+                "proximo": proximo,
+                "marca": pagina.marca.isoformat(),
+            }
+        )
+
+
+class MovimentacaoBemPatrimonialViewSet(ViewSetSomenteLeitura):
+    queryset = MovimentacaoBemPatrimonial.objects.all()
+    serializer_class = MovimentacaoBemPatrimonialSerializer
+    relacoes = {
+        "bem_patrimonial": ["bem_patrimonial"],
+        "unidade_administrativa_origem": ["unidade_administrativa_origem"],
+        "unidade_administrativa_destino": ["unidade_administrativa_destino"],
+        "solicitado_por": ["solicitado_por"],
+        "aprovado_por": ["aprovado_por"],
+        "rejeitado_por": ["rejeitado_por"],
+        "cancelado_por": ["cancelado_por"],
+    }
+    filtros = {
+        "status": "status",
+        "bem_patrimonial": "bem_patrimonial_id",
+        "unidade_administrativa_origem": "unidade_administrativa_origem_id",
+        "unidade_administrativa_destino": "unidade_administrativa_destino_id",
+    }
+
+    def restringir(self, queryset):
+        ids_permitidos = ids_uas_permitidas(self.request.user)
+        if ids_permitidos is not None:
+            queryset = queryset.filter(
+                Q(unidade_administrativa_origem_id__in=ids_permitidos)
+                | Q(unidade_administrativa_destino_id__in=ids_permitidos)
+            )
+        return queryset
+
+
+class UnidadeAdministrativaViewSet(ViewSetSomenteLeitura):
+    # Como no admin, a listagem de unidades não é restrita para operadores.
+    queryset = UnidadeAdministrativa.objects.all()
+    serializer_class = UnidadeAdministrativaSerializer
+    filtros = {"status": "status", "codigo": "codigo"}
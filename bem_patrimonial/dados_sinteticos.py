@@ -0,0 +1,230 @@
+"""
+Gerador de inventário sintético para testes de carga e benchmarks
+(comandos gerar_dados_sinteticos e bench).
+
+Tudo é gravado em lotes com bulk_create (o histórico, a maior tabela, com
+COPY no PostgreSQL), sem passar pelos signals; ao final o resumo por unidade
+é recalculado e os caches de bens e unidades são invalidados.
+"""
+
+import csv
+import io
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.utils import timezone
+
+from bem_patrimonial import constants, resumo
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    StatusBemPatrimonial,
+)
+from dados_comuns.cache import TAG_UNIDADE_ADMINISTRATIVA, invalidar_apos_commit
+from dados_comuns.models import HistoricoGeral, UnidadeAdministrativa
+from usuario.constants import GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+NOMES = ("MESA", "CADEIRA", "ARMÁRIO", "COMPUTADOR", "ESTANTE", "PROJETOR", "IMPRESSORA")
+MARCAS = ("Marca A", "Marca B", "Marca C")
+CAMPOS_HISTORICO = ("localizacao", "valor_unitario", "status")
+COLUNAS_HISTORICO = (
+    "content_type_id",
+    "object_id",
+    "campo",
+    "valor_antigo",
+    "valor_novo",
+    "alterado_por_id",
+    "alterado_em",
+)
+
+
+def _criar_unidades(prefixo, quantidade):
+    return UnidadeAdministrativa.objects.bulk_create(
+        [
+            UnidadeAdministrativa(
+                codigo=f"{prefixo}-{i:05d}",
+                sigla=f"{prefixo}{i}",
+                nome=f"Unidade sintética {prefixo} {i}",
+            )
+            for i in range(quantidade)
+        ]
+    )
+
+
+def _criar_usuarios(prefixo, quantidade, unidades):
+    usuarios = Usuario.objects.bulk_create(
+        [
+            Usuario(
+                username=f"{prefixo.lower()}_operador_{i}",
+                nome=f"Operador sintético {i}",
+                unidade_administrativa=unidades[i % len(unidades)],
+                must_change_password=False,
+                password="!",
+            )
+            for i in range(quantidade)
+        ]
+    )
+    grupo, _ = Group.objects.get_or_create(name=GRUPO_OPERADOR_INVENTARIO)
+    Usuario.groups.through.objects.bulk_create(
+        [Usuario.groups.through(usuario_id=u.pk, group_id=grupo.pk) for u in usuarios]
+    )
+    return usuarios
+
+
+def _gravar_historico(registros):
+    if connection.vendor != "postgresql":
+        HistoricoGeral.objects.bulk_create(
+            [HistoricoGeral(**dict(zip(COLUNAS_HISTORICO, r))) for r in registros]
+        )
+        return
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for registro in registros:
+        escritor.writerow("" if v is None else v for v in registro)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {HistoricoGeral._meta.db_table} ({', '.join(COLUNAS_HISTORICO)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def _gerar_lote(inicio, fim, prefixo, unidades, usuarios, opcoes, aleatorio, ct_bem):
+    agora = timezone.now()
+    bens = BemPatrimonial.objects.bulk_create(
+        [
+            BemPatrimonial(
+                nome=f"{NOMES[i % len(NOMES)]} {i}",
+                descricao=f"Bem sintético {i}",
+                valor_unitario=Decimal(aleatorio.randint(100, 500_000)) / 100,
+                marca=MARCAS[i % len(MARCAS)],
+                modelo=f"M{i % 97}",
+                localizacao=f"Sala {i % 40}",
+                numero_patrimonial=f"{prefixo}-{i:09d}",
+                status=(
+                    constants.AGUARDANDO_APROVACAO
+                    if aleatorio.random() < opcoes["aguardando"]
+                    else constants.APROVADO
+                ),
+                unidade_administrativa=unidades[i % len(unidades)],
+                criado_por=usuarios[i % len(usuarios)],
+            )
+            for i in range(inicio, fim)
+        ]
+    )
+
+    movimentacoes = []
+    for i, bem in enumerate(bens, start=inicio):
+        if (
+            len(unidades) > 1
+            and bem.status == constants.APROVADO
+            and aleatorio.random() < opcoes["movimentacoes"]
+        ):
+            destino = unidades[(i + 1) % len(unidades)]
+            bem.status = constants.BLOQUEADO
+            movimentacoes.append(
+                MovimentacaoBemPatrimonial(
+                    bem_patrimonial=bem,
+                    unidade_administrativa_origem=bem.unidade_administrativa,
+                    unidade_administrativa_destino=destino,
+                    solicitado_por=bem.criado_por,
+                    status=constants.ENVIADA,
+                )
+            )
+    if movimentacoes:
+        BemPatrimonial.objects.filter(
+            pk__in=[m.bem_patrimonial_id for m in movimentacoes]
+        ).update(status=constants.BLOQUEADO)
+        MovimentacaoBemPatrimonial.objects.bulk_create(movimentacoes)
+
+    StatusBemPatrimonial.objects.bulk_create(
+        [
+            StatusBemPatrimonial(
+                bem_patrimonial=bem,
+                status=bem.status,
+                atualizado_por_id=bem.criado_por_id,
+                atualizado_em=agora,
+            )
+            for bem in bens
+        ]
+    )
+
+    historico = []
+    for bem in bens:
+        for n in range(opcoes["historico"]):
+            campo = CAMPOS_HISTORICO[n % len(CAMPOS_HISTORICO)]
+            historico.append(
+                (
+                    ct_bem.pk,
+                    str(bem.pk),
+                    campo,
+                    f"{campo} anterior {n}",
+                    f"{campo} {n}",
+                    bem.criado_por_id,
+                    agora - timedelta(days=n),
+                )
+            )
+    if historico:
+        _gravar_historico(historico)
+    return len(bens), len(movimentacoes), len(historico)
+
+
+def gerar(
+    unidades=50,
+    bens_por_unidade=200,
+    historico=3,
+    movimentacoes=0.02,
+    usuarios=10,
+    aguardando=0.05,
+    lote=5000,
+    prefixo="SINT",
+    semente=0,
+    progresso=None,
+):
+    """
+    Gera `unidades` x `bens_por_unidade` bens, cada um com `historico`
+    registros no histórico geral; a fração `movimentacoes` dos bens aprovados
+    fica com uma movimentação enviada (e bloqueada). Retorna as contagens.
+    """
+    aleatorio = random.Random(semente)
+    opcoes = {
+        "historico": historico,
+        "movimentacoes": movimentacoes,
+        "aguardando": aguardando,
+    }
+    lista_unidades = _criar_unidades(prefixo, unidades)
+    lista_usuarios = _criar_usuarios(prefixo, max(1, usuarios), lista_unidades)
+    ct_bem = ContentType.objects.get_for_model(BemPatrimonial)
+
+    total = unidades * bens_por_unidade
+    contagens = {
+        "unidades": unidades,
+        "usuarios": len(lista_usuarios),
+        "bens": 0,
+        "movimentacoes": 0,
+        "historico": 0,
+    }
+    for inicio in range(0, total, lote):
+        fim = min(total, inicio + lote)
+        bens, movs, hist = _gerar_lote(
+            inicio, fim, prefixo, lista_unidades, lista_usuarios, opcoes, aleatorio, ct_bem
+        )
+        contagens["bens"] += bens
+        contagens["movimentacoes"] += movs
+        contagens["historico"] += hist
+        if progresso:
+            progresso(f"{fim}/{total} bens gerados")
+
+    resumo.recalcular([u.pk for u in lista_unidades])
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for model in (BemPatrimonial, MovimentacaoBemPatrimonial, HistoricoGeral):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+    invalidar_apos_commit(TAG_UNIDADE_ADMINISTRATIVA)
+    return contagens
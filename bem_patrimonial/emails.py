@@ -1,5 +1,6 @@
 import pytz
 from django.conf import settings
+from django.utils.html import format_html, format_html_join
 from config.utils import email_utils
 
 local_timezone = pytz.timezone(settings.TIME_ZONE)
@@ -54,6 +55,35 @@ def envia_email_nova_solicitacao_movimentacao(movimentacao, emails):
     email_utils.send_email_ctrl(subject, dict_params, "simple_message.html", emails)
 
 
+def envia_email_novas_solicitacoes_movimentacao(movimentacoes, ua_destino, emails):
+    """Uma única notificação para as movimentações criadas em lote."""
+    if not emails or not movimentacoes:
+        return
+
+    ua_info = (
+        f"{ua_destino.codigo} – {ua_destino.nome}"
+        if ua_destino.codigo
+        else ua_destino.nome
+    )
+    subject = "[Bens Físicos] Movimentações recebidas para aceite"
+    dict_params = {
+        "subject": subject,
+        "title": "Olá!",
+        "subtitle": f"""A Unidade Administrativa {ua_info} recebeu {len(movimentacoes)} movimentação(ões) de bens patrimoniais para aceite.
+        Acesse {settings.ADMIN_URL} para concluir as movimentações.""",
+        "body": format_html(
+            "<ul>{}</ul>",
+            format_html_join(
+                "",
+                "<li>#{} – {}</li>",
+                ((m.pk, str(m.bem_patrimonial)) for m in movimentacoes),
+            ),
+        ),
+    }
+
+    email_utils.send_email_ctrl(subject, dict_params, "simple_message.html", emails)
+
+
 def envia_email_solicitacao_movimentacao_aceita(bem_patrimonial, emails=[]):
     subject = "[Bens físicos] Sua solicitação de movimentação foi aceita."
     dict = {
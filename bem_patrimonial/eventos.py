@@ -0,0 +1,235 @@
+"""
+Efeitos colaterais da criação de bens e movimentações como eventos de domínio.
+
+Os receivers de post_save (e os caminhos em lote, onde bulk_create não dispara
+signals) apenas publicam eventos. Dentro de `unidade_de_trabalho()` os eventos
+são acumulados e aplicados de uma vez ao final do bloco: status iniciais com
+um bulk_create, bens bloqueados com um único UPDATE, o resumo por unidade
+(bem_patrimonial/resumo.py) com outro e uma consulta de destinatários para
+todas as UAs de destino. Fora de uma unidade de trabalho
+o evento é aplicado na hora, como faziam os receivers.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from bem_patrimonial import constants, resumo
+from bem_patrimonial.emails import (
+    envia_email_nova_solicitacao_movimentacao,
+    envia_email_novas_solicitacoes_movimentacao,
+)
+from bem_patrimonial.models import BemPatrimonial, StatusBemPatrimonial
+from dados_comuns import metricas
+from dados_comuns.context import get_user
+from dados_comuns.models import HistoricoGeral
+from usuario.models import Usuario
+
+_local = threading.local()
+
+
+class UnidadeDeTrabalho:
+    def __init__(self):
+        self.bens_criados = []
+        self.movimentacoes_criadas = []
+        self.resumo = resumo.Deltas()
+
+    def aplicar(self):
+        """Efeitos no banco, dentro da transação de quem publicou."""
+        _criar_status_iniciais(self.bens_criados)
+        _bloquear_bens(self.movimentacoes_criadas, self.resumo)
+        for movimentacao in self.movimentacoes_criadas:
+            self.resumo.movimentacao(movimentacao, 1)
+        self.resumo.aplicar()
+        if self.movimentacoes_criadas:
+            metricas.MOVIMENTACOES.inc(len(self.movimentacoes_criadas), acao="criada")
+
+    def notificar(self):
+        _notificar_unidades_destino(self.movimentacoes_criadas)
+
+
+def _atual():
+    return getattr(_local, "unidade", None)
+
+
+@contextmanager
+def unidade_de_trabalho():
+    """
+    Acumula os eventos publicados no bloco e os aplica em lote ao final, na
+    mesma transação. Os e-mails saem depois que o bloco é concluído; nada é
+    aplicado nem enviado se o bloco falhar ou marcar rollback. Blocos
+    aninhados usam a unidade de trabalho mais externa.
+    """
+    if _atual() is not None:
+        yield _atual()
+        return
+
+    unidade = UnidadeDeTrabalho()
+    _local.unidade = unidade
+    try:
+        with transaction.atomic():
+            yield unidade
+            confirmada = not transaction.get_rollback()
+            if confirmada:
+                unidade.aplicar()
+    finally:
+        _local.unidade = None
+
+    if confirmada:
+        unidade.notificar()
+
+
+def _publicar(lista, objetos):
+    unidade = _atual()
+    if unidade is not None:
+        getattr(unidade, lista).extend(objetos)
+        return
+
+    unidade = UnidadeDeTrabalho()
+    getattr(unidade, lista).extend(objetos)
+    unidade.aplicar()
+    unidade.notificar()
+
+
+def bens_criados(bens):
+    _publicar("bens_criados", bens)
+
+
+def movimentacoes_criadas(movimentacoes):
+    _publicar("movimentacoes_criadas", movimentacoes)
+
+
+def resumo_alterado(deltas):
+    """Variações do resumo por unidade (ResumoInventarioUnidade)."""
+    unidade = _atual()
+    if unidade is not None:
+        unidade.resumo.somar(deltas)
+    else:
+        deltas.aplicar()
+
+
+def bem_gravado(antes, depois):
+    """`antes`/`depois`: o bem antes e depois da escrita (None na criação/exclusão)."""
+    deltas = resumo.Deltas()
+    deltas.troca_bem(antes, depois)
+    resumo_alterado(deltas)
+
+
+def status_alterados(transicoes):
+    """`transicoes`: [(unidade_id, status_antigo, status_novo), ...]."""
+    deltas = resumo.Deltas()
+    for unidade_id, antigo, novo in transicoes:
+        deltas.status(unidade_id, antigo, novo)
+    resumo_alterado(deltas)
+
+
+def movimentacoes_concluidas(movimentacoes):
+    """Movimentações que deixaram de estar pendentes (aceitas, rejeitadas...)."""
+    deltas = resumo.Deltas()
+    for movimentacao in movimentacoes:
+        deltas.movimentacao(movimentacao, -1)
+    resumo_alterado(deltas)
+
+
+def _criar_status_iniciais(bens):
+    # bulk_create não passa por StatusBemPatrimonial.save(), que salvaria o bem
+    # de novo só para repetir o status que ele já tem.
+    agora = timezone.now()
+    StatusBemPatrimonial.objects.bulk_create(
+        [
+            StatusBemPatrimonial(
+                bem_patrimonial=bem,
+                status=constants.AGUARDANDO_APROVACAO,
+                atualizado_por_id=bem.criado_por_id,
+                atualizado_em=agora,
+            )
+            for bem in bens
+            if bem.status == constants.AGUARDANDO_APROVACAO
+        ]
+    )
+
+
+def _bloquear_bens(movimentacoes, deltas):
+    """
+    Bloqueia os bens com um único UPDATE, em vez de bem.save() (que relê o
+    registro e é chamado de novo pelo StatusBemPatrimonial), registrando o
+    mesmo histórico, status e variação do resumo por unidade.
+    """
+    if not movimentacoes:
+        return
+    agora = timezone.now()
+    usuario = get_user()
+    ct = ContentType.objects.get_for_model(BemPatrimonial)
+
+    # criado_em também é auto_now no model; mantém o que o save() faria.
+    BemPatrimonial.objects.filter(
+        pk__in=[m.bem_patrimonial_id for m in movimentacoes]
+    ).update(status=constants.BLOQUEADO, atualizado_em=agora, criado_em=agora)
+
+    historico = []
+    status = []
+    for movimentacao in movimentacoes:
+        bem = movimentacao.bem_patrimonial
+        deltas.status(bem.unidade_administrativa_id, bem.status, constants.BLOQUEADO)
+        if bem.status != constants.BLOQUEADO:
+            historico.append(
+                HistoricoGeral(
+                    content_type=ct,
+                    object_id=str(bem.pk),
+                    campo="status",
+                    valor_antigo=bem.status,
+                    valor_novo=constants.BLOQUEADO,
+                    alterado_por=usuario,
+                    alterado_em=agora,
+                )
+            )
+        bem.status = constants.BLOQUEADO
+        bem.atualizado_em = bem.criado_em = agora
+        status.append(
+            StatusBemPatrimonial(
+                bem_patrimonial=bem,
+                status=constants.BLOQUEADO,
+                atualizado_por_id=movimentacao.solicitado_por_id,
+                observacao=f"Bem bloqueado para movimentação #{movimentacao.pk}",
+                atualizado_em=agora,
+            )
+        )
+
+    HistoricoGeral.objects.bulk_create(historico)
+    StatusBemPatrimonial.objects.bulk_create(status)
+
+
+def _notificar_unidades_destino(movimentacoes):
+    if not movimentacoes:
+        return
+
+    por_unidade = {}
+    for movimentacao in movimentacoes:
+        por_unidade.setdefault(
+            movimentacao.unidade_administrativa_destino_id, []
+        ).append(movimentacao)
+
+    emails = {}
+    for unidade_id, email in (
+        Usuario.objects.filter(
+            is_active=True, unidade_administrativa_id__in=por_unidade
+        )
+        .exclude(email__isnull=True)
+        .exclude(email="")
+        .values_list("unidade_administrativa_id", "email")
+    ):
+        emails.setdefault(unidade_id, []).append(email)
+
+    for unidade_id, movs in por_unidade.items():
+        destinatarios = emails.get(unidade_id)
+        if not destinatarios:
+            continue
+        if len(movs) == 1:
+            envia_email_nova_solicitacao_movimentacao(movs[0], destinatarios)
+        else:
+            envia_email_novas_solicitacoes_movimentacao(
+                movs, movs[0].unidade_administrativa_destino, destinatarios
+            )
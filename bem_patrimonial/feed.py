@@ -0,0 +1,125 @@
+"""
+Feed de alterações de bens para sincronização incremental.
+
+Lista os bens gravados (BemPatrimonial.atualizado_em) e excluídos
+(BemPatrimonialExcluido.excluido_em) numa janela (desde, ate], em ordem de
+(momento, tipo, id) e paginada por cursor, usando os índices
+bem_atualizado_em_idx e bem_excluido_em_idx. O fim da janela fica
+FEED_ALTERACOES_MARGEM_SEGUNDOS no passado para não perder gravações de
+transações ainda abertas; ao terminar as páginas, `marca` é o `desde` da
+próxima sincronização.
+"""
+
+import base64
+import heapq
+import json
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from bem_patrimonial.models import BemPatrimonial, BemPatrimonialExcluido
+
+ALTERADO = 0
+EXCLUIDO = 1
+
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 1000
+
+Cursor = namedtuple("Cursor", ["ate", "momento", "tipo", "id"])
+Pagina = namedtuple("Pagina", ["alterados", "excluidos", "proximo", "marca"])
+
+
+def ler_momento(valor):
+    """Converte um datetime ISO 8601 (sem fuso: horário local); ValueError se inválido."""
+    momento = parse_datetime(valor)
+    if momento is None:
+        raise ValueError(valor)
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
+
+
+def codificar_cursor(cursor):
+    dados = {
+        "a": cursor.ate.isoformat(),
+        "m": cursor.momento.isoformat() if cursor.momento else None,
+        "t": cursor.tipo,
+        "i": cursor.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(dados).encode()).decode()
+
+
+def decodificar_cursor(token):
+    """Lê o cursor de `codificar_cursor`; ValueError se inválido."""
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return Cursor(
+            ler_momento(dados["a"]),
+            ler_momento(dados["m"]) if dados["m"] else None,
+            int(dados["t"]),
+            int(dados["i"]) if dados["i"] is not None else None,
+        )
+    except (TypeError, KeyError, AttributeError, json.JSONDecodeError) as e:
+        raise ValueError(token) from e
+
+
+def _depois_do_cursor(campo, tipo, cursor):
+    """Filtro das linhas de `tipo` posteriores ao cursor em (momento, tipo, id)."""
+    if cursor.momento is None:
+        return Q()
+    if tipo > cursor.tipo:
+        return Q(**{f"{campo}__gte": cursor.momento})
+    if tipo < cursor.tipo or cursor.id is None:
+        return Q(**{f"{campo}__gt": cursor.momento})
+    return Q(**{f"{campo}__gt": cursor.momento}) | Q(
+        **{campo: cursor.momento, "id__gt": cursor.id}
+    )
+
+
+def pagina_de_alteracoes(
+    desde=None, cursor=None, limite=LIMITE_PADRAO, bens=None, excluidos=None
+):
+    """
+    Uma página do feed. `bens` e `excluidos` permitem restringir os querysets
+    (ex.: unidade do operador, select_related do serializer).
+    """
+    if bens is None:
+        bens = BemPatrimonial.objects.all()
+    if excluidos is None:
+        excluidos = BemPatrimonialExcluido.objects.all()
+    if cursor is None:
+        ate = timezone.now() - timedelta(seconds=settings.FEED_ALTERACOES_MARGEM_SEGUNDOS)
+        if desde is not None and desde > ate:
+            ate = desde
+        cursor = Cursor(ate, desde, EXCLUIDO, None)
+
+    fontes = (
+        (ALTERADO, "atualizado_em", bens),
+        (EXCLUIDO, "excluido_em", excluidos),
+    )
+    linhas = [
+        [
+            (getattr(objeto, campo), tipo, objeto.pk, objeto)
+            for objeto in queryset.filter(
+                _depois_do_cursor(campo, tipo, cursor), **{f"{campo}__lte": cursor.ate}
+            ).order_by(campo, "id")[: limite + 1]
+        ]
+        for tipo, campo, queryset in fontes
+    ]
+    ordenadas = list(heapq.merge(*linhas, key=lambda linha: linha[:3]))
+    pagina = ordenadas[:limite]
+
+    proximo = None
+    if len(ordenadas) > limite:
+        momento, tipo, pk, _ = pagina[-1]
+        proximo = Cursor(cursor.ate, momento, tipo, pk)
+    return Pagina(
+        [objeto for _, tipo, _, objeto in pagina if tipo == ALTERADO],
+        [objeto for _, tipo, _, objeto in pagina if tipo == EXCLUIDO],
+        proximo,
+        cursor.ate,
+    )
@@ -4,6 +4,7 @@ from io import BytesIO
 from django.conf import settings
 from django.utils import timezone
 from import_export.formats.base_formats import Format
+from dados_comuns import metricas
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import cm
@@ -28,6 +29,7 @@ class PDFFormat(Format):
     def create_dataset(self, in_stream):
         raise NotImplementedError("Importação não é suportada para PDF.")
 
+    @metricas.cronometrado(metricas.EXPORTACAO_DURACAO, formato="pdf")
     def export_data(self, dataset, **kwargs):
         request = getattr(self, "_export_request", None)
         queryset = getattr(self, "_export_queryset", None)
@@ -35,6 +37,7 @@ class PDFFormat(Format):
         bens_list = list(queryset) if queryset is not None else []
 
         total_registros = len(bens_list)
+        metricas.EXPORTACAO_LINHAS.inc(total_registros, formato="pdf")
 
         valor_total = sum(bem.valor_unitario or Decimal("0.00") for bem in bens_list)
         localizacoes_unicas = len(
@@ -66,6 +69,7 @@ class PDFFormat(Format):
             elements.extend(
                 self._criar_resumo(total_registros, valor_total, localizacoes_unicas)
             )
+            elements.extend(self._criar_resumo_unidades(bens_list))
 
         elements.extend(self._criar_rodape())
 
@@ -383,6 +387,97 @@ class PDFFormat(Format):
 
         return elements
 
+    def _criar_resumo_unidades(self, bens_list):
+        """
+        Inventário completo das unidades presentes no relatório, lido do
+        resumo materializado (uma consulta, independente do número de bens).
+        Os totais são de todos os bens de cada unidade, não só dos exportados:
+        com filtros eles diferem do resumo acima, e o título diz isso.
+        """
+        from bem_patrimonial.models import ResumoInventarioUnidade
+
+        unidade_ids = {
+            bem.unidade_administrativa_id
+            for bem in bens_list
+            if bem.unidade_administrativa_id
+        }
+        resumos = list(
+            ResumoInventarioUnidade.objects.filter(
+                unidade_administrativa_id__in=unidade_ids
+            )
+            .select_related("unidade_administrativa")
+            .order_by("unidade_administrativa__codigo")
+        )
+        if not resumos:
+            return []
+
+        def _moeda(valor):
+            return (
+                f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            )
+
+        styles = getSampleStyleSheet()
+        data = [
+            [
+                "Unidade",
+                "Total de Bens",
+                "Valor Total (R$)",
+                "Aprovados",
+                "Aguardando Aprovação",
+                "Bloqueados",
+                "Movimentações Pendentes",
+            ]
+        ]
+        for resumo in resumos:
+            data.append(
+                [
+                    Paragraph(str(resumo.unidade_administrativa), styles["Normal"]),
+                    str(resumo.total_bens),
+                    _moeda(resumo.valor_total),
+                    str(resumo.total_aprovados),
+                    str(resumo.total_aguardando_aprovacao),
+                    str(resumo.total_bloqueados),
+                    str(
+                        resumo.movimentacoes_pendentes_saida
+                        + resumo.movimentacoes_pendentes_entrada
+                    ),
+                ]
+            )
+
+        table = Table(data, colWidths=[9 * cm] + [None] * 6, repeatRows=1)
+        table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#149f67")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 8),
+                    ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                    ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#149f67")),
+                    ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#149f67")),
+                ]
+            )
+        )
+
+        titulo_style = ParagraphStyle(
+            "ResumoUnidades", parent=styles["Heading4"], textColor=colors.HexColor("#149f67")
+        )
+        nota_style = ParagraphStyle(
+            "ResumoUnidadesNota", parent=styles["Normal"], fontSize=7, textColor=colors.grey
+        )
+        return [
+            Spacer(1, 0.5 * cm),
+            Paragraph("Inventário completo das unidades do relatório", titulo_style),
+            Paragraph(
+                "Totais de todos os bens de cada unidade, independentemente dos "
+                "filtros aplicados a este relatório.",
+                nota_style,
+            ),
+            Spacer(1, 0.2 * cm),
+            table,
+        ]
+
     def _adicionar_numero_pagina(self, canvas, doc):
         canvas.saveState()
 
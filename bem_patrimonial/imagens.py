@@ -0,0 +1,183 @@
+"""
+Fotos dos bens.
+
+No upload a foto é validada (formato e tamanho do arquivo). Depois
+da gravação, em segundo plano, o original é normalizado (orientação do EXIF
+aplicada, metadados removidos, reduzido a FOTO_DIMENSAO_MAXIMA) numa cópia com
+nome novo e são geradas miniaturas de tamanho fixo em WebP e JPEG ao lado dela:
+
+    bens/mesa_Ab12Cd3.jpg -> bens/mesa_Ab12Cd3__lista.webp, bens/mesa_Ab12Cd3__lista.jpg,
+                             bens/mesa_Ab12Cd3__previa.webp, bens/mesa_Ab12Cd3__previa.jpg
+
+O bem passa a apontar para a cópia e só então o arquivo enviado é removido.
+BemPatrimonial.foto_processada indica que as miniaturas existem; até lá as
+telas usam o original. Fotos pendentes (anteriores a este processamento ou
+de uma thread interrompida) são processadas pelo comando processar_fotos.
+"""
+
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from dados_comuns.context import com_contexto
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_ACEITOS = {"JPEG", "PNG", "WEBP"}
+MINIATURAS = {"lista": (96, 96), "previa": (480, 480)}
+FORMATOS_MINIATURA = {"webp": "WEBP", "jpg": "JPEG"}
+QUALIDADE = 82
+
+
+def validar_foto(arquivo):
+    # Fotos já gravadas não são revalidadas: full_clean() roda em edições,
+    # importações e lotes, e reabrir o arquivo falharia se ele não existir mais.
+    if getattr(arquivo, "_committed", False):
+        return
+    limite_mb = getattr(settings, "FOTO_TAMANHO_MAXIMO_MB", 10)
+    try:
+        if arquivo.size > limite_mb * 1024 * 1024:
+            raise ValidationError(f"A foto deve ter no máximo {limite_mb} MB.")
+        arquivo.seek(0)
+        with Image.open(arquivo) as imagem:
+            formato = imagem.format
+            imagem.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise ValidationError("Arquivo de imagem inválido.")
+    finally:
+        arquivo.seek(0)
+    if formato not in FORMATOS_ACEITOS:
+        raise ValidationError("Envie a foto em JPEG, PNG ou WebP.")
+
+
+def nome_miniatura(nome, tamanho, extensao):
+    base, _ = os.path.splitext(nome)
+    return f"{base}__{tamanho}.{extensao}"
+
+
+def urls_miniatura(bem, tamanho):
+    """{"webp": url, "jpg": url} da miniatura, o original enquanto ela não existe, ou None."""
+    if not bem.foto:
+        return None
+    if not bem.foto_processada:
+        return {"webp": None, "jpg": bem.foto.url}
+    storage = bem.foto.storage
+    return {
+        extensao: storage.url(nome_miniatura(bem.foto.name, tamanho, extensao))
+        for extensao in FORMATOS_MINIATURA
+    }
+
+
+def _codificar(imagem, formato):
+    buffer = BytesIO()
+    opcoes = {
+        "JPEG": {"quality": QUALIDADE, "optimize": True},
+        "WEBP": {"quality": QUALIDADE},
+        "PNG": {"optimize": True},
+    }[formato]
+    # Sem o argumento exif, nenhum metadado do original é gravado.
+    imagem.save(buffer, formato, **opcoes)
+    return ContentFile(buffer.getvalue())
+
+
+def _gravar_miniatura(storage, nome, imagem, formato):
+    # Miniaturas podem ser geradas de novo a partir do original: substituir é seguro.
+    if storage.exists(nome):
+        storage.delete(nome)
+    storage.save(nome, _codificar(imagem, formato))
+
+
+def _para_rgb(imagem):
+    if imagem.mode in ("RGBA", "LA", "P"):
+        imagem = imagem.convert("RGBA")
+        fundo = Image.new("RGB", imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel("A"))
+        return fundo
+    return imagem.convert("RGB")
+
+
+def remover_derivados(storage, nome):
+    for tamanho in MINIATURAS:
+        for extensao in FORMATOS_MINIATURA:
+            derivado = nome_miniatura(nome, tamanho, extensao)
+            if storage.exists(derivado):
+                storage.delete(derivado)
+
+
+def processar_foto(bem_id, nome_anterior=None):
+    """Normaliza o original e gera as miniaturas da foto atual do bem."""
+    from bem_patrimonial.models import BemPatrimonial
+
+    bem = BemPatrimonial.objects.filter(pk=bem_id).only("id", "foto").first()
+    if bem is None or not bem.foto:
+        return
+    storage = bem.foto.storage
+    nome = bem.foto.name
+    if nome_anterior and nome_anterior != nome:
+        remover_derivados(storage, nome_anterior)
+
+    with storage.open(nome) as arquivo:
+        with Image.open(arquivo) as aberta:
+            formato = aberta.format
+            imagem = ImageOps.exif_transpose(aberta)
+    dimensao = getattr(settings, "FOTO_DIMENSAO_MAXIMA", 1600)
+    imagem.thumbnail((dimensao, dimensao), Image.Resampling.LANCZOS)
+    if formato == "JPEG":
+        imagem = _para_rgb(imagem)
+    # O original normalizado vai para um nome novo (o storage acrescenta um
+    # sufixo); o arquivo enviado só é removido depois que o bem aponta para a
+    # cópia, então uma falha ou o fim do processo no meio não perde a foto.
+    normalizado = storage.save(nome, _codificar(imagem, formato))
+
+    trocada = 0
+    try:
+        rgb = _para_rgb(imagem)
+        for tamanho, dimensoes in MINIATURAS.items():
+            miniatura = ImageOps.fit(rgb, dimensoes, Image.Resampling.LANCZOS)
+            for extensao, formato_miniatura in FORMATOS_MINIATURA.items():
+                _gravar_miniatura(
+                    storage,
+                    nome_miniatura(normalizado, tamanho, extensao),
+                    miniatura,
+                    formato_miniatura,
+                )
+        # Só troca se a foto não foi substituída durante o processamento.
+        trocada = BemPatrimonial.objects.filter(pk=bem_id, foto=nome).update(
+            foto=normalizado, foto_processada=True
+        )
+    finally:
+        if not trocada:
+            remover_derivados(storage, normalizado)
+            storage.delete(normalizado)
+    if trocada:
+        remover_derivados(storage, nome)
+        storage.delete(nome)
+
+
+def agendar_processamento(bem_id, nome_anterior=None):
+    """Processa a foto depois do commit, numa thread (FOTO_PROCESSAMENTO_EM_SEGUNDO_PLANO)."""
+    em_segundo_plano = getattr(settings, "FOTO_PROCESSAMENTO_EM_SEGUNDO_PLANO", True)
+
+    def executar():
+        try:
+            processar_foto(bem_id, nome_anterior)
+        except Exception:
+            logger.exception("Falha ao processar a foto do bem %s", bem_id)
+        finally:
+            if em_segundo_plano:
+                connections.close_all()
+
+    def iniciar():
+        if em_segundo_plano:
+            threading.Thread(target=com_contexto(executar), daemon=True).start()
+        else:
+            executar()
+
+    transaction.on_commit(iniciar)
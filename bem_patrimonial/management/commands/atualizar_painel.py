@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from bem_patrimonial.painel import WIDGETS, atualizar_painel
+
+
+class Command(BaseCommand):
+    help = """Recalcula os widgets do painel dos gestores (página inicial do admin)
+e grava no cache. Opcional: pode rodar via cron para que nenhuma requisição
+precise esperar o cálculo."""
+
+    def handle(self, *args, **options):
+        atualizar_painel()
+        self.stdout.write(
+            self.style.SUCCESS(f"Painel atualizado: {len(WIDGETS)} widget(s).")
+        )
@@ -0,0 +1,277 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bem_patrimonial import constants, dados_sinteticos
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.middleware import ContadorConsultas
+from usuario.models import Usuario
+
+CENARIOS = (
+    "changelist",
+    "busca",
+    "exportar_csv",
+    "exportar_xlsx",
+    "exportar_pdf",
+    "aprovar_movimentacao",
+    "historico_bem",
+    "autocomplete",
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[idx]
+
+
+def _executar(funcao):
+    contador = ContadorConsultas()
+    with ExitStack() as pilha:
+        for conexao in connections.all():
+            pilha.enter_context(conexao.execute_wrapper(contador))
+        inicio = time.perf_counter()
+        response = funcao()
+        duracao = (time.perf_counter() - inicio) * 1000
+    if response.status_code >= 400:
+        raise CommandError(f"Resposta {response.status_code} em {funcao.__name__}.")
+    return duracao, contador.total
+
+
+def _medir(funcao, repeticoes):
+    tempos, consultas = [], []
+    for _ in range(repeticoes):
+        duracao, total = _executar(funcao)
+        tempos.append(duracao)
+        consultas.append(total)
+
+    # Execução extra só para o pico de memória (o tracemalloc deixa tudo mais lento).
+    tracemalloc.start()
+    try:
+        _executar(funcao)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "media_ms": round(statistics.mean(tempos), 3),
+        "p50_ms": round(_percentil(tempos, 50), 3),
+        "p95_ms": round(_percentil(tempos, 95), 3),
+        "max_ms": round(max(tempos), 3),
+        "consultas": max(consultas),
+        "pico_memoria_kb": round(pico / 1024, 1),
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = """Mede as telas e ações principais do admin (lista de bens, busca,
+exportações CSV/XLSX/PDF, aprovação de movimentação e o histórico na tela do
+bem, autocomplete de unidades) com inventários sintéticos de vários tamanhos.
+
+Para cada escala gera os dados (bem_patrimonial/dados_sinteticos.py) numa
+transação que é desfeita ao final (use --manter para preservá-los) e registra
+latência, consultas e pico de memória (tracemalloc) de cada cenário. Cada
+execução é acrescentada ao arquivo --saida, com o commit atual, para comparar
+resultados entre commits. Rode num banco sem dados reais."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--escalas",
+            default="10000,100000,1000000",
+            help="Quantidades de bens, separadas por vírgula.",
+        )
+        parser.add_argument("--unidades", type=int, default=100)
+        parser.add_argument("--historico", type=int, default=3)
+        parser.add_argument("--movimentacoes", type=float, default=0.02)
+        parser.add_argument("--usuarios", type=int, default=20)
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument(
+            "--cenario",
+            action="append",
+            dest="cenarios",
+            choices=CENARIOS,
+            help="Cenário a medir (pode repetir). Padrão: todos.",
+        )
+        parser.add_argument("--termo", default="MESA")
+        parser.add_argument("--saida", default="bench_resultados.json")
+        parser.add_argument(
+            "--rotulo", help="Identificação da execução (padrão: commit atual)."
+        )
+        parser.add_argument("--manter", action="store_true")
+
+    def _cenarios(self, client, prefixo, options):
+        model_admin = admin.site._registry[BemPatrimonial]
+        formatos = {
+            formato().get_title(): str(i)
+            for i, formato in enumerate(model_admin.get_export_formats())
+        }
+        url_lista = reverse("admin:bem_patrimonial_bempatrimonial_changelist")
+        url_exportar = reverse("admin:bem_patrimonial_bempatrimonial_export")
+        url_movimentacoes = reverse(
+            "admin:bem_patrimonial_movimentacaobempatrimonial_changelist"
+        )
+        bem = BemPatrimonial.objects.filter(
+            numero_patrimonial__startswith=f"{prefixo}-"
+        ).earliest("pk")
+        pendentes = iter(
+            MovimentacaoBemPatrimonial.objects.filter(
+                status=constants.ENVIADA,
+                bem_patrimonial__numero_patrimonial__startswith=f"{prefixo}-",
+            )
+            .order_by("pk")
+            .values_list("pk", flat=True)[: options["repeticoes"] + 1]
+        )
+
+        def changelist():
+            return client.get(url_lista)
+
+        def busca():
+            return client.get(url_lista, {"q": options["termo"]})
+
+        def exportar(formato):
+            def exportar():
+                return client.post(url_exportar, {"file_format": formatos[formato]})
+
+            exportar.__name__ = f"exportar_{formato}"
+            return exportar
+
+        def aprovar_movimentacao():
+            pk = next(pendentes, None)
+            if pk is None:
+                raise CommandError(
+                    "Movimentações pendentes insuficientes; aumente --movimentacoes."
+                )
+            return client.post(
+                url_movimentacoes,
+                {"action": "aprovar_solicitacao", "_selected_action": [pk], "index": 0},
+            )
+
+        def autocomplete():
+            return client.get(
+                reverse("admin_autocomplete"),
+                {
+                    "app_label": "bem_patrimonial",
+                    "model_name": "bempatrimonial",
+                    "field_name": "unidade_administrativa",
+                    "term": "Unidade",
+                },
+            )
+
+        def historico_bem():
+            return client.get(
+                reverse("admin:bem_patrimonial_bempatrimonial_change", args=[bem.pk])
+            )
+
+        return {
+            "changelist": changelist,
+            "busca": busca,
+            "exportar_csv": exportar("csv"),
+            "exportar_xlsx": exportar("xlsx"),
+            "exportar_pdf": exportar("pdf"),
+            "aprovar_movimentacao": aprovar_movimentacao,
+            "historico_bem": historico_bem,
+            "autocomplete": autocomplete,
+        }
+
+    def _escala(self, indice, bens, options):
+        prefixo = f"BENCH{indice}"
+        unidades = max(1, min(options["unidades"], bens))
+        gerados = dados_sinteticos.gerar(
+            unidades=unidades,
+            bens_por_unidade=max(1, bens // unidades),
+            historico=options["historico"],
+            movimentacoes=options["movimentacoes"],
+            usuarios=options["usuarios"],
+            prefixo=prefixo,
+            progresso=self.stderr.write,
+        )
+        usuario = Usuario.objects.create(
+            username=f"{prefixo.lower()}_admin",
+            is_staff=True,
+            is_superuser=True,
+            must_change_password=False,
+        )
+        client = Client()
+        client.force_login(usuario)
+
+        funcoes = self._cenarios(client, prefixo, options)
+        cenarios = []
+        for nome in options["cenarios"] or CENARIOS:
+            self.stderr.write(f"{bens} bens: {nome}")
+            cenarios.append({"cenario": nome, **_medir(funcoes[nome], options["repeticoes"])})
+        return {"bens": gerados["bens"], "dados": gerados, "cenarios": cenarios}
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(e) for e in options["escalas"].split(",") if e.strip()]
+        except ValueError:
+            raise CommandError("--escalas deve ser uma lista de inteiros.")
+
+        execucao = {
+            "rotulo": options["rotulo"] or _commit_atual(),
+            "data": timezone.now().isoformat(),
+            "banco": connections["default"].vendor,
+            "repeticoes": options["repeticoes"],
+            "escalas": [],
+        }
+        # Os dados gerados ficam numa transação não confirmada no principal,
+        # invisível para a réplica: todas as leituras vão para o principal.
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"],
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            DATABASE_REPLICA_ALIAS=None,
+            REPLICA_LEITURA_PATHS=[],
+        ):
+            for indice, bens in enumerate(escalas):
+                try:
+                    with transaction.atomic():
+                        execucao["escalas"].append(self._escala(indice, bens, options))
+                        if not options["manter"]:
+                            raise _Rollback
+                except _Rollback:
+                    pass
+
+        execucoes = []
+        if os.path.exists(options["saida"]):
+            with open(options["saida"]) as arquivo:
+                execucoes = json.load(arquivo)
+        execucoes.append(execucao)
+        with open(options["saida"], "w") as arquivo:
+            json.dump(execucoes, arquivo, indent=2, ensure_ascii=False)
+
+        for escala in execucao["escalas"]:
+            for r in escala["cenarios"]:
+                self.stdout.write(
+                    f"{escala['bens']:>8} {r['cenario']:<21} média={r['media_ms']}ms "
+                    f"p95={r['p95_ms']}ms consultas={r['consultas']} "
+                    f"memória={r['pico_memoria_kb']}KB"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Resultados gravados em {options['saida']}."))
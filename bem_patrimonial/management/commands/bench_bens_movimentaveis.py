@@ -0,0 +1,166 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from bem_patrimonial import constants
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.models import Usuario
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _pagina(qs, contar):
+    itens = list(qs.order_by("-id")[:21])
+    return (itens, qs.count()) if contar else itens
+
+
+def _cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "media_ms": round(statistics.mean(tempos), 3),
+        "p50_ms": round(statistics.median(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = """Compara a consulta antiga de bens movimentáveis (JOIN + DISTINCT) com o
+NOT EXISTS de BemPatrimonial.objects.movimentaveis().
+
+Gera os bens numa transação que é desfeita ao final (use --manter para
+preservá-los) e mede a primeira página do autocomplete, com e sem busca e
+com e sem o COUNT(*) da paginação."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bens", type=int, default=1_000_000)
+        parser.add_argument("--unidades", type=int, default=50)
+        parser.add_argument(
+            "--pendentes",
+            type=float,
+            default=0.02,
+            help="Fração dos bens com movimentação enviada.",
+        )
+        parser.add_argument("--lote", type=int, default=10_000)
+        parser.add_argument("--repeticoes", type=int, default=20)
+        parser.add_argument("--termo", default="mesa")
+        parser.add_argument("--manter", action="store_true")
+        parser.add_argument("--json", action="store_true")
+
+    def _gerar(self, options):
+        unidades = UnidadeAdministrativa.objects.bulk_create(
+            [
+                UnidadeAdministrativa(
+                    codigo=f"BENCH-{i:04d}", sigla=f"BCH{i}", nome=f"Bench {i}"
+                )
+                for i in range(options["unidades"])
+            ]
+        )
+        usuario, _ = Usuario.objects.get_or_create(username="bench_movimentaveis")
+        nomes = ("MESA", "CADEIRA", "ARMÁRIO", "COMPUTADOR", "ESTANTE")
+        total = options["bens"]
+        a_cada = int(1 / options["pendentes"]) if options["pendentes"] > 0 else 0
+
+        for inicio in range(0, total, options["lote"]):
+            fim = min(total, inicio + options["lote"])
+            bens = BemPatrimonial.objects.bulk_create(
+                [
+                    BemPatrimonial(
+                        nome=f"{nomes[i % len(nomes)]} {i}",
+                        descricao="Gerado pelo bench_bens_movimentaveis",
+                        valor_unitario=10,
+                        marca="Bench",
+                        modelo="B",
+                        numero_patrimonial=f"BENCH-{i}",
+                        status=constants.APROVADO,
+                        unidade_administrativa=unidades[i % len(unidades)],
+                    )
+                    for i in range(inicio, fim)
+                ]
+            )
+            if a_cada:
+                MovimentacaoBemPatrimonial.objects.bulk_create(
+                    [
+                        MovimentacaoBemPatrimonial(
+                            bem_patrimonial=bem,
+                            unidade_administrativa_origem=bem.unidade_administrativa,
+                            unidade_administrativa_destino=unidades[0],
+                            solicitado_por=usuario,
+                            status=constants.ENVIADA,
+                        )
+                        for i, bem in enumerate(bens, start=inicio)
+                        if i % a_cada == 0
+                    ]
+                )
+            self.stderr.write(f"{fim}/{total} bens gerados")
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE bem_patrimonial_bempatrimonial")
+                cursor.execute("ANALYZE bem_patrimonial_movimentacaobempatrimonial")
+        return unidades[0]
+
+    def _medir(self, unidade, options):
+        antiga = (
+            BemPatrimonial.objects.filter(status=constants.APROVADO)
+            .exclude(movimentacaobempatrimonial__status=constants.ENVIADA)
+            .distinct()
+        )
+        nova = BemPatrimonial.objects.movimentaveis()
+        termo = options["termo"]
+        resultados = []
+        for nome, consulta in (("antiga", antiga), ("not_exists", nova)):
+            escopos = {"todas": consulta, "unidade": consulta.da_unidade(unidade.id)}
+            for escopo, qs in escopos.items():
+                # As duas consultas com e sem o COUNT(*) da paginação, para
+                # separar o ganho da consulta do ganho de não contar.
+                for contar in (True, False):
+
+                    def pagina(qs=qs, contar=contar):
+                        return _pagina(qs, contar)
+
+                    def busca(qs=qs, contar=contar):
+                        return _pagina(qs.filter(nome__icontains=termo), contar)
+
+                    for cenario, funcao in (("pagina", pagina), ("busca", busca)):
+                        resultados.append(
+                            {
+                                "consulta": nome,
+                                "escopo": escopo,
+                                "cenario": cenario,
+                                "contagem": contar,
+                                **_cronometrar(funcao, options["repeticoes"]),
+                            }
+                        )
+        return resultados
+
+    def handle(self, *args, **options):
+        resultados = []
+        try:
+            with transaction.atomic():
+                unidade = self._gerar(options)
+                resultados = self._medir(unidade, options)
+                if not options["manter"]:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+
+        for r in resultados:
+            contagem = "com COUNT" if r["contagem"] else "sem COUNT"
+            self.stdout.write(
+                f"{r['consulta']:<11} {r['escopo']:<8} {r['cenario']:<7} {contagem:<9} "
+                f"média={r['media_ms']}ms p50={r['p50_ms']}ms máx={r['max_ms']}ms"
+            )
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.utils.encoders import JSONEncoder
+
+from bem_patrimonial import feed
+from bem_patrimonial.api.serializers import (
+    BemPatrimonialExcluidoSerializer,
+    BemPatrimonialSerializer,
+)
+from bem_patrimonial.models import BemPatrimonial
+
+
+class Command(BaseCommand):
+    help = """Exporta, em JSON Lines, os bens gravados e excluídos desde uma marca
+(feed de alterações). Cada linha é {"tipo": "alterado", "bem": {...}} ou
+{"tipo": "excluido", "bem": {...}}; a nova marca é gravada em --arquivo-marca
+(ou exibida no final) para a próxima execução."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--desde",
+            help="Data/hora ISO 8601. Padrão: conteúdo de --arquivo-marca ou desde o início.",
+        )
+        parser.add_argument(
+            "--arquivo-marca",
+            help="Arquivo com a marca da última exportação; é atualizado ao final.",
+        )
+        parser.add_argument(
+            "--saida",
+            help="Arquivo de saída. Padrão: saída padrão.",
+        )
+        parser.add_argument(
+            "--limite",
+            type=int,
+            default=feed.LIMITE_MAXIMO,
+            help="Bens por consulta.",
+        )
+
+    def handle(self, *args, **options):
+        arquivo_marca = options["arquivo_marca"] and Path(options["arquivo_marca"])
+        valor_desde = options["desde"]
+        if not valor_desde and arquivo_marca and arquivo_marca.exists():
+            valor_desde = arquivo_marca.read_text().strip()
+        try:
+            desde = feed.ler_momento(valor_desde) if valor_desde else None
+        except ValueError:
+            raise CommandError(f"Data inválida: {valor_desde}")
+
+        bens = BemPatrimonial.objects.select_related(
+            "unidade_administrativa", "criado_por"
+        )
+        saida = open(options["saida"], "w") if options["saida"] else self.stdout
+        alterados = excluidos = 0
+        cursor = None
+        try:
+            while True:
+                pagina = feed.pagina_de_alteracoes(
+                    desde, cursor, options["limite"], bens=bens
+                )
+                for tipo, serializer in (
+                    ("alterado", BemPatrimonialSerializer(pagina.alterados, many=True)),
+                    ("excluido", BemPatrimonialExcluidoSerializer(pagina.excluidos, many=True)),
+                ):
+                    for bem in serializer.data:
+                        linha = json.dumps({"tipo": tipo, "bem": bem}, cls=JSONEncoder)
+                        saida.write(linha + "\n")
+                alterados += len(pagina.alterados)
+                excluidos += len(pagina.excluidos)
+                if pagina.proximo is None:
+                    break
+                cursor = pagina.proximo
+        finally:
+            if saida is not self.stdout:
+                saida.close()
+
+        marca = pagina.marca.isoformat()
+        if arquivo_marca:
+            arquivo_marca.write_text(marca + "\n")
+        self.stderr.write(
+            f"{alterados} bem(ns) alterado(s) e {excluidos} excluído(s); marca: {marca}"
+        )
@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bem_patrimonial import dados_sinteticos
+from dados_comuns.models import UnidadeAdministrativa
+
+
+class Command(BaseCommand):
+    help = """Gera um inventário sintético (unidades, operadores, bens, status,
+histórico e movimentações pendentes) com bulk_create/COPY, para testes de
+carga e para o comando bench. Use só em bancos de desenvolvimento."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unidades", type=int, default=50)
+        parser.add_argument("--bens-por-unidade", type=int, default=200)
+        parser.add_argument(
+            "--historico",
+            type=int,
+            default=3,
+            help="Registros no histórico geral por bem.",
+        )
+        parser.add_argument(
+            "--movimentacoes",
+            type=float,
+            default=0.02,
+            help="Fração dos bens aprovados com movimentação enviada.",
+        )
+        parser.add_argument("--usuarios", type=int, default=10)
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument(
+            "--prefixo",
+            default="SINT",
+            help="Prefixo dos códigos de unidade, usuários e números patrimoniais.",
+        )
+        parser.add_argument("--semente", type=int, default=0)
+
+    def handle(self, *args, **options):
+        prefixo = options["prefixo"]
+        if UnidadeAdministrativa.objects.filter(codigo__startswith=f"{prefixo}-").exists():
+            raise CommandError(
+                f"Já existem dados com o prefixo {prefixo}; use outro --prefixo."
+            )
+
+        with transaction.atomic():
+            contagens = dados_sinteticos.gerar(
+                unidades=options["unidades"],
+                bens_por_unidade=options["bens_por_unidade"],
+                historico=options["historico"],
+                movimentacoes=options["movimentacoes"],
+                usuarios=options["usuarios"],
+                lote=options["lote"],
+                prefixo=prefixo,
+                semente=options["semente"],
+                progresso=self.stderr.write,
+            )
+        self.stdout.write(self.style.SUCCESS(json.dumps(contagens)))
@@ -0,0 +1,44 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from bem_patrimonial import imagens
+from bem_patrimonial.models import BemPatrimonial
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """Normaliza as fotos dos bens e gera as miniaturas (bem_patrimonial/imagens.py)
+na própria execução, sem thread. Use --pendentes para processar só as fotos
+ainda sem miniaturas: as anteriores ao processamento automático e as de
+threads interrompidas (ex.: worker reciclado). Sem a opção, processa todas as
+fotos de novo (ex.: depois de mudar os tamanhos das miniaturas)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pendentes",
+            action="store_true",
+            help="Apenas bens com foto e foto_processada=False.",
+        )
+
+    def handle(self, *args, **options):
+        bens = BemPatrimonial.objects.exclude(foto="").exclude(foto__isnull=True)
+        if options["pendentes"]:
+            bens = bens.filter(foto_processada=False)
+        ids = list(bens.order_by("pk").values_list("pk", flat=True))
+
+        falhas = 0
+        for posicao, bem_id in enumerate(ids, start=1):
+            try:
+                imagens.processar_foto(bem_id)
+            except Exception:
+                falhas += 1
+                logger.exception("Falha ao processar a foto do bem %s", bem_id)
+            if posicao % 100 == 0:
+                self.stderr.write(f"{posicao}/{len(ids)} fotos processadas")
+
+        mensagem = f"{len(ids) - falhas} foto(s) processada(s), {falhas} falha(s)."
+        self.stdout.write(
+            self.style.WARNING(mensagem) if falhas else self.style.SUCCESS(mensagem)
+        )
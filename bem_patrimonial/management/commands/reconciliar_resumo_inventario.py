@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from bem_patrimonial.resumo import recalcular
+
+
+class Command(BaseCommand):
+    help = """Recalcula o resumo do inventário por unidade administrativa a partir
+dos bens e movimentações e corrige as divergências. Pensado para rodar
+periodicamente (ex.: cron diário)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--unidade",
+            type=int,
+            action="append",
+            dest="unidades",
+            help="Id da unidade administrativa (pode repetir). Padrão: todas.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            divergentes = recalcular(options["unidades"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resumo do inventário reconciliado: {divergentes} unidade(s) divergente(s) corrigida(s)."
+            )
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-19 17:41
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não bloqueia as escritas nas tabelas durante a
+    # construção, mas não pode rodar dentro de uma transação.
+    atomic = False
+
+    dependencies = [
+        ('bem_patrimonial', '0010_corrige_unidades_por_movimentacao'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bempatrimonial',
+            index=models.Index(condition=models.Q(('status', 'aprovado')), fields=['unidade_administrativa', 'id'], name='bem_aprovado_ua_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movimentacaobempatrimonial',
+            index=models.Index(condition=models.Q(('status', 'enviada')), fields=['bem_patrimonial'], name='mov_enviada_bem_idx'),
+        ),
+    ]
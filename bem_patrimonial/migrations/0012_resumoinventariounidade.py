@@ -0,0 +1,92 @@
+# Generated by Django 4.1.3 on 2026-10-19 18:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Carga inicial do resumo; depois ele é mantido pelos caminhos de escrita e
+# pelo comando reconciliar_resumo_inventario.
+SQL_CARGA_RESUMO_INVENTARIO = r"""
+INSERT INTO bem_patrimonial_resumoinventariounidade (
+    unidade_administrativa_id,
+    total_bens,
+    valor_total,
+    total_aguardando_aprovacao,
+    total_aprovados,
+    total_nao_aprovados,
+    total_bloqueados,
+    movimentacoes_pendentes_saida,
+    movimentacoes_pendentes_entrada,
+    atualizado_em
+)
+SELECT
+    ua.id,
+    COALESCE(b.total_bens, 0),
+    COALESCE(b.valor_total, 0),
+    COALESCE(b.total_aguardando_aprovacao, 0),
+    COALESCE(b.total_aprovados, 0),
+    COALESCE(b.total_nao_aprovados, 0),
+    COALESCE(b.total_bloqueados, 0),
+    COALESCE(saida.total, 0),
+    COALESCE(entrada.total, 0),
+    NOW()
+FROM dados_comuns_unidadeadministrativa AS ua
+LEFT JOIN (
+    SELECT
+        unidade_administrativa_id,
+        COUNT(*) AS total_bens,
+        SUM(valor_unitario) AS valor_total,
+        COUNT(*) FILTER (WHERE status = 'aguardando_aprovacao') AS total_aguardando_aprovacao,
+        COUNT(*) FILTER (WHERE status = 'aprovado') AS total_aprovados,
+        COUNT(*) FILTER (WHERE status = 'nao_aprovado') AS total_nao_aprovados,
+        COUNT(*) FILTER (WHERE status = 'bloqueado') AS total_bloqueados
+    FROM bem_patrimonial_bempatrimonial
+    WHERE unidade_administrativa_id IS NOT NULL
+    GROUP BY unidade_administrativa_id
+) AS b ON b.unidade_administrativa_id = ua.id
+LEFT JOIN (
+    SELECT unidade_administrativa_origem_id AS unidade_id, COUNT(*) AS total
+    FROM bem_patrimonial_movimentacaobempatrimonial
+    WHERE status = 'enviada'
+    GROUP BY unidade_administrativa_origem_id
+) AS saida ON saida.unidade_id = ua.id
+LEFT JOIN (
+    SELECT unidade_administrativa_destino_id AS unidade_id, COUNT(*) AS total
+    FROM bem_patrimonial_movimentacaobempatrimonial
+    WHERE status = 'enviada'
+    GROUP BY unidade_administrativa_destino_id
+) AS entrada ON entrada.unidade_id = ua.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dados_comuns', '0005_historicogeral_and_more'),
+        ('bem_patrimonial', '0011_indices_parciais_movimentaveis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoInventarioUnidade',
+            fields=[
+                ('unidade_administrativa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo_inventario', serialize=False, to='dados_comuns.unidadeadministrativa', verbose_name='Unidade administrativa')),
+                ('total_bens', models.IntegerField(default=0, verbose_name='Total de bens')),
+                ('valor_total', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='Valor total')),
+                ('total_aguardando_aprovacao', models.IntegerField(default=0, verbose_name='Aguardando aprovação')),
+                ('total_aprovados', models.IntegerField(default=0, verbose_name='Aprovados')),
+                ('total_nao_aprovados', models.IntegerField(default=0, verbose_name='Não aprovados')),
+                ('total_bloqueados', models.IntegerField(default=0, verbose_name='Bloqueados')),
+                ('movimentacoes_pendentes_saida', models.IntegerField(default=0, verbose_name='Movimentações pendentes (saída)')),
+                ('movimentacoes_pendentes_entrada', models.IntegerField(default=0, verbose_name='Movimentações pendentes (entrada)')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'resumo do inventário',
+                'verbose_name_plural': 'resumo do inventário por unidade',
+            },
+        ),
+        migrations.RunSQL(
+            sql=SQL_CARGA_RESUMO_INVENTARIO,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.1.3 on 2026-10-19 18:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('dados_comuns', '0005_historicogeral_and_more'),
+        ('bem_patrimonial', '0012_resumoinventariounidade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BemPatrimonialExcluido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bem_id', models.IntegerField(verbose_name='Id do bem')),
+                ('numero_patrimonial', models.CharField(blank=True, max_length=20, null=True, verbose_name='Número Patrimonial')),
+                ('excluido_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Excluído em')),
+            ],
+            options={
+                'verbose_name': 'bem patrimonial excluído',
+                'verbose_name_plural': 'bens patrimoniais excluídos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bempatrimonial',
+            index=models.Index(fields=['atualizado_em', 'id'], name='bem_atualizado_em_idx'),
+        ),
+        migrations.AddField(
+            model_name='bempatrimonialexcluido',
+            name='excluido_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Excluído por'),
+        ),
+        migrations.AddField(
+            model_name='bempatrimonialexcluido',
+            name='unidade_administrativa',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dados_comuns.unidadeadministrativa', verbose_name='Unidade administrativa'),
+        ),
+        migrations.AddIndex(
+            model_name='bempatrimonialexcluido',
+            index=models.Index(fields=['excluido_em', 'id'], name='bem_excluido_em_idx'),
+        ),
+    ]
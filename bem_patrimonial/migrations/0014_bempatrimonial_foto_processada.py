@@ -0,0 +1,24 @@
+# Generated by Django 4.1.3 on 2026-10-19 19:01
+
+import bem_patrimonial.imagens
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bem_patrimonial', '0013_bempatrimonialexcluido_indice_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bempatrimonial',
+            name='foto_processada',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Miniaturas geradas'),
+        ),
+        migrations.AlterField(
+            model_name='bempatrimonial',
+            name='foto',
+            field=models.ImageField(blank=True, null=True, upload_to='bens/', validators=[bem_patrimonial.imagens.validar_foto], verbose_name='Foto'),
+        ),
+    ]
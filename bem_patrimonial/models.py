@@ -1,25 +1,42 @@
 from datetime import datetime
 import re
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Exists, OuterRef, Q
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from dados_comuns import metricas
 from dados_comuns.models import HistoricoGeral
 from dados_comuns.context import get_user
 from dados_comuns.utils import dict_changes
 from dados_comuns.models import UnidadeAdministrativa
 from usuario.models import Usuario
-from bem_patrimonial.emails import (
-    envia_email_nova_solicitacao_movimentacao,
-    envia_email_cadastro_nao_aprovado,
-)
+from bem_patrimonial.emails import envia_email_cadastro_nao_aprovado
 from bem_patrimonial import constants
+from bem_patrimonial.imagens import agendar_processamento, validar_foto
 
 NPAT_NUM_REGEX = r"^\d{3}\.\d{9}-\d$"
 NPAT_AUTO_REGEX = r"^SEM-NUMERO-\d+$"
 
 
+class BemPatrimonialQuerySet(models.QuerySet):
+    def movimentaveis(self):
+        """
+        Bens aprovados e sem movimentação enviada (pendente). O filtro de
+        pendência é um NOT EXISTS, servido pelos índices parciais de status,
+        em vez de JOIN + DISTINCT sobre toda a tabela.
+        """
+        pendentes = MovimentacaoBemPatrimonial.objects.filter(
+            bem_patrimonial=OuterRef("pk"), status=constants.ENVIADA
+        )
+        return self.filter(status=constants.APROVADO).filter(~Exists(pendentes))
+
+    def da_unidade(self, unidade_administrativa_id):
+        return self.filter(unidade_administrativa_id=unidade_administrativa_id)
+
+
 class BemPatrimonial(models.Model):
     "Classe que representa um bem patrimonial"
 
@@ -55,7 +72,12 @@ class BemPatrimonial(models.Model):
         default=False,
         help_text="Se marcado, o sistema atribui automaticamente",
     )
-    foto = models.ImageField("Foto", upload_to="bens/", null=True, blank=True)
+    foto = models.ImageField(
+        "Foto", upload_to="bens/", null=True, blank=True, validators=[validar_foto]
+    )
+    foto_processada = models.BooleanField(
+        "Miniaturas geradas", default=False, editable=False
+    )
     status = models.CharField(
         "Status",
         max_length=30,
@@ -100,6 +122,8 @@ class BemPatrimonial(models.Model):
     )
     AUDIT_IGNORE_FIELDS = ("id", "criado_em", "atualizado_em", "criado_por")
 
+    objects = BemPatrimonialQuerySet.as_manager()
+
     def __str__(self):
         return (
             f"{self.numero_patrimonial} - {self.nome}"
@@ -110,6 +134,15 @@ class BemPatrimonial(models.Model):
     class Meta:
         verbose_name = "bem patrimonial"
         verbose_name_plural = "bens patrimoniais"
+        indexes = [
+            models.Index(
+                fields=["unidade_administrativa", "id"],
+                condition=Q(status=constants.APROVADO),
+                name="bem_aprovado_ua_idx",
+            ),
+            # Feed de alterações (bem_patrimonial/feed.py)
+            models.Index(fields=["atualizado_em", "id"], name="bem_atualizado_em_idx"),
+        ]
 
     def clean(self):
         if not self.pk and self.numero_formato_antigo and self.sem_numeracao:
@@ -145,8 +178,21 @@ class BemPatrimonial(models.Model):
 
         gerar_auto = bool(self.sem_numeracao and not self.numero_patrimonial)
 
+        foto_anterior = original.foto.name if original and original.foto else None
+        foto_nova = bool(self.foto) and (
+            not self.foto._committed or self.foto.name != foto_anterior
+        )
+        if foto_nova:
+            self.foto_processada = False
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "foto_processada" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "foto_processada"]
+
         super(BemPatrimonial, self).save(*args, **kwargs)
 
+        if foto_nova:
+            agendar_processamento(self.pk, foto_anterior)
+
         if gerar_auto and not self.numero_patrimonial:
             base_id = self.pk
 
@@ -163,6 +209,10 @@ class BemPatrimonial(models.Model):
 
             self.numero_patrimonial = numero_formatado
             super(BemPatrimonial, self).save(update_fields=["numero_patrimonial"])
+        from bem_patrimonial import eventos
+
+        eventos.bem_gravado(original, self)
+
         if not is_create and original:
             # respeita update_fields (se veio)
             only = kwargs.get("update_fields")
@@ -205,6 +255,131 @@ class BemPatrimonial(models.Model):
         self.unidade_administrativa = unidade
         self.save()
 
+    def alterar_status(self, status, usuario=None, observacao=None):
+        """Registra um StatusBemPatrimonial e sincroniza o status do bem."""
+        registro = StatusBemPatrimonial(
+            bem_patrimonial=self,
+            status=status,
+            atualizado_por=usuario,
+            observacao=observacao,
+        )
+        StatusBemPatrimonial.objects.registrar([registro])
+        return registro
+
+
+def sincronizar_status_bens(registros):
+    """
+    Aplica aos bens, na ordem, o status dos registros de StatusBemPatrimonial:
+    bens já aprovados não mudam. Usa o bem em memória quando já carregado (ou
+    lê só o status), um UPDATE ... WHERE status <> aprovado por status final
+    e um único bulk_create do histórico, em vez de bem.save() por registro.
+    """
+    registros = [r for r in registros if r.bem_patrimonial_id]
+    if not registros:
+        return
+
+    atuais = {}
+    unidades = {}
+    carregados = {}
+    for registro in registros:
+        if StatusBemPatrimonial.bem_patrimonial.is_cached(registro):
+            bem = registro.bem_patrimonial
+            atuais.setdefault(bem.pk, bem.status)
+            unidades.setdefault(bem.pk, bem.unidade_administrativa_id)
+            carregados.setdefault(bem.pk, []).append(bem)
+    faltantes = {r.bem_patrimonial_id for r in registros} - set(atuais)
+    if faltantes:
+        for bem_id, status, unidade_id in BemPatrimonial.objects.filter(
+            pk__in=faltantes
+        ).values_list("pk", "status", "unidade_administrativa_id"):
+            atuais[bem_id] = status
+            unidades[bem_id] = unidade_id
+    iniciais = dict(atuais)
+
+    transicoes = []
+    finais = {}
+    for registro in registros:
+        bem_id = registro.bem_patrimonial_id
+        antigo = atuais.get(bem_id)
+        if antigo is None or antigo == constants.APROVADO:
+            continue
+        if antigo != registro.status:
+            transicoes.append((bem_id, antigo, registro.status))
+        atuais[bem_id] = finais[bem_id] = registro.status
+
+    if not finais:
+        return
+
+    agora = timezone.now()
+    por_status = {}
+    for bem_id, status in finais.items():
+        por_status.setdefault(status, []).append(bem_id)
+    for status, ids in por_status.items():
+        # criado_em também é auto_now no model; mantém o que o save() faria.
+        BemPatrimonial.objects.filter(pk__in=ids).exclude(
+            status=constants.APROVADO
+        ).update(status=status, atualizado_em=agora, criado_em=agora)
+
+    for bem_id, bens in carregados.items():
+        if bem_id in finais:
+            for bem in bens:
+                bem.status = finais[bem_id]
+                bem.atualizado_em = bem.criado_em = agora
+
+    if transicoes:
+        ct = ContentType.objects.get_for_model(BemPatrimonial)
+        usuario = get_user()
+        HistoricoGeral.objects.bulk_create(
+            [
+                HistoricoGeral(
+                    content_type=ct,
+                    object_id=str(bem_id),
+                    campo="status",
+                    valor_antigo=antigo,
+                    valor_novo=novo,
+                    alterado_por=usuario,
+                    alterado_em=agora,
+                )
+                for bem_id, antigo, novo in transicoes
+            ]
+        )
+
+    from bem_patrimonial import eventos
+
+    eventos.status_alterados(
+        [(unidades[bem_id], iniciais[bem_id], status) for bem_id, status in finais.items()]
+    )
+
+
+class StatusBemPatrimonialQuerySet(models.QuerySet):
+    def registrar(self, registros):
+        """
+        Grava N registros de status (novos ou alterados, como os de um formset)
+        em O(1) consultas: sincroniza os bens, bulk_create dos novos e
+        bulk_update dos existentes. Os novos reprovados disparam o mesmo
+        e-mail do post_save, que o bulk_create não emite.
+        """
+        registros = list(registros)
+        if not registros:
+            return registros
+        agora = timezone.now()
+        for registro in registros:
+            registro.atualizado_em = agora
+        novos = [r for r in registros if r._state.adding]
+        existentes = [r for r in registros if not r._state.adding]
+
+        sincronizar_status_bens(registros)
+        self.bulk_create(novos)
+        if existentes:
+            self.bulk_update(
+                existentes, ["status", "observacao", "atualizado_por", "atualizado_em"]
+            )
+
+        for registro in novos:
+            if registro.status == constants.NAO_APROVADO:
+                envia_email_cadastro_nao_aprovado(registro)
+        return registros
+
 
 class StatusBemPatrimonial(models.Model):
     "Classe que representa o histórico de mudança de status do bem patrimonial"
@@ -238,6 +413,8 @@ class StatusBemPatrimonial(models.Model):
         "Atualizado em", auto_now=True, null=True, blank=True
     )
 
+    objects = StatusBemPatrimonialQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         self.atualizado_em = datetime.now()
         self.sincroniza_status_bem_patrimonial()
@@ -251,9 +428,7 @@ class StatusBemPatrimonial(models.Model):
         verbose_name_plural = "histórico status do bem patrimonial"
 
     def sincroniza_status_bem_patrimonial(self):
-        if self.bem_patrimonial.status is not constants.APROVADO:
-            self.bem_patrimonial.status = self.status
-            self.bem_patrimonial.save()
+        sincronizar_status_bens([self])
 
 
 class MovimentacaoBemPatrimonial(models.Model):
@@ -336,6 +511,13 @@ class MovimentacaoBemPatrimonial(models.Model):
     class Meta:
         verbose_name = "movimentação de bem patrimonial"
         verbose_name_plural = "movimentações de bem patrimonial"
+        indexes = [
+            models.Index(
+                fields=["bem_patrimonial"],
+                condition=Q(status=constants.ENVIADA),
+                name="mov_enviada_bem_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.atualizado_em:
@@ -366,12 +548,21 @@ class MovimentacaoBemPatrimonial(models.Model):
         self.status = constants.ACEITA
         self.aprovado_por = usuario
         self.save()
+        self._concluir_pendencia()
+        metricas.MOVIMENTACOES.inc(acao="aprovada")
+
+    def _concluir_pendencia(self):
+        from bem_patrimonial import eventos
+
+        eventos.movimentacoes_concluidas([self])
 
     def rejeitar_solicitacao(self, usuario):
         if not self.rejeitada and self.status == constants.ENVIADA:
             self.status = constants.REJEITADA
             self.rejeitado_por = usuario
             self.save()
+            self._concluir_pendencia()
+            metricas.MOVIMENTACOES.inc(acao="rejeitada")
 
             self.bem_patrimonial.status = constants.APROVADO
             self.bem_patrimonial.save()
@@ -381,50 +572,135 @@ class MovimentacaoBemPatrimonial(models.Model):
             self.status = constants.CANCELADA
             self.cancelado_por = usuario
             self.save()
+            self._concluir_pendencia()
+            metricas.MOVIMENTACOES.inc(acao="cancelada")
 
             self.bem_patrimonial.status = constants.APROVADO
             self.bem_patrimonial.save()
 
 
+class ResumoInventarioUnidade(models.Model):
+    "Totais do inventário por unidade administrativa, mantidos incrementalmente"
+
+    unidade_administrativa = models.OneToOneField(
+        UnidadeAdministrativa,
+        verbose_name="Unidade administrativa",
+        related_name="resumo_inventario",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    total_bens = models.IntegerField("Total de bens", default=0)
+    valor_total = models.DecimalField(
+        "Valor total", max_digits=20, decimal_places=2, default=0
+    )
+    total_aguardando_aprovacao = models.IntegerField(
+        "Aguardando aprovação", default=0
+    )
+    total_aprovados = models.IntegerField("Aprovados", default=0)
+    total_nao_aprovados = models.IntegerField("Não aprovados", default=0)
+    total_bloqueados = models.IntegerField("Bloqueados", default=0)
+    movimentacoes_pendentes_saida = models.IntegerField(
+        "Movimentações pendentes (saída)", default=0
+    )
+    movimentacoes_pendentes_entrada = models.IntegerField(
+        "Movimentações pendentes (entrada)", default=0
+    )
+    atualizado_em = models.DateTimeField("Atualizado em", auto_now=True)
+
+    def __str__(self) -> str:
+        return str(self.unidade_administrativa)
+
+    class Meta:
+        verbose_name = "resumo do inventário"
+        verbose_name_plural = "resumo do inventário por unidade"
+
+
+class BemPatrimonialExcluido(models.Model):
+    "Registro (tombstone) de um bem excluído, para o feed de alterações"
+
+    bem_id = models.IntegerField("Id do bem")
+    numero_patrimonial = models.CharField(
+        "Número Patrimonial", max_length=20, null=True, blank=True
+    )
+    unidade_administrativa = models.ForeignKey(
+        UnidadeAdministrativa,
+        verbose_name="Unidade administrativa",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    excluido_por = models.ForeignKey(
+        Usuario,
+        verbose_name="Excluído por",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    excluido_em = models.DateTimeField("Excluído em", default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.numero_patrimonial or self.bem_id} (excluído)"
+
+    class Meta:
+        verbose_name = "bem patrimonial excluído"
+        verbose_name_plural = "bens patrimoniais excluídos"
+        indexes = [
+            models.Index(fields=["excluido_em", "id"], name="bem_excluido_em_idx"),
+        ]
+
+
 @receiver(post_save, sender=BemPatrimonial)
+@metricas.medir_handler
 def cria_primeiro_status_bem_patrimonial(sender, instance, created, **kwargs):
-    if created and instance.status is constants.AGUARDANDO_APROVACAO:
-        instance.statusbempatrimonial_set.create(
-            status=constants.AGUARDANDO_APROVACAO, atualizado_por=instance.criado_por
-        )
+    if created:
+        from bem_patrimonial import eventos
+
+        eventos.bens_criados([instance])
 
 
 @receiver(post_save, sender=StatusBemPatrimonial)
+@metricas.medir_handler
 def envia_email_status_reprovado(sender, instance, created, **kwargs):
     if created and (instance.status == constants.NAO_APROVADO):
         envia_email_cadastro_nao_aprovado(instance)
 
 
 @receiver(post_save, sender=MovimentacaoBemPatrimonial)
+@metricas.medir_handler
 def bloquear_bem_em_movimentacao(sender, instance, created, **kwargs):
+    """Bloqueia o bem e avisa a UA de destino (ver bem_patrimonial/eventos.py)."""
     if created:
-        bem = instance.bem_patrimonial
-        bem.status = constants.BLOQUEADO
-        bem.save()
+        from bem_patrimonial import eventos
 
-        StatusBemPatrimonial.objects.create(
-            bem_patrimonial=bem,
-            status=constants.BLOQUEADO,
-            atualizado_por=instance.solicitado_por,
-            observacao=f"Bem bloqueado para movimentação #{instance.pk}",
-        )
+        eventos.movimentacoes_criadas([instance])
 
 
-@receiver(post_save, sender=MovimentacaoBemPatrimonial)
-def envia_email_alert_nova_solicitacao(sender, instance, created, **kwargs):
+@receiver(post_save, sender=UnidadeAdministrativa)
+@metricas.medir_handler
+def cria_resumo_inventario_unidade(sender, instance, created, **kwargs):
     if created:
-        emails = []
-        usuarios = Usuario.objects.filter(
-            is_active=True,
-            unidade_administrativa=instance.unidade_administrativa_destino,
-        ).only("email")
-        for usuario in usuarios:
-            if usuario.email:
-                emails.append(usuario.email)
-
-        envia_email_nova_solicitacao_movimentacao(instance, emails)
+        ResumoInventarioUnidade.objects.bulk_create(
+            [ResumoInventarioUnidade(unidade_administrativa=instance)],
+            ignore_conflicts=True,
+        )
+
+
+@receiver(post_delete, sender=BemPatrimonial)
+@metricas.medir_handler
+def atualiza_resumo_bem_excluido(sender, instance, **kwargs):
+    from bem_patrimonial import eventos
+
+    eventos.bem_gravado(instance, None)
+
+
+@receiver(post_delete, sender=BemPatrimonial)
+@metricas.medir_handler
+def registra_bem_excluido(sender, instance, **kwargs):
+    BemPatrimonialExcluido.objects.create(
+        bem_id=instance.pk,
+        numero_patrimonial=instance.numero_patrimonial,
+        unidade_administrativa_id=instance.unidade_administrativa_id,
+        excluido_por=get_user(),
+    )
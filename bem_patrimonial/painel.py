@@ -0,0 +1,141 @@
+"""
+Widgets do painel dos gestores na página inicial do admin.
+
+Cada widget é uma agregação pequena (sobre ResumoInventarioUnidade, com uma
+linha por unidade, ou sobre o índice de HistoricoGeral.alterado_em) guardada
+em cache com TTL próprio e recalculada em segundo plano quando vence, então
+abrir o painel não consulta as tabelas de bens e movimentações.
+"""
+
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from bem_patrimonial.models import ResumoInventarioUnidade
+from dados_comuns.cache import atualizar_em_cache, obter_com_atualizacao
+from dados_comuns.db_router import db_leitura
+from dados_comuns.libs.unidade_administrativa import grupos_do_usuario
+from dados_comuns.models import HistoricoGeral
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO
+
+Widget = namedtuple("Widget", ["nome", "titulo", "tipo", "ttl", "calcular"])
+
+LIMITE_UNIDADES_PENDENTES = 10
+DIAS_HISTORICO = 7
+
+
+def _resumos():
+    return ResumoInventarioUnidade.objects.using(db_leitura())
+
+
+def _soma_resumo(campo):
+    return _resumos().aggregate(total=Sum(campo))["total"] or 0
+
+
+def _bens_aguardando_aprovacao():
+    return _soma_resumo("total_aguardando_aprovacao")
+
+
+def _bens_bloqueados():
+    return _soma_resumo("total_bloqueados")
+
+
+def _movimentacoes_pendentes_por_destino():
+    resumos = (
+        _resumos()
+        .filter(movimentacoes_pendentes_entrada__gt=0)
+        .select_related("unidade_administrativa")
+        .order_by("-movimentacoes_pendentes_entrada", "unidade_administrativa__codigo")
+    )
+    return [
+        (str(r.unidade_administrativa), r.movimentacoes_pendentes_entrada)
+        for r in resumos[:LIMITE_UNIDADES_PENDENTES]
+    ]
+
+
+def _volume_historico_recente():
+    inicio = timezone.localdate() - timedelta(days=DIAS_HISTORICO - 1)
+    # Limite em datetime, e não alterado_em__date, para usar o índice de alterado_em.
+    desde = timezone.make_aware(datetime.combine(inicio, time.min))
+    por_dia = dict(
+        HistoricoGeral.objects.using(db_leitura())
+        .filter(alterado_em__gte=desde)
+        .annotate(dia=TruncDate("alterado_em"))
+        .values("dia")
+        .annotate(total=Count("id"))
+        .values_list("dia", "total")
+    )
+    dias = [inicio + timedelta(days=i) for i in range(DIAS_HISTORICO)]
+    return [(dia, por_dia.get(dia, 0)) for dia in dias]
+
+
+def _valor_total_patrimonio():
+    totais = _resumos().aggregate(valor=Sum("valor_total"), bens=Sum("total_bens"))
+    return {"valor": totais["valor"] or 0, "bens": totais["bens"] or 0}
+
+
+WIDGETS = (
+    Widget(
+        "aguardando_aprovacao",
+        "Bens aguardando aprovação",
+        "numero",
+        60,
+        _bens_aguardando_aprovacao,
+    ),
+    Widget("bloqueados", "Bens bloqueados", "numero", 60, _bens_bloqueados),
+    Widget(
+        "pendentes_por_destino",
+        "Movimentações pendentes por unidade de destino",
+        "lista",
+        60,
+        _movimentacoes_pendentes_por_destino,
+    ),
+    Widget(
+        "historico_recente",
+        f"Alterações registradas (últimos {DIAS_HISTORICO} dias)",
+        "serie",
+        300,
+        _volume_historico_recente,
+    ),
+    Widget(
+        "valor_total",
+        "Valor total do patrimônio",
+        "valor",
+        300,
+        _valor_total_patrimonio,
+    ),
+)
+
+
+def pode_ver_painel(user):
+    if not getattr(user, "is_authenticated", False) or not user.is_staff:
+        return False
+    return user.is_superuser or GRUPO_GESTOR_PATRIMONIO in grupos_do_usuario(user)
+
+
+def widgets_do_painel():
+    return [
+        {
+            "nome": widget.nome,
+            "titulo": widget.titulo,
+            "tipo": widget.tipo,
+            "valor": obter_com_atualizacao(
+                f"painel_{widget.nome}",
+                (),
+                widget.calcular,
+                widget.ttl,
+                em_segundo_plano=settings.PAINEL_ATUALIZACAO_EM_SEGUNDO_PLANO,
+            ),
+        }
+        for widget in WIDGETS
+    ]
+
+
+def atualizar_painel():
+    """Recalcula todos os widgets (ex.: pelo comando atualizar_painel)."""
+    for widget in WIDGETS:
+        atualizar_em_cache(f"painel_{widget.nome}", (), widget.calcular, widget.ttl)
@@ -0,0 +1,222 @@
+"""
+Resumo materializado do inventário por unidade administrativa
+(ResumoInventarioUnidade).
+
+Os caminhos de escrita de bens e movimentações publicam deltas pelos eventos
+(bem_patrimonial/eventos.py), gravados com um único UPDATE ... SET campo =
+campo + delta na mesma transação da escrita. O
+comando reconciliar_resumo_inventario recalcula tudo a partir das tabelas e
+corrige divergências (ex.: bens gravados com bulk_create ou SQL manual).
+"""
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from bem_patrimonial import constants
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    ResumoInventarioUnidade,
+)
+from dados_comuns.models import UnidadeAdministrativa
+
+CAMPOS_STATUS = {
+    constants.AGUARDANDO_APROVACAO: "total_aguardando_aprovacao",
+    constants.APROVADO: "total_aprovados",
+    constants.NAO_APROVADO: "total_nao_aprovados",
+    constants.BLOQUEADO: "total_bloqueados",
+}
+CAMPOS_RESUMO = (
+    "total_bens",
+    "valor_total",
+    *CAMPOS_STATUS.values(),
+    "movimentacoes_pendentes_saida",
+    "movimentacoes_pendentes_entrada",
+)
+
+
+def _valor(valor):
+    return Decimal(str(valor)) if valor is not None else Decimal("0")
+
+
+class Deltas:
+    """Acumula as variações por unidade para gravá-las num único UPDATE."""
+
+    def __init__(self):
+        self.por_unidade = {}
+
+    def _somar(self, unidade_id, campo, valor):
+        if unidade_id is not None:
+            self.por_unidade.setdefault(unidade_id, Counter())[campo] += valor
+
+    def bem(self, bem, sinal):
+        unidade_id = bem.unidade_administrativa_id
+        self._somar(unidade_id, "total_bens", sinal)
+        self._somar(unidade_id, "valor_total", sinal * _valor(bem.valor_unitario))
+        if bem.status in CAMPOS_STATUS:
+            self._somar(unidade_id, CAMPOS_STATUS[bem.status], sinal)
+
+    def troca_bem(self, antes, depois):
+        """Substitui a contribuição do bem `antes` (ou None) pela do `depois`."""
+        if antes is not None and depois is not None and (
+            antes.unidade_administrativa_id,
+            antes.status,
+            _valor(antes.valor_unitario),
+        ) == (
+            depois.unidade_administrativa_id,
+            depois.status,
+            _valor(depois.valor_unitario),
+        ):
+            return
+        if antes is not None:
+            self.bem(antes, -1)
+        if depois is not None:
+            self.bem(depois, 1)
+
+    def status(self, unidade_id, antigo, novo):
+        if antigo == novo:
+            return
+        if antigo in CAMPOS_STATUS:
+            self._somar(unidade_id, CAMPOS_STATUS[antigo], -1)
+        if novo in CAMPOS_STATUS:
+            self._somar(unidade_id, CAMPOS_STATUS[novo], 1)
+
+    def movimentacao(self, movimentacao, sinal):
+        self._somar(
+            movimentacao.unidade_administrativa_origem_id,
+            "movimentacoes_pendentes_saida",
+            sinal,
+        )
+        self._somar(
+            movimentacao.unidade_administrativa_destino_id,
+            "movimentacoes_pendentes_entrada",
+            sinal,
+        )
+
+    def somar(self, outro):
+        for unidade_id, campos in outro.por_unidade.items():
+            self.por_unidade.setdefault(unidade_id, Counter()).update(campos)
+
+    def aplicar(self):
+        deltas = {}
+        for unidade_id, campos in self.por_unidade.items():
+            campos = {campo: valor for campo, valor in campos.items() if valor}
+            if campos:
+                deltas[unidade_id] = campos
+        self.por_unidade = {}
+        if not deltas:
+            return
+
+        valores = {}
+        for campo in sorted({c for campos in deltas.values() for c in campos}):
+            tipo = ResumoInventarioUnidade._meta.get_field(campo)
+            if len(deltas) == 1:
+                (campos,) = deltas.values()
+                incremento = Value(campos[campo], output_field=tipo)
+            else:
+                incremento = Case(
+                    *(
+                        When(pk=unidade_id, then=Value(campos[campo], output_field=tipo))
+                        for unidade_id, campos in deltas.items()
+                        if campo in campos
+                    ),
+                    default=Value(0, output_field=tipo),
+                    output_field=tipo,
+                )
+            valores[campo] = F(campo) + incremento
+
+        atualizados = ResumoInventarioUnidade.objects.filter(pk__in=deltas).update(
+            atualizado_em=timezone.now(), **valores
+        )
+        if atualizados < len(deltas):
+            # Unidade ainda sem resumo: calcula do zero (já inclui esta escrita).
+            existentes = set(
+                ResumoInventarioUnidade.objects.filter(pk__in=deltas).values_list(
+                    "pk", flat=True
+                )
+            )
+            recalcular([pk for pk in deltas if pk not in existentes])
+
+
+def _valores(resumo):
+    if resumo is None:
+        return None
+    return tuple(getattr(resumo, campo) for campo in CAMPOS_RESUMO)
+
+
+def recalcular(unidade_ids=None):
+    """
+    Recalcula o resumo das unidades (todas, se `unidade_ids` for None) com
+    consultas agrupadas por unidade e grava com upsert. Retorna quantas
+    unidades estavam divergentes.
+    """
+    unidades = UnidadeAdministrativa.objects.all()
+    bens = BemPatrimonial.objects.filter(unidade_administrativa__isnull=False)
+    movimentacoes = MovimentacaoBemPatrimonial.objects.filter(
+        status=constants.ENVIADA
+    )
+    if unidade_ids is not None:
+        unidades = unidades.filter(pk__in=unidade_ids)
+        bens = bens.filter(unidade_administrativa_id__in=unidade_ids)
+
+    resumos = {
+        pk: ResumoInventarioUnidade(unidade_administrativa_id=pk)
+        for pk in unidades.values_list("pk", flat=True)
+    }
+    if not resumos:
+        return 0
+
+    agregados = (
+        bens.order_by()
+        .values("unidade_administrativa_id")
+        .annotate(
+            total_bens=Count("pk"),
+            valor_total=Sum("valor_unitario"),
+            **{
+                campo: Count("pk", filter=Q(status=status))
+                for status, campo in CAMPOS_STATUS.items()
+            },
+        )
+    )
+    for linha in agregados:
+        resumo = resumos.get(linha.pop("unidade_administrativa_id"))
+        if resumo is not None:
+            for campo, valor in linha.items():
+                setattr(resumo, campo, valor or 0)
+
+    for campo, fk in (
+        ("movimentacoes_pendentes_saida", "unidade_administrativa_origem_id"),
+        ("movimentacoes_pendentes_entrada", "unidade_administrativa_destino_id"),
+    ):
+        pendentes = movimentacoes
+        if unidade_ids is not None:
+            pendentes = pendentes.filter(**{f"{fk}__in": unidade_ids})
+        for pk, total in (
+            pendentes.order_by().values(fk).annotate(total=Count("pk")).values_list(fk, "total")
+        ):
+            if pk in resumos:
+                setattr(resumos[pk], campo, total)
+
+    existentes = ResumoInventarioUnidade.objects.in_bulk(list(resumos))
+    divergentes = sum(
+        1
+        for pk, resumo in resumos.items()
+        if _valores(existentes.get(pk)) != _valores(resumo)
+    )
+
+    agora = timezone.now()
+    for resumo in resumos.values():
+        resumo.valor_total = _valor(resumo.valor_total)
+        resumo.atualizado_em = agora
+    ResumoInventarioUnidade.objects.bulk_create(
+        resumos.values(),
+        batch_size=500,
+        update_conflicts=True,
+        # Nome da coluna: o Django 4.1 repassa unique_fields sem traduzir para db_column.
+        unique_fields=["unidade_administrativa_id"],
+        update_fields=[*CAMPOS_RESUMO, "atualizado_em"],
+    )
+    return divergentes
@@ -0,0 +1,177 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from bem_patrimonial import constants, eventos
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.libs.unidade_administrativa import ids_uas_permitidas
+from dados_comuns.models import UnidadeAdministrativa
+
+
+def bens_com_pendencia():
+    """Bens anotados com `movimentacao_pendente` (NOT EXISTS na mesma consulta)."""
+    pendentes = MovimentacaoBemPatrimonial.objects.filter(
+        bem_patrimonial=OuterRef("pk"), status=constants.ENVIADA
+    )
+    return BemPatrimonial.objects.annotate(movimentacao_pendente=Exists(pendentes))
+
+
+def carregar_dados_movimentacao(
+    bem_id, origem_id, destino_id, bem=None, ua_origem=None, ua_destino=None
+):
+    """
+    Completa os objetos que ainda não foram carregados (o bem com a pendência
+    anotada e as duas UAs em uma única consulta).
+    """
+    if bem is None:
+        try:
+            bem = bens_com_pendencia().get(pk=bem_id)
+        except BemPatrimonial.DoesNotExist:
+            raise ValidationError(
+                "Bem patrimonial não encontrado. Verifique se o bem está aprovado e sem movimentações pendentes."
+            )
+
+    faltantes = [
+        pk for pk, ua in ((origem_id, ua_origem), (destino_id, ua_destino)) if ua is None
+    ]
+    if faltantes:
+        unidades = UnidadeAdministrativa.objects.in_bulk(faltantes)
+        if ua_origem is None:
+            ua_origem = unidades.get(int(origem_id))
+            if ua_origem is None:
+                raise ValidationError("Unidade de origem não encontrada.")
+        if ua_destino is None:
+            ua_destino = unidades.get(int(destino_id))
+            if ua_destino is None:
+                raise ValidationError("Unidade de destino não encontrada.")
+
+    return bem, ua_origem, ua_destino
+
+
+def validar_movimentacao(bem, ua_origem, ua_destino, pendente):
+    if not ua_origem.is_ativa:
+        raise ValidationError(
+            f"A unidade de origem '{ua_origem.nome}' está inativa. "
+            "Não é possível criar movimentações a partir de unidades inativas."
+        )
+
+    if not ua_destino.is_ativa:
+        raise ValidationError(
+            f"A unidade de destino '{ua_destino.nome}' está inativa. "
+            "Não é possível criar movimentações para unidades inativas."
+        )
+
+    if bem.status == constants.AGUARDANDO_APROVACAO:
+        raise ValidationError(
+            f"O bem '{bem.nome}' está aguardando aprovação do cadastro. "
+            f"Apenas bens aprovados podem ser movimentados."
+        )
+
+    if bem.status == constants.BLOQUEADO:
+        raise ValidationError(
+            f"O bem '{bem.nome}' está bloqueado para movimentação. "
+            f"Aguarde a resolução da movimentação pendente."
+        )
+
+    if bem.status != constants.APROVADO:
+        raise ValidationError(
+            f"O bem '{bem.nome}' não pode ser movimentado. "
+            f"Status atual: {bem.get_status_display()}. "
+            f"Apenas bens aprovados podem ser movimentados."
+        )
+
+    if pendente:
+        raise ValidationError(
+            f"O bem '{bem.nome}' já possui uma movimentação pendente. "
+            f"Aguarde a aprovação ou rejeição antes de criar nova movimentação."
+        )
+
+    if ua_destino == ua_origem:
+        raise ValidationError("Operação não permitida.")
+
+
+def criar_movimentacao(movimentacao, usuario):
+    """
+    Grava a movimentação com o bem travado (select_for_update) e a pendência
+    conferida na mesma consulta. O bem travado substitui o da movimentação,
+    então o bloqueio feito pelo signal reaproveita a instância.
+    """
+    with transaction.atomic():
+        bem = (
+            bens_com_pendencia()
+            .select_for_update(of=("self",))
+            .get(pk=movimentacao.bem_patrimonial_id)
+        )
+        if bem.movimentacao_pendente:
+            raise ValidationError(
+                f"O bem '{bem}' já possui uma movimentação pendente. Aguarde a conclusão antes de criar uma nova."
+            )
+
+        movimentacao.bem_patrimonial = bem
+        movimentacao.solicitado_por = usuario
+        movimentacao.save()
+    return movimentacao
+
+
+def _motivo_inelegivel(bem, ua_destino, ids_permitidos):
+    if ids_permitidos is not None and bem.unidade_administrativa_id not in ids_permitidos:
+        return "fora da sua unidade administrativa"
+    if bem.status != constants.APROVADO:
+        return f"status {bem.get_status_display().lower()}"
+    if bem.movimentacao_pendente:
+        return "movimentação pendente"
+    if bem.unidade_administrativa is None:
+        return "sem unidade administrativa"
+    if not bem.unidade_administrativa.is_ativa:
+        return "unidade de origem inativa"
+    if bem.unidade_administrativa_id == ua_destino.pk:
+        return "já está na unidade de destino"
+    return None
+
+
+def criar_movimentacoes_em_lote(bem_ids, ua_destino, usuario, observacao=None):
+    """
+    Cria numa transação uma movimentação para cada bem elegível: bens
+    travados em uma consulta e movimentações com bulk_create; bloqueio e
+    notificação agregada ficam a cargo da unidade de trabalho de eventos.
+
+    Retorna {"movimentacoes": [...], "ignorados": [(bem, motivo), ...]}.
+    """
+    if not ua_destino.is_ativa:
+        raise ValidationError(
+            f"A unidade de destino '{ua_destino.nome}' está inativa. "
+            "Não é possível criar movimentações para unidades inativas."
+        )
+
+    ids_permitidos = ids_uas_permitidas(usuario)
+    with eventos.unidade_de_trabalho():
+        bens = list(
+            bens_com_pendencia()
+            .select_related("unidade_administrativa")
+            .select_for_update(of=("self",))
+            .filter(pk__in=bem_ids)
+            .order_by("pk")
+        )
+        movimentacoes = []
+        ignorados = []
+        for bem in bens:
+            motivo = _motivo_inelegivel(bem, ua_destino, ids_permitidos)
+            if motivo:
+                ignorados.append((bem, motivo))
+                continue
+            movimentacoes.append(
+                MovimentacaoBemPatrimonial(
+                    bem_patrimonial=bem,
+                    unidade_administrativa_origem=bem.unidade_administrativa,
+                    unidade_administrativa_destino=ua_destino,
+                    status=constants.ENVIADA,
+                    observacao=observacao or None,
+                    solicitado_por=usuario,
+                )
+            )
+
+        # bulk_create não dispara post_save: os eventos são publicados aqui.
+        MovimentacaoBemPatrimonial.objects.bulk_create(movimentacoes)
+        eventos.movimentacoes_criadas(movimentacoes)
+
+    return {"movimentacoes": movimentacoes, "ignorados": ignorados}
@@ -0,0 +1,14 @@
+from django import template
+
+from bem_patrimonial.painel import pode_ver_painel, widgets_do_painel
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def painel_gestor(context):
+    """Widgets do painel para gestores; lista vazia para os demais usuários."""
+    request = context.get("request")
+    if request is None or not pode_ver_painel(request.user):
+        return []
+    return widgets_do_painel()
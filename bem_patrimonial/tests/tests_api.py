@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bem_patrimonial.constants import APROVADO
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+
+class ApiSomenteLeituraTest(TestCase):
+    url_bens = reverse("api:bem-patrimonial-list")
+    url_movimentacoes = reverse("api:movimentacao-bem-patrimonial-list")
+
+    def setUp(self):
+        self.ua_a = UnidadeAdministrativa.objects.create(nome="Escola A", codigo="A")
+        self.ua_b = UnidadeAdministrativa.objects.create(nome="Escola B", codigo="B")
+        self.gestor = Usuario.objects.create_user(
+            username="gestor_api",
+            password="test123",
+            nome="Gestor",
+            is_staff=True,
+            is_superuser=True,
+            must_change_password=False,
+        )
+        self.gestor.groups.add(Group.objects.create(name=GRUPO_GESTOR_PATRIMONIO))
+        self.bens = [
+            self._mk_bem(i, self.ua_a if i % 2 else self.ua_b) for i in range(1, 6)
+        ]
+
+    def _mk_bem(self, i, ua):
+        return BemPatrimonial.objects.create(
+            nome=f"Cadeira {i}",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=f"006.{i:09d}-0",
+            status=APROVADO,
+            unidade_administrativa=ua,
+            criado_por=self.gestor,
+        )
+
+    def test_paginacao_por_cursor_percorre_todos_os_bens(self):
+        self.client.force_login(self.gestor)
+        ids = []
+        url = f"{self.url_bens}?page_size=2"
+        while url:
+            dados = self.client.get(url).json()
+            self.assertNotIn("count", dados)
+            ids += [bem["id"] for bem in dados["results"]]
+            url = dados["next"]
+
+        self.assertEqual(ids, sorted((bem.pk for bem in self.bens), reverse=True))
+
+    def test_listagem_sem_consultas_por_linha(self):
+        self.client.force_login(self.gestor)
+        self.client.get(self.url_bens)
+
+        with CaptureQueriesContext(connection) as poucos:
+            self.client.get(f"{self.url_bens}?page_size=1")
+        with CaptureQueriesContext(connection) as muitos:
+            resposta = self.client.get(self.url_bens)
+
+        self.assertEqual(len(resposta.json()["results"]), 5)
+        self.assertEqual(resposta.json()["results"][0]["criado_por"], "Gestor")
+        self.assertEqual(len(poucos.captured_queries), len(muitos.captured_queries))
+
+    def test_fields_limita_campos_e_relacoes(self):
+        self.client.force_login(self.gestor)
+
+        with CaptureQueriesContext(connection) as queries:
+            resposta = self.client.get(f"{self.url_bens}?fields=id,nome")
+
+        self.assertEqual(set(resposta.json()["results"][0]), {"id", "nome"})
+        sql = [q["sql"] for q in queries.captured_queries if "bempatrimonial" in q["sql"]]
+        self.assertNotIn("JOIN", " ".join(sql))
+
+    def test_etag_devolve_304_sem_alteracao(self):
+        self.client.force_login(self.gestor)
+        resposta = self.client.get(self.url_bens)
+        etag = resposta["ETag"]
+
+        self.assertEqual(
+            self.client.get(self.url_bens, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        self.bens[0].nome = "Cadeira alterada"
+        self.bens[0].save()
+        self.assertEqual(
+            self.client.get(self.url_bens, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_operador_ve_apenas_sua_unidade(self):
+        operador = Usuario.objects.create_user(
+            username="operador_api",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+            unidade_administrativa=self.ua_a,
+        )
+        operador.groups.add(Group.objects.create(name=GRUPO_OPERADOR_INVENTARIO))
+        operador.user_permissions.add(
+            Permission.objects.get(codename="view_bempatrimonial"),
+            Permission.objects.get(codename="view_movimentacaobempatrimonial"),
+        )
+        MovimentacaoBemPatrimonial.objects.create(
+            bem_patrimonial=self.bens[1],
+            unidade_administrativa_origem=self.ua_b,
+            unidade_administrativa_destino=self.ua_b,
+            solicitado_por=self.gestor,
+        )
+        recebida = MovimentacaoBemPatrimonial.objects.create(
+            bem_patrimonial=self.bens[3],
+            unidade_administrativa_origem=self.ua_b,
+            unidade_administrativa_destino=self.ua_a,
+            solicitado_por=self.gestor,
+        )
+        self.client.force_login(operador)
+
+        bens = self.client.get(self.url_bens).json()["results"]
+        movimentacoes = self.client.get(self.url_movimentacoes).json()["results"]
+
+        self.assertEqual(
+            {bem["unidade_administrativa"]["id"] for bem in bens}, {self.ua_a.pk}
+        )
+        self.assertEqual([m["id"] for m in movimentacoes], [recebida.pk])
+        detalhe = reverse("api:bem-patrimonial-detail", args=[self.bens[1].pk])
+        self.assertEqual(self.client.get(detalhe).status_code, 404)
+
+    def test_exige_permissao_de_visualizacao(self):
+        sem_permissao = Usuario.objects.create_user(
+            username="sem_permissao_api",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+        )
+        self.client.force_login(sem_permissao)
+
+        self.assertEqual(self.client.get(self.url_bens).status_code, 403)
+        self.client.logout()
+        self.assertIn(self.client.get(self.url_bens).status_code, (401, 403))
@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO, ENVIADA
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+
+class BensMovimentaveisTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ua_a = UnidadeAdministrativa.objects.create(
+            nome="UA A", codigo="UA-A", sigla="A"
+        )
+        self.ua_b = UnidadeAdministrativa.objects.create(
+            nome="UA B", codigo="UA-B", sigla="B"
+        )
+        self.admin = Usuario.objects.create_superuser(
+            username="admin_mov",
+            password="test123",
+            must_change_password=False,
+            last_login=timezone.now(),
+        )
+
+    def _mk_bem(self, nome, ua, status=APROVADO):
+        return BemPatrimonial.objects.create(
+            nome=nome,
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            sem_numeracao=True,
+            status=status,
+            unidade_administrativa=ua,
+            criado_por=self.admin,
+        )
+
+    def _buscar(self, term=""):
+        return self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": term,
+                "app_label": "bem_patrimonial",
+                "model_name": "movimentacaobempatrimonial",
+                "field_name": "bem_patrimonial",
+            },
+        )
+
+    def test_exclui_nao_aprovados_e_com_movimentacao_enviada(self):
+        livre = self._mk_bem("Mesa", self.ua_a)
+        self._mk_bem("Cadeira", self.ua_a, status=AGUARDANDO_APROVACAO)
+        pendente = self._mk_bem("Armário", self.ua_a)
+        MovimentacaoBemPatrimonial.objects.bulk_create(
+            [
+                MovimentacaoBemPatrimonial(
+                    bem_patrimonial=pendente,
+                    unidade_administrativa_origem=self.ua_a,
+                    unidade_administrativa_destino=self.ua_b,
+                    solicitado_por=self.admin,
+                    status=ENVIADA,
+                )
+            ]
+        )
+
+        movimentaveis = BemPatrimonial.objects.movimentaveis()
+
+        self.assertEqual(list(movimentaveis), [livre])
+        self.assertIn("NOT EXISTS", str(movimentaveis.query))
+        self.assertNotIn("DISTINCT", str(movimentaveis.query))
+
+    def test_autocomplete_lista_movimentaveis_sem_count(self):
+        bens = [self._mk_bem(f"Mesa {i}", self.ua_a) for i in range(22)]
+        self._mk_bem("Cadeira", self.ua_a, status=AGUARDANDO_APROVACAO)
+        self.client.force_login(self.admin)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._buscar("mesa")
+
+        dados = response.json()
+        self.assertEqual(len(dados["results"]), 20)
+        self.assertEqual(dados["results"][0]["id"], str(bens[-1].id))
+        self.assertTrue(dados["pagination"]["more"])
+        self.assertFalse(
+            any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+        )
+
+    def test_autocomplete_restrito_a_unidade_do_operador(self):
+        bem_a = self._mk_bem("Mesa A", self.ua_a)
+        self._mk_bem("Mesa B", self.ua_b)
+        operador = Usuario.objects.create_user(
+            username="operador_mov",
+            password="test123",
+            unidade_administrativa=self.ua_a,
+            must_change_password=False,
+            last_login=timezone.now(),
+            is_staff=True,
+        )
+        operador.user_permissions.add(
+            Permission.objects.get(codename="view_bempatrimonial")
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_OPERADOR_INVENTARIO)
+        operador.groups.add(grupo)
+        self.client.force_login(operador)
+
+        response = self._buscar("mesa")
+
+        self.assertEqual(
+            [r["id"] for r in response.json()["results"]], [str(bem_a.id)]
+        )
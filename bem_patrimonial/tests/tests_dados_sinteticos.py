@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from bem_patrimonial import constants, dados_sinteticos
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    ResumoInventarioUnidade,
+    StatusBemPatrimonial,
+)
+from dados_comuns.models import HistoricoGeral
+
+
+class DadosSinteticosTest(TestCase):
+    def test_gera_inventario_consistente(self):
+        contagens = dados_sinteticos.gerar(
+            unidades=3,
+            bens_por_unidade=20,
+            historico=2,
+            movimentacoes=0.5,
+            usuarios=2,
+            lote=25,
+            prefixo="TST",
+        )
+
+        self.assertEqual(contagens["bens"], 60)
+        self.assertEqual(BemPatrimonial.objects.count(), 60)
+        self.assertEqual(StatusBemPatrimonial.objects.count(), 60)
+        self.assertEqual(HistoricoGeral.objects.count(), 120)
+        self.assertGreater(contagens["movimentacoes"], 0)
+        self.assertEqual(
+            MovimentacaoBemPatrimonial.objects.filter(status=constants.ENVIADA).count(),
+            BemPatrimonial.objects.filter(status=constants.BLOQUEADO).count(),
+        )
+        resumos = ResumoInventarioUnidade.objects.all()
+        self.assertEqual(sum(r.total_bens for r in resumos), 60)
+        self.assertEqual(
+            sum(r.movimentacoes_pendentes_entrada for r in resumos),
+            contagens["movimentacoes"],
+        )
+
+    def test_bench_grava_resultados_e_desfaz_os_dados(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            saida = os.path.join(diretorio, "resultados.json")
+            for _ in range(2):
+                call_command(
+                    "bench",
+                    escalas="40",
+                    unidades=2,
+                    repeticoes=1,
+                    movimentacoes=0.5,
+                    cenario=["changelist", "exportar_csv", "aprovar_movimentacao"],
+                    saida=saida,
+                    rotulo="teste",
+                    stdout=StringIO(),
+                    stderr=StringIO(),
+                )
+            with open(saida) as arquivo:
+                execucoes = json.load(arquivo)
+
+        self.assertEqual(len(execucoes), 2)
+        escala = execucoes[0]["escalas"][0]
+        self.assertEqual(escala["bens"], 40)
+        self.assertEqual(
+            [c["cenario"] for c in escala["cenarios"]],
+            ["changelist", "exportar_csv", "aprovar_movimentacao"],
+        )
+        self.assertGreater(escala["cenarios"][0]["consultas"], 0)
+        self.assertFalse(BemPatrimonial.objects.exists())
@@ -0,0 +1,130 @@
+from decimal import Decimal
+
+from django.core import mail
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bem_patrimonial import eventos
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO, BLOQUEADO
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    StatusBemPatrimonial,
+)
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.models import Usuario
+
+
+class UnidadeDeTrabalhoTest(TestCase):
+    def setUp(self):
+        self.ua_origem = UnidadeAdministrativa.objects.create(nome="Origem", codigo="ORI")
+        self.ua_a = UnidadeAdministrativa.objects.create(nome="Destino A", codigo="DA")
+        self.ua_b = UnidadeAdministrativa.objects.create(nome="Destino B", codigo="DB")
+        self.usuario = Usuario.objects.create_user(
+            username="eventos", password="test123", email="eventos@test.com"
+        )
+        for ua in (self.ua_a, self.ua_b):
+            Usuario.objects.create_user(
+                username=f"destino_{ua.codigo}",
+                password="test123",
+                email=f"{ua.codigo.lower()}@test.com",
+                unidade_administrativa=ua,
+            )
+
+    def _novo_bem(self, i, status=AGUARDANDO_APROVACAO):
+        return BemPatrimonial(
+            nome=f"Cadeira {i}",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=f"002.{i:09d}-0",
+            status=status,
+            unidade_administrativa=self.ua_origem,
+            criado_por=self.usuario,
+        )
+
+    def _movimentacao(self, bem, destino):
+        return MovimentacaoBemPatrimonial(
+            bem_patrimonial=bem,
+            unidade_administrativa_origem=self.ua_origem,
+            unidade_administrativa_destino=destino,
+            solicitado_por=self.usuario,
+        )
+
+    def test_status_iniciais_gravados_em_lote(self):
+        def criar(quantidade, inicio):
+            with CaptureQueriesContext(connection) as ctx:
+                with eventos.unidade_de_trabalho():
+                    for i in range(inicio, inicio + quantidade):
+                        self._novo_bem(i).save()
+            return len(ctx.captured_queries)
+
+        # Por bem: só o INSERT do próprio bem; os status saem num único INSERT.
+        self.assertEqual(criar(12, 100) - criar(2, 0), 10)
+        self.assertEqual(
+            StatusBemPatrimonial.objects.filter(
+                status=AGUARDANDO_APROVACAO, atualizado_por=self.usuario
+            ).count(),
+            14,
+        )
+
+    def test_bem_aprovado_nao_ganha_status_inicial(self):
+        with eventos.unidade_de_trabalho():
+            self._novo_bem(0, status=APROVADO).save()
+
+        self.assertFalse(StatusBemPatrimonial.objects.exists())
+
+    def test_movimentacoes_bloqueiam_e_notificam_por_unidade(self):
+        bens = BemPatrimonial.objects.bulk_create(
+            [self._novo_bem(i, status=APROVADO) for i in range(3)]
+        )
+        mail.outbox = []
+
+        with eventos.unidade_de_trabalho():
+            movimentacoes = MovimentacaoBemPatrimonial.objects.bulk_create(
+                [
+                    self._movimentacao(bens[0], self.ua_a),
+                    self._movimentacao(bens[1], self.ua_a),
+                    self._movimentacao(bens[2], self.ua_b),
+                ]
+            )
+            eventos.movimentacoes_criadas(movimentacoes)
+            self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(BemPatrimonial.objects.filter(status=BLOQUEADO).count(), 3)
+        self.assertEqual(
+            StatusBemPatrimonial.objects.filter(status=BLOQUEADO).count(), 3
+        )
+        enviados = {tuple(m.to): m.subject for m in mail.outbox}
+        self.assertEqual(
+            enviados,
+            {
+                ("da@test.com",): "[Bens Físicos] Movimentações recebidas para aceite",
+                ("db@test.com",): "[Bens Físicos] Movimentação recebida para aceite",
+            },
+        )
+
+    def test_rollback_descarta_eventos(self):
+        mail.outbox = []
+
+        with eventos.unidade_de_trabalho():
+            bem = self._novo_bem(0, status=APROVADO)
+            bem.save()
+            self._movimentacao(bem, self.ua_a).save()
+            transaction.set_rollback(True)
+
+        self.assertFalse(BemPatrimonial.objects.exists())
+        self.assertFalse(StatusBemPatrimonial.objects.exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_fora_da_unidade_de_trabalho_aplica_na_hora(self):
+        bem = self._novo_bem(0)
+        bem.save()
+
+        self.assertTrue(
+            StatusBemPatrimonial.objects.filter(
+                bem_patrimonial=bem, status=AGUARDANDO_APROVACAO
+            ).exists()
+        )
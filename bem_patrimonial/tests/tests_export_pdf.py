@@ -222,6 +222,18 @@ class PDFExportDataTestCase(TestCase):
         self.assertIsInstance(pdf_bytes, bytes)
         self.assertGreater(len(pdf_bytes), 0)
 
+    def test_resumo_das_unidades_identifica_totais_da_unidade_inteira(self):
+        bem = self.setup.create_bem_patrimonial(self.usuario, status=APROVADO)
+        self.setup.create_bem_patrimonial(self.usuario, status=APROVADO, nome="Fora do filtro")
+
+        elementos = PDFFormat()._criar_resumo_unidades([bem])
+
+        textos = [e.getPlainText() for e in elementos if hasattr(e, "getPlainText")]
+        self.assertIn("Inventário completo das unidades do relatório", textos)
+        self.assertTrue(any("independentemente dos filtros" in t for t in textos))
+        tabela = elementos[-1]
+        self.assertEqual(tabela._cellvalues[1][1], "2")
+
         
         
         
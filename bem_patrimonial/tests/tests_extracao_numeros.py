@@ -0,0 +1,146 @@
+from decimal import Decimal
+from django.test import TestCase, RequestFactory, override_settings
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bem_patrimonial.admins.actions.extracao_numeros import (
+    aplicar_extracao_em_lotes,
+    aplicar_extracao_numero,
+)
+from bem_patrimonial.admins.bem_patrimonial import BemPatrimonialAdmin
+from bem_patrimonial.models import BemPatrimonial
+from dados_comuns.models import HistoricoGeral, UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO
+from usuario.models import Usuario
+
+
+class AplicarExtracaoNumeroTest(TestCase):
+    def setUp(self):
+        self.ua = UnidadeAdministrativa.objects.create(
+            nome="UA Extração", codigo="UA-EXT", sigla="UAE"
+        )
+        self.gestor = Usuario.objects.create_user(
+            username="gestor_extracao",
+            password="test123",
+            unidade_administrativa=self.ua,
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_GESTOR_PATRIMONIO)
+        self.gestor.groups.add(grupo)
+
+        self.factory = RequestFactory()
+        self.model_admin = BemPatrimonialAdmin(BemPatrimonial, admin.site)
+
+    def _mk_bem(self, nome, **kwargs):
+        data = dict(
+            nome=nome,
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=None,
+            sem_numeracao=False,
+            unidade_administrativa=self.ua,
+            criado_por=self.gestor,
+        )
+        data.update(kwargs)
+        return BemPatrimonial.objects.create(**data)
+
+    def _confirmar(self, bens):
+        request = self.factory.post(
+            "/admin/bem_patrimonial/bempatrimonial/",
+            {
+                "confirm": "yes",
+                helpers.ACTION_CHECKBOX_NAME: [str(b.pk) for b in bens],
+            },
+        )
+        request.user = self.gestor
+        setattr(request, "session", "session")
+        setattr(request, "_messages", FallbackStorage(request))
+        queryset = BemPatrimonial.objects.filter(pk__in=[b.pk for b in bens])
+        aplicar_extracao_numero(self.model_admin, request, queryset)
+        return [str(m) for m in request._messages]
+
+    def test_aplica_numero_extraido_e_limpa_nome(self):
+        bem = self._mk_bem("001050761830-0 ARMÁRIO")
+
+        msgs = self._confirmar([bem])
+
+        bem.refresh_from_db()
+        self.assertEqual(bem.numero_patrimonial, "001.050761830-0")
+        self.assertEqual(bem.nome, "ARMÁRIO")
+        self.assertFalse(bem.sem_numeracao)
+        self.assertIn("Atualizados: 1", msgs[0])
+
+    def test_sem_numero_gera_numero_automatico(self):
+        bem = self._mk_bem("ARMÁRIO DE AÇO")
+
+        self._confirmar([bem])
+
+        bem.refresh_from_db()
+        self.assertTrue(bem.sem_numeracao)
+        self.assertEqual(bem.numero_patrimonial, f"SEM-NUMERO-{bem.pk}")
+
+    def test_numero_duplicado_e_ignorado(self):
+        self._mk_bem("Existente", numero_patrimonial="001.050761830-0")
+        bem = self._mk_bem("001050761830-0 ARMÁRIO")
+
+        msgs = self._confirmar([bem])
+
+        bem.refresh_from_db()
+        self.assertIsNone(bem.numero_patrimonial)
+        self.assertIn("Ignorados (duplicados): 1", msgs[0])
+
+    def test_registra_historico_em_massa(self):
+        bem = self._mk_bem("001050761830-0 ARMÁRIO")
+
+        self._confirmar([bem])
+
+        ct = ContentType.objects.get_for_model(BemPatrimonial)
+        campos = set(
+            HistoricoGeral.objects.filter(
+                content_type=ct, object_id=str(bem.pk)
+            ).values_list("campo", flat=True)
+        )
+        self.assertEqual(campos, {"numero_patrimonial", "nome"})
+
+    @override_settings(EXTRACAO_NUMERO_TAMANHO_LOTE=10)
+    def test_quantidade_de_queries_nao_cresce_com_o_lote(self):
+        def executar(quantidade, inicio):
+            bens = [
+                self._mk_bem(f"{inicio + i:012d}-0 MESA") for i in range(quantidade)
+            ]
+            ids = [b.pk for b in bens]
+            propostos = {
+                b.pk: (f"{inicio + i:03d}.{i:09d}-0", "PADRAO_ATUAL", True, "MESA")
+                for i, b in enumerate(bens)
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                resultado = aplicar_extracao_em_lotes(
+                    BemPatrimonial, ids, propostos, set()
+                )
+            self.assertEqual(resultado["atualizados"], quantidade)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(executar(2, 100), executar(10, 200))
+
+    def test_informa_progresso_por_lote(self):
+        bens = [self._mk_bem("ARMÁRIO") for _ in range(5)]
+        propostos = {b.pk: (None, "SEM_NUMERO", False, "ARMÁRIO") for b in bens}
+        chamadas = []
+
+        resultado = aplicar_extracao_em_lotes(
+            BemPatrimonial,
+            [b.pk for b in bens],
+            propostos,
+            set(),
+            tamanho_lote=2,
+            progresso=lambda feitos, total: chamadas.append((feitos, total)),
+        )
+
+        self.assertEqual(resultado["lotes"], 3)
+        self.assertEqual(chamadas, [(2, 5), (4, 5), (5, 5)])
@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bem_patrimonial import feed
+from bem_patrimonial.constants import APROVADO
+from bem_patrimonial.models import BemPatrimonial, BemPatrimonialExcluido
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.models import Usuario
+
+
+@override_settings(FEED_ALTERACOES_MARGEM_SEGUNDOS=0)
+class FeedAlteracoesTest(TestCase):
+    def setUp(self):
+        self.ua = UnidadeAdministrativa.objects.create(nome="Escola", codigo="E")
+        self.usuario = Usuario.objects.create_user(
+            username="feed",
+            password="test123",
+            is_staff=True,
+            is_superuser=True,
+            must_change_password=False,
+        )
+        self.bens = [self._mk_bem(i) for i in range(1, 6)]
+
+    def _mk_bem(self, i):
+        return BemPatrimonial.objects.create(
+            nome=f"Armário {i}",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=f"007.{i:09d}-0",
+            status=APROVADO,
+            unidade_administrativa=self.ua,
+            criado_por=self.usuario,
+        )
+
+    def _percorrer(self, desde=None, limite=2):
+        alterados, excluidos, cursor = [], [], None
+        while True:
+            pagina = feed.pagina_de_alteracoes(desde, cursor, limite)
+            alterados += [bem.pk for bem in pagina.alterados]
+            excluidos += [registro.bem_id for registro in pagina.excluidos]
+            if pagina.proximo is None:
+                return alterados, excluidos, pagina.marca
+            cursor = feed.decodificar_cursor(feed.codificar_cursor(pagina.proximo))
+
+    def test_paginas_cobrem_alteracoes_e_exclusoes(self):
+        # Mesmo instante para todos: o desempate é pelo id.
+        agora = timezone.now()
+        BemPatrimonial.objects.update(atualizado_em=agora)
+        excluido = self.bens.pop()
+        excluido_id = excluido.pk
+        excluido.delete()
+        BemPatrimonialExcluido.objects.update(excluido_em=agora)
+
+        alterados, excluidos, _ = self._percorrer()
+
+        self.assertEqual(alterados, [bem.pk for bem in self.bens])
+        self.assertEqual(excluidos, [excluido_id])
+
+    def test_marca_retoma_apenas_o_que_mudou(self):
+        _, _, marca = self._percorrer()
+        BemPatrimonial.objects.filter(pk=self.bens[0].pk).update(
+            atualizado_em=marca + timedelta(seconds=1)
+        )
+
+        with override_settings(FEED_ALTERACOES_MARGEM_SEGUNDOS=-5):
+            alterados, excluidos, _ = self._percorrer(desde=marca)
+
+        self.assertEqual((alterados, excluidos), ([self.bens[0].pk], []))
+
+    def test_endpoint_pagina_com_cursor(self):
+        excluido_id = self.bens[0].pk
+        self.bens[0].delete()
+        self.client.force_login(self.usuario)
+        url = f"{reverse('api:bem-patrimonial-alteracoes')}?limite=3&fields=id"
+        alterados, excluidos = [], []
+        while url:
+            dados = self.client.get(url).json()
+            alterados += [bem["id"] for bem in dados["alterados"]]
+            excluidos += [bem["id"] for bem in dados["excluidos"]]
+            url = dados["proximo"]
+
+        self.assertEqual(sorted(alterados), [bem.pk for bem in self.bens[1:]])
+        self.assertEqual(excluidos, [excluido_id])
+        self.assertEqual(
+            self.client.get(
+                reverse("api:bem-patrimonial-alteracoes"), {"desde": "ontem"}
+            ).status_code,
+            400,
+        )
+
+    def test_comando_exporta_e_grava_a_marca(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_marca = os.path.join(pasta, "marca")
+            saida = StringIO()
+            call_command(
+                "exportar_alteracoes_bens",
+                arquivo_marca=arquivo_marca,
+                stdout=saida,
+                stderr=StringIO(),
+            )
+            linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+            self.assertEqual(len(linhas), 5)
+            self.assertEqual({linha["tipo"] for linha in linhas}, {"alterado"})
+
+            saida = StringIO()
+            call_command(
+                "exportar_alteracoes_bens",
+                arquivo_marca=arquivo_marca,
+                stdout=saida,
+                stderr=StringIO(),
+            )
+            self.assertEqual(saida.getvalue(), "")
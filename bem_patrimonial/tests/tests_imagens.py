@@ -0,0 +1,197 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from bem_patrimonial import imagens
+from bem_patrimonial.admins.bem_patrimonial import BemPatrimonialAdmin
+from bem_patrimonial.api.serializers import BemPatrimonialSerializer
+from bem_patrimonial.models import BemPatrimonial
+
+ORIENTACAO = 0x0112
+
+
+def _foto(nome="foto.jpg", tamanho=(3000, 1000), formato="JPEG", orientacao=None):
+    buffer = BytesIO()
+    imagem = Image.new("RGB", tamanho, (200, 30, 30))
+    opcoes = {}
+    if orientacao:
+        exif = Image.Exif()
+        exif[ORIENTACAO] = orientacao
+        opcoes["exif"] = exif
+    imagem.save(buffer, formato, **opcoes)
+    return SimpleUploadedFile(nome, buffer.getvalue())
+
+
+def _abrir(nome):
+    with default_storage.open(nome) as arquivo:
+        imagem = Image.open(arquivo)
+        imagem.load()
+    return imagem
+
+
+class FotoBemPatrimonialTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(
+            MEDIA_ROOT=self.media,
+            FOTO_DIMENSAO_MAXIMA=1600,
+            FOTO_PROCESSAMENTO_EM_SEGUNDO_PLANO=False,
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _bem(self, numero="007.000000001-0"):
+        return BemPatrimonial(
+            nome="Mesa",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=numero,
+        )
+
+    def _salvar_sem_processar(self, foto, numero):
+        bem = self._bem(numero)
+        bem.foto = foto
+        with self.captureOnCommitCallbacks(execute=False):
+            bem.save()
+        return bem
+
+    def _salvar(self, foto, bem=None):
+        bem = bem or self._bem()
+        bem.foto = foto
+        with self.captureOnCommitCallbacks(execute=True):
+            bem.save()
+        bem.refresh_from_db()
+        return bem
+
+    def test_normaliza_o_original_e_gera_miniaturas(self):
+        # Orientação 6: a câmera gravou deitada, a foto é exibida em pé.
+        bem = self._salvar(_foto(orientacao=6))
+
+        self.assertTrue(bem.foto_processada)
+        original = _abrir(bem.foto.name)
+        self.assertEqual(original.size, (533, 1600))
+        self.assertNotIn(ORIENTACAO, original.getexif())
+
+        for tamanho, dimensoes in imagens.MINIATURAS.items():
+            for extensao, formato in imagens.FORMATOS_MINIATURA.items():
+                miniatura = _abrir(imagens.nome_miniatura(bem.foto.name, tamanho, extensao))
+                self.assertEqual((miniatura.format, miniatura.size), (formato, dimensoes))
+
+        urls = imagens.urls_miniatura(bem, "lista")
+        self.assertTrue(urls["webp"].endswith("__lista.webp"))
+        self.assertTrue(urls["jpg"].endswith("__lista.jpg"))
+
+    def test_original_enviado_removido_apos_a_troca(self):
+        bem = self._salvar_sem_processar(_foto(tamanho=(100, 100)), "007.000000002-0")
+        enviado = bem.foto.name
+
+        imagens.processar_foto(bem.pk)
+
+        bem.refresh_from_db()
+        self.assertNotEqual(bem.foto.name, enviado)
+        self.assertTrue(default_storage.exists(bem.foto.name))
+        self.assertFalse(default_storage.exists(enviado))
+
+    def test_falha_no_processamento_preserva_o_original(self):
+        bem = self._salvar_sem_processar(_foto(tamanho=(100, 100)), "007.000000003-0")
+        enviado = bem.foto.name
+        arquivos = set(os.listdir(os.path.join(self.media, "bens")))
+
+        with mock.patch.object(imagens, "_gravar_miniatura", side_effect=OSError):
+            with self.assertRaises(OSError):
+                imagens.processar_foto(bem.pk)
+
+        bem.refresh_from_db()
+        self.assertEqual(bem.foto.name, enviado)
+        self.assertFalse(bem.foto_processada)
+        self.assertEqual(set(os.listdir(os.path.join(self.media, "bens"))), arquivos)
+
+    def test_troca_de_foto_remove_as_miniaturas_anteriores(self):
+        bem = self._salvar(_foto("antiga.png", (300, 300), "PNG"))
+        antiga = imagens.nome_miniatura(bem.foto.name, "lista", "webp")
+        self.assertTrue(default_storage.exists(antiga))
+
+        bem = self._salvar(_foto("nova.jpg", (300, 300)), bem)
+
+        self.assertFalse(default_storage.exists(antiga))
+        self.assertTrue(
+            default_storage.exists(imagens.nome_miniatura(bem.foto.name, "lista", "webp"))
+        )
+
+    def test_usa_o_original_enquanto_nao_processada(self):
+        bem = self._salvar(_foto(tamanho=(100, 100)))
+        BemPatrimonial.objects.filter(pk=bem.pk).update(foto_processada=False)
+        bem.refresh_from_db()
+
+        self.assertEqual(imagens.urls_miniatura(bem, "lista"), {"webp": None, "jpg": bem.foto.url})
+        html = BemPatrimonialAdmin(BemPatrimonial, None).thumb(bem)
+        self.assertIn(f'src="{bem.foto.url}"', html)
+        self.assertNotIn("<picture>", html)
+
+    def test_admin_serve_a_miniatura_em_webp(self):
+        bem = self._salvar(_foto(tamanho=(100, 100)))
+
+        html = BemPatrimonialAdmin(BemPatrimonial, None).foto_preview(bem)
+
+        self.assertIn("__previa.webp", html)
+        self.assertIn("__previa.jpg", html)
+        self.assertIn(f'href="{bem.foto.url}"', html)
+
+    def test_api_expoe_a_miniatura(self):
+        bem = self._salvar(_foto(tamanho=(100, 100)))
+
+        dados = BemPatrimonialSerializer(bem).data
+
+        self.assertTrue(dados["foto_miniatura"]["webp"].endswith("__lista.webp"))
+
+    def test_validacao_do_upload(self):
+        imagens.validar_foto(_foto(tamanho=(10, 10)))
+        with self.assertRaisesMessage(ValidationError, "inválido"):
+            imagens.validar_foto(SimpleUploadedFile("foto.jpg", b"nao e imagem"))
+        with self.assertRaisesMessage(ValidationError, "JPEG, PNG ou WebP"):
+            imagens.validar_foto(_foto("foto.gif", (10, 10), "GIF"))
+        with override_settings(FOTO_TAMANHO_MAXIMO_MB=0):
+            with self.assertRaisesMessage(ValidationError, "no máximo"):
+                imagens.validar_foto(_foto(tamanho=(10, 10)))
+
+    def test_foto_ja_gravada_nao_e_revalidada(self):
+        bem = self._salvar(_foto(tamanho=(100, 100)))
+        default_storage.delete(bem.foto.name)
+
+        imagens.validar_foto(bem.foto)
+        bem.full_clean()
+
+    def test_comando_processa_fotos_pendentes(self):
+        pendente = self._salvar_sem_processar(_foto(tamanho=(100, 100)), "007.000000004-0")
+        processado = self._salvar(_foto(tamanho=(100, 100)))
+        nome_processado = processado.foto.name
+        BemPatrimonial.objects.create(
+            nome="Sem foto",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            numero_patrimonial="007.000000005-0",
+        )
+        saida = StringIO()
+
+        call_command("processar_fotos", pendentes=True, stdout=saida, stderr=StringIO())
+
+        pendente.refresh_from_db()
+        processado.refresh_from_db()
+        self.assertTrue(pendente.foto_processada)
+        self.assertEqual(processado.foto.name, nome_processado)
+        self.assertIn("1 foto(s) processada(s), 0 falha(s)", saida.getvalue())
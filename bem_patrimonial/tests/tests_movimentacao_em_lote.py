@@ -0,0 +1,257 @@
+from decimal import Decimal
+
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bem_patrimonial.admins.actions.movimentacao_em_lote import (
+    solicitar_movimentacao_em_lote,
+)
+from bem_patrimonial.admins.bem_patrimonial import BemPatrimonialAdmin
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO, BLOQUEADO
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    StatusBemPatrimonial,
+)
+from bem_patrimonial.services import criar_movimentacoes_em_lote
+from dados_comuns.models import HistoricoGeral, UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+
+class SetupMovimentacaoEmLote(TestCase):
+    def setUp(self):
+        self.ua_origem = UnidadeAdministrativa.objects.create(
+            nome="Laboratório", codigo="LAB"
+        )
+        self.ua_destino = UnidadeAdministrativa.objects.create(
+            nome="Depósito", codigo="DEP"
+        )
+        self.gestor = Usuario.objects.create_user(
+            username="gestor_lote", password="test123", email="gestor@test.com"
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_GESTOR_PATRIMONIO)
+        self.gestor.groups.add(grupo)
+        Usuario.objects.create_user(
+            username="destino_lote",
+            password="test123",
+            email="destino@test.com",
+            unidade_administrativa=self.ua_destino,
+        )
+        ContentType.objects.get_for_model(BemPatrimonial)
+
+    def _mk_bens(self, quantidade, ua=None, status=APROVADO, inicio=0):
+        return [
+            BemPatrimonial.objects.create(
+                nome=f"Microscópio {inicio + i}",
+                descricao="Desc",
+                valor_unitario=Decimal("10.00"),
+                marca="M",
+                modelo="X",
+                numero_patrimonial=f"001.{inicio + i:09d}-0",
+                status=status,
+                unidade_administrativa=ua or self.ua_origem,
+            )
+            for i in range(quantidade)
+        ]
+
+
+class MovimentacaoEmLoteTest(SetupMovimentacaoEmLote):
+    def test_cria_movimentacoes_e_bloqueia_bens(self):
+        bens = self._mk_bens(3)
+
+        resultado = criar_movimentacoes_em_lote(
+            [b.pk for b in bens], self.ua_destino, self.gestor
+        )
+
+        self.assertEqual(len(resultado["movimentacoes"]), 3)
+        self.assertEqual(
+            MovimentacaoBemPatrimonial.objects.filter(
+                unidade_administrativa_destino=self.ua_destino,
+                unidade_administrativa_origem=self.ua_origem,
+                solicitado_por=self.gestor,
+            ).count(),
+            3,
+        )
+        self.assertEqual(
+            BemPatrimonial.objects.filter(status=BLOQUEADO).count(), 3
+        )
+        self.assertEqual(
+            StatusBemPatrimonial.objects.filter(status=BLOQUEADO).count(), 3
+        )
+        self.assertEqual(
+            HistoricoGeral.objects.filter(campo="status", valor_novo=BLOQUEADO).count(),
+            3,
+        )
+
+    def test_envia_uma_notificacao_agregada(self):
+        bens = self._mk_bens(3)
+        mail.outbox = []
+
+        criar_movimentacoes_em_lote([b.pk for b in bens], self.ua_destino, self.gestor)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["destino@test.com"])
+        for bem in bens:
+            self.assertIn(bem.nome, mail.outbox[0].body)
+
+    def test_ignora_bens_inelegiveis(self):
+        (aprovado,) = self._mk_bens(1)
+        (pendente_aprovacao,) = self._mk_bens(1, status=AGUARDANDO_APROVACAO, inicio=1)
+        (no_destino,) = self._mk_bens(1, ua=self.ua_destino, inicio=2)
+        (ja_movimentado,) = self._mk_bens(1, inicio=3)
+        criar_movimentacoes_em_lote([ja_movimentado.pk], self.ua_destino, self.gestor)
+
+        resultado = criar_movimentacoes_em_lote(
+            [aprovado.pk, pendente_aprovacao.pk, no_destino.pk, ja_movimentado.pk],
+            self.ua_destino,
+            self.gestor,
+        )
+
+        self.assertEqual(
+            [m.bem_patrimonial for m in resultado["movimentacoes"]], [aprovado]
+        )
+        self.assertEqual(
+            {bem.pk: motivo for bem, motivo in resultado["ignorados"]},
+            {
+                pendente_aprovacao.pk: "status aguardando aprovação",
+                no_destino.pk: "já está na unidade de destino",
+                ja_movimentado.pk: "status bloqueado para movimentação",
+            },
+        )
+
+    def test_operador_so_movimenta_bens_da_sua_unidade(self):
+        operador = Usuario.objects.create_user(
+            username="operador_lote",
+            password="test123",
+            unidade_administrativa=self.ua_origem,
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_OPERADOR_INVENTARIO)
+        operador.groups.add(grupo)
+        outra_ua = UnidadeAdministrativa.objects.create(nome="Outra", codigo="OUT")
+        (meu,) = self._mk_bens(1)
+        (alheio,) = self._mk_bens(1, ua=outra_ua, inicio=1)
+
+        resultado = criar_movimentacoes_em_lote(
+            [meu.pk, alheio.pk], self.ua_destino, operador
+        )
+
+        self.assertEqual([m.bem_patrimonial for m in resultado["movimentacoes"]], [meu])
+        self.assertEqual(resultado["ignorados"][0][0], alheio)
+
+    def test_quantidade_de_queries_nao_cresce_com_o_lote(self):
+        def executar(quantidade, inicio):
+            bens = self._mk_bens(quantidade, inicio=inicio)
+            with CaptureQueriesContext(connection) as ctx:
+                criar_movimentacoes_em_lote(
+                    [b.pk for b in bens], self.ua_destino, self.gestor
+                )
+            return len(ctx.captured_queries)
+
+        executar(1, 500)  # aquece o cache de grupos do usuário
+        self.assertEqual(executar(2, 0), executar(20, 100))
+
+
+class SolicitarMovimentacaoEmLoteActionTest(SetupMovimentacaoEmLote):
+    def _request(self, dados, arquivos=None):
+        request = RequestFactory().post(
+            "/admin/bem_patrimonial/bempatrimonial/", {**dados, **(arquivos or {})}
+        )
+        request.user = self.gestor
+        setattr(request, "session", "session")
+        setattr(request, "_messages", FallbackStorage(request))
+        return request
+
+    def _executar(self, bens, dados):
+        request = self._request(
+            {helpers.ACTION_CHECKBOX_NAME: [str(b.pk) for b in bens], **dados}
+        )
+        model_admin = BemPatrimonialAdmin(BemPatrimonial, admin.site)
+        queryset = BemPatrimonial.objects.filter(pk__in=[b.pk for b in bens])
+        response = solicitar_movimentacao_em_lote(model_admin, request, queryset)
+        return response, [str(m) for m in request._messages]
+
+    def test_exibe_pagina_intermediaria(self):
+        bens = self._mk_bens(2)
+
+        response, _ = self._executar(bens, {})
+
+        self.assertEqual(response.template_name, "admin/movimentacao_em_lote.html")
+        self.assertEqual(response.context_data["selected_ids"], [b.pk for b in bens])
+
+    def test_confirma_com_numeros_informados_e_arquivo(self):
+        selecionado, digitado, do_arquivo = self._mk_bens(3)
+        arquivo = SimpleUploadedFile(
+            "numeros.csv", f"{do_arquivo.numero_patrimonial};obs\n".encode("utf-8")
+        )
+
+        response, msgs = self._executar(
+            [selecionado],
+            {
+                "confirm": "yes",
+                "unidade_administrativa_destino": self.ua_destino.pk,
+                "numeros": f"{digitado.numero_patrimonial}\n999.999999999-9",
+                "arquivo": arquivo,
+            },
+        )
+
+        self.assertIsNone(response)
+        self.assertEqual(MovimentacaoBemPatrimonial.objects.count(), 3)
+        self.assertIn("3 movimentação(ões) criada(s)", msgs[0])
+        self.assertIn("999.999999999-9", msgs[1])
+
+
+class MovimentacaoEmLoteSemSelecaoTest(SetupMovimentacaoEmLote):
+    url = "/admin/bem_patrimonial/bempatrimonial/movimentacao-em-lote/"
+
+    def setUp(self):
+        super().setUp()
+        self.gestor.is_staff = True
+        self.gestor.is_superuser = True
+        self.gestor.must_change_password = False
+        self.gestor.save()
+        self.client.force_login(self.gestor)
+
+    def test_lista_de_bens_tem_o_botao(self):
+        response = self.client.get("/admin/bem_patrimonial/bempatrimonial/")
+
+        self.assertContains(response, f'href="{self.url}"')
+
+    def test_confirma_so_com_numeros_informados(self):
+        bens = self._mk_bens(2)
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        response = self.client.post(
+            self.url,
+            {
+                "confirm": "yes",
+                "unidade_administrativa_destino": self.ua_destino.pk,
+                "numeros": ", ".join(b.numero_patrimonial for b in bens),
+            },
+        )
+
+        self.assertRedirects(response, "/admin/bem_patrimonial/bempatrimonial/")
+        self.assertEqual(MovimentacaoBemPatrimonial.objects.count(), 2)
+
+    def test_sem_selecao_nem_numeros_reexibe_o_formulario(self):
+        response = self.client.post(
+            self.url,
+            {"confirm": "yes", "unidade_administrativa_destino": self.ua_destino.pk},
+        )
+
+        self.assertContains(response, "Selecione bens na lista ou informe os números")
+        self.assertFalse(MovimentacaoBemPatrimonial.objects.exists())
+
+    def test_exige_permissao_de_criar_movimentacao(self):
+        self.gestor.is_superuser = False
+        self.gestor.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
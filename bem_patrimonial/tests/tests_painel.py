@@ -0,0 +1,129 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from bem_patrimonial.painel import widgets_do_painel
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+TABELAS_GRANDES = (
+    "bem_patrimonial_bempatrimonial",
+    "bem_patrimonial_movimentacaobempatrimonial",
+    "bem_patrimonial_statusbempatrimonial",
+)
+
+
+@override_settings(PAINEL_ATUALIZACAO_EM_SEGUNDO_PLANO=False)
+class PainelGestorTest(TestCase):
+    url = reverse("admin:index")
+
+    def setUp(self):
+        cache.clear()
+        self.ua_a = UnidadeAdministrativa.objects.create(nome="Escola A", codigo="A")
+        self.ua_b = UnidadeAdministrativa.objects.create(nome="Escola B", codigo="B")
+        self.gestor = Usuario.objects.create_user(
+            username="gestor_painel",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+        )
+        self.gestor.groups.add(Group.objects.create(name=GRUPO_GESTOR_PATRIMONIO))
+        self.bem = self._mk_bem(1, APROVADO, "100.00")
+        self._mk_bem(2, AGUARDANDO_APROVACAO, "50.00")
+        MovimentacaoBemPatrimonial.objects.create(
+            bem_patrimonial=self.bem,
+            unidade_administrativa_origem=self.ua_a,
+            unidade_administrativa_destino=self.ua_b,
+            solicitado_por=self.gestor,
+        )
+
+    def _mk_bem(self, i, status, valor):
+        return BemPatrimonial.objects.create(
+            nome=f"Mesa {i}",
+            descricao="Desc",
+            valor_unitario=Decimal(valor),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=f"005.{i:09d}-0",
+            status=status,
+            unidade_administrativa=self.ua_a,
+            criado_por=self.gestor,
+        )
+
+    def _widgets(self, response):
+        return {w["nome"]: w["valor"] for w in response.context["widgets"]}
+
+    def test_gestor_ve_os_widgets(self):
+        self.client.force_login(self.gestor)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "painel-gestor")
+        widgets = self._widgets(response)
+        self.assertEqual(widgets["aguardando_aprovacao"], 1)
+        self.assertEqual(widgets["bloqueados"], 1)
+        self.assertEqual(widgets["pendentes_por_destino"], [(str(self.ua_b), 1)])
+        self.assertEqual(widgets["valor_total"]["valor"], Decimal("150.00"))
+        self.assertGreater(sum(total for _, total in widgets["historico_recente"]), 0)
+
+    def test_operador_nao_ve_o_painel(self):
+        operador = Usuario.objects.create_user(
+            username="operador_painel",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+            unidade_administrativa=self.ua_a,
+        )
+        operador.groups.add(Group.objects.create(name=GRUPO_OPERADOR_INVENTARIO))
+        self.client.force_login(operador)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "painel-gestor")
+
+    def test_widgets_nao_consultam_tabelas_grandes(self):
+        with CaptureQueriesContext(connection) as primeira:
+            widgets_do_painel()
+        with CaptureQueriesContext(connection) as segunda:
+            widgets_do_painel()
+
+        for query in primeira.captured_queries:
+            for tabela in TABELAS_GRANDES:
+                self.assertNotIn(f'"{tabela}"', query["sql"])
+        self.assertEqual(len(segunda.captured_queries), 0)
+
+    def test_historico_filtrado_por_intervalo_indexavel(self):
+        with CaptureQueriesContext(connection) as queries:
+            widgets_do_painel()
+
+        historico = [
+            q["sql"] for q in queries.captured_queries if "dados_comuns_historicogeral" in q["sql"]
+        ]
+        self.assertTrue(historico)
+        for sql in historico:
+            where = sql.split(" WHERE ", 1)[1].split(" GROUP BY ")[0]
+            self.assertIn('"alterado_em" >=', where)
+            self.assertNotIn("cast_date", where)
+
+    def test_comando_atualiza_o_cache(self):
+        widgets_do_painel()
+        self._mk_bem(3, AGUARDANDO_APROVACAO, "10.00")
+
+        call_command("atualizar_painel", stdout=StringIO())
+
+        with CaptureQueriesContext(connection) as queries:
+            widgets = {w["nome"]: w["valor"] for w in widgets_do_painel()}
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertEqual(widgets["aguardando_aprovacao"], 2)
@@ -0,0 +1,184 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from bem_patrimonial import eventos
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO, BLOQUEADO
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    ResumoInventarioUnidade,
+)
+from bem_patrimonial.resumo import CAMPOS_RESUMO, recalcular
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+
+class SetupResumoInventario(TestCase):
+    def setUp(self):
+        self.ua_a = UnidadeAdministrativa.objects.create(nome="Escola A", codigo="A")
+        self.ua_b = UnidadeAdministrativa.objects.create(nome="Escola B", codigo="B")
+        self.usuario = Usuario.objects.create_user(
+            username="resumo",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+        )
+
+    def _mk_bem(self, i, ua, status=APROVADO, valor="100.00"):
+        return BemPatrimonial.objects.create(
+            nome=f"Projetor {i}",
+            descricao="Desc",
+            valor_unitario=Decimal(valor),
+            marca="M",
+            modelo="X",
+            numero_patrimonial=f"004.{i:09d}-0",
+            status=status,
+            unidade_administrativa=ua,
+            criado_por=self.usuario,
+        )
+
+    def _resumo(self, ua):
+        return ResumoInventarioUnidade.objects.get(unidade_administrativa=ua)
+
+    def assertResumoConsistente(self):
+        antes = {
+            r.pk: tuple(getattr(r, c) for c in CAMPOS_RESUMO)
+            for r in ResumoInventarioUnidade.objects.all()
+        }
+        self.assertEqual(recalcular(), 0, antes)
+
+
+class ResumoInventarioTest(SetupResumoInventario):
+    def test_unidade_nova_ganha_resumo_zerado(self):
+        resumo = self._resumo(self.ua_a)
+        self.assertEqual((resumo.total_bens, resumo.valor_total), (0, 0))
+
+    def test_criacao_alteracao_e_exclusao_de_bens(self):
+        bem = self._mk_bem(1, self.ua_a, status=AGUARDANDO_APROVACAO, valor="10.50")
+        self._mk_bem(2, self.ua_a, valor="5.25")
+
+        resumo = self._resumo(self.ua_a)
+        self.assertEqual(resumo.total_bens, 2)
+        self.assertEqual(resumo.valor_total, Decimal("15.75"))
+        self.assertEqual(resumo.total_aguardando_aprovacao, 1)
+        self.assertEqual(resumo.total_aprovados, 1)
+
+        bem.alterar_status(APROVADO, self.usuario)
+        bem.refresh_from_db()
+        bem.unidade_administrativa = self.ua_b
+        bem.valor_unitario = Decimal("20.00")
+        bem.save()
+        self.assertEqual(self._resumo(self.ua_a).total_bens, 1)
+        self.assertEqual(self._resumo(self.ua_b).valor_total, Decimal("20.00"))
+        self.assertEqual(self._resumo(self.ua_b).total_aprovados, 1)
+
+        bem.delete()
+        self.assertEqual(self._resumo(self.ua_b).total_bens, 0)
+        self.assertResumoConsistente()
+
+    def test_ciclo_de_movimentacao(self):
+        bem = self._mk_bem(1, self.ua_a)
+        movimentacao = MovimentacaoBemPatrimonial.objects.create(
+            bem_patrimonial=bem,
+            unidade_administrativa_origem=self.ua_a,
+            unidade_administrativa_destino=self.ua_b,
+            solicitado_por=self.usuario,
+        )
+
+        origem = self._resumo(self.ua_a)
+        self.assertEqual(origem.total_bloqueados, 1)
+        self.assertEqual(origem.total_aprovados, 0)
+        self.assertEqual(origem.movimentacoes_pendentes_saida, 1)
+        self.assertEqual(self._resumo(self.ua_b).movimentacoes_pendentes_entrada, 1)
+        self.assertResumoConsistente()
+
+        movimentacao.aprovar_solicitacao(self.usuario)
+
+        self.assertEqual(self._resumo(self.ua_a).total_bens, 0)
+        destino = self._resumo(self.ua_b)
+        self.assertEqual(destino.total_aprovados, 1)
+        self.assertEqual(destino.movimentacoes_pendentes_entrada, 0)
+        self.assertResumoConsistente()
+
+    def test_unidade_de_trabalho_grava_o_resumo_uma_vez(self):
+        with eventos.unidade_de_trabalho() as unidade:
+            self._mk_bem(1, self.ua_a)
+            self._mk_bem(2, self.ua_b)
+            self.assertEqual(self._resumo(self.ua_a).total_bens, 0)
+            self.assertEqual(len(unidade.resumo.por_unidade), 2)
+
+        self.assertEqual(self._resumo(self.ua_a).total_bens, 1)
+        self.assertEqual(self._resumo(self.ua_b).total_bens, 1)
+
+    def test_reconciliar_corrige_divergencias(self):
+        BemPatrimonial.objects.bulk_create(
+            [
+                BemPatrimonial(
+                    nome="Sem signal",
+                    descricao="Desc",
+                    valor_unitario=Decimal("1.00"),
+                    marca="M",
+                    modelo="X",
+                    numero_patrimonial="004.999999999-0",
+                    status=BLOQUEADO,
+                    unidade_administrativa=self.ua_a,
+                )
+            ]
+        )
+        ResumoInventarioUnidade.objects.filter(unidade_administrativa=self.ua_b).delete()
+        saida = StringIO()
+
+        call_command("reconciliar_resumo_inventario", stdout=saida)
+
+        self.assertIn("2 unidade(s) divergente(s)", saida.getvalue())
+        self.assertEqual(self._resumo(self.ua_a).total_bloqueados, 1)
+        self.assertTrue(
+            ResumoInventarioUnidade.objects.filter(unidade_administrativa=self.ua_b).exists()
+        )
+        self.assertResumoConsistente()
+
+
+class ResumoInventarioAdminTest(SetupResumoInventario):
+    url = reverse("admin:bem_patrimonial_resumoinventariounidade_changelist")
+
+    def test_gestor_ve_todas_as_unidades_e_o_total(self):
+        self.usuario.groups.add(Group.objects.create(name=GRUPO_GESTOR_PATRIMONIO))
+        self.usuario.is_superuser = True
+        self.usuario.save()
+        self._mk_bem(1, self.ua_a)
+        self._mk_bem(2, self.ua_b)
+        self.client.force_login(self.usuario)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertEqual(response.context["totais"]["total_bens"], 2)
+
+    def test_operador_ve_apenas_sua_unidade(self):
+        operador = Usuario.objects.create_user(
+            username="operador_resumo",
+            password="test123",
+            is_staff=True,
+            must_change_password=False,
+            unidade_administrativa=self.ua_a,
+        )
+        operador.groups.add(Group.objects.create(name=GRUPO_OPERADOR_INVENTARIO))
+        operador.user_permissions.add(
+            Permission.objects.get(codename="view_resumoinventariounidade")
+        )
+        self.client.force_login(operador)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [r.unidade_administrativa for r in response.context["cl"].result_list],
+            [self.ua_a],
+        )
@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bem_patrimonial.admins.movimentacao_bem_patrimonial import (
+    MovimentacaoBemPatrimonialAdmin,
+)
+from bem_patrimonial.constants import APROVADO, BLOQUEADO
+from bem_patrimonial.models import (
+    BemPatrimonial,
+    MovimentacaoBemPatrimonial,
+    StatusBemPatrimonial,
+)
+from bem_patrimonial.services import criar_movimentacao
+from dados_comuns.models import HistoricoGeral, UnidadeAdministrativa
+from usuario.constants import GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+# Consultas do fluxo de criação pelo admin antes do serviço de movimentação
+# (três gets no clean, pendência conferida duas vezes e o bem salvo duas
+# vezes pelos signals).
+CONSULTAS_ANTES_DO_SERVICO = 30
+
+
+class ServicoMovimentacaoTest(TestCase):
+    def setUp(self):
+        self.ua_origem = UnidadeAdministrativa.objects.create(
+            nome="DRE Centro", codigo="DRE-CENTRO"
+        )
+        self.ua_destino = UnidadeAdministrativa.objects.create(
+            nome="DRE Sul", codigo="DRE-SUL"
+        )
+        self.operador = Usuario.objects.create_user(
+            username="operador_servico",
+            email="operador@test.com",
+            password="test123",
+            unidade_administrativa=self.ua_origem,
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_OPERADOR_INVENTARIO)
+        self.operador.groups.add(grupo)
+        Usuario.objects.create_user(
+            username="destinatario_servico",
+            email="destino@test.com",
+            password="test123",
+            unidade_administrativa=self.ua_destino,
+        )
+        self.bem = BemPatrimonial.objects.create(
+            nome="Computador",
+            descricao="Desc",
+            valor_unitario=Decimal("10.00"),
+            marca="M",
+            modelo="X",
+            sem_numeracao=True,
+            status=APROVADO,
+            unidade_administrativa=self.ua_origem,
+        )
+        self.admin = MovimentacaoBemPatrimonialAdmin(
+            MovimentacaoBemPatrimonial, AdminSite()
+        )
+
+    def _request(self):
+        request = RequestFactory().post("/admin/")
+        request.user = self.operador
+        setattr(request, "session", "session")
+        setattr(request, "_messages", FallbackStorage(request))
+        return request
+
+    def _dados(self):
+        return {
+            "bem_patrimonial": self.bem.pk,
+            "unidade_administrativa_origem": self.ua_origem.pk,
+            "unidade_administrativa_destino": self.ua_destino.pk,
+        }
+
+    def test_criacao_pelo_admin_usa_menos_da_metade_das_consultas(self):
+        request = self._request()
+        ContentType.objects.get_for_model(BemPatrimonial)
+
+        with CaptureQueriesContext(connection) as ctx:
+            form = self.admin.get_form(request)(data=self._dados())
+            self.assertTrue(form.is_valid(), form.errors)
+            movimentacao = form.save(commit=False)
+            self.admin.save_model(request, movimentacao, form, False)
+
+        self.assertIsNotNone(movimentacao.pk)
+        self.assertLess(len(ctx.captured_queries), CONSULTAS_ANTES_DO_SERVICO / 2)
+
+    def test_bloqueio_registra_status_e_historico(self):
+        movimentacao = criar_movimentacao(
+            MovimentacaoBemPatrimonial(
+                bem_patrimonial=self.bem,
+                unidade_administrativa_origem=self.ua_origem,
+                unidade_administrativa_destino=self.ua_destino,
+            ),
+            self.operador,
+        )
+
+        self.bem.refresh_from_db()
+        self.assertEqual(self.bem.status, BLOQUEADO)
+        self.assertEqual(movimentacao.bem_patrimonial.status, BLOQUEADO)
+        status = StatusBemPatrimonial.objects.filter(bem_patrimonial=self.bem).last()
+        self.assertEqual(status.status, BLOQUEADO)
+        self.assertIn(str(movimentacao.pk), status.observacao)
+        historico = HistoricoGeral.objects.get(object_id=str(self.bem.pk))
+        self.assertEqual(
+            (historico.campo, historico.valor_antigo, historico.valor_novo),
+            ("status", APROVADO, BLOQUEADO),
+        )
+
+    def test_nao_cria_segunda_movimentacao_pendente(self):
+        MovimentacaoBemPatrimonial.objects.bulk_create(
+            [
+                MovimentacaoBemPatrimonial(
+                    bem_patrimonial=self.bem,
+                    unidade_administrativa_origem=self.ua_origem,
+                    unidade_administrativa_destino=self.ua_destino,
+                    solicitado_por=self.operador,
+                )
+            ]
+        )
+
+        with self.assertRaisesMessage(ValidationError, "movimentação pendente"):
+            criar_movimentacao(
+                MovimentacaoBemPatrimonial(
+                    bem_patrimonial=self.bem,
+                    unidade_administrativa_origem=self.ua_origem,
+                    unidade_administrativa_destino=self.ua_destino,
+                ),
+                self.operador,
+            )
+        self.assertEqual(MovimentacaoBemPatrimonial.objects.count(), 1)
+
+    def test_form_mantem_mensagem_de_bem_bloqueado(self):
+        self.bem.status = BLOQUEADO
+        self.bem.save()
+
+        form = self.admin.get_form(self._request())(data=self._dados())
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("bloqueado para movimentação", str(form.errors))
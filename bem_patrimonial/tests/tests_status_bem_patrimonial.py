@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bem_patrimonial.constants import AGUARDANDO_APROVACAO, APROVADO, NAO_APROVADO
+from bem_patrimonial.models import BemPatrimonial, StatusBemPatrimonial
+from dados_comuns.models import HistoricoGeral
+from usuario.models import Usuario
+
+
+class StatusBemPatrimonialTest(TestCase):
+    def setUp(self):
+        self.usuario = Usuario.objects.create_user(
+            username="status", password="test123", email="status@test.com"
+        )
+
+    def _mk_bens(self, quantidade, status=AGUARDANDO_APROVACAO, inicio=0):
+        return [
+            BemPatrimonial.objects.create(
+                nome=f"Armário {i}",
+                descricao="Desc",
+                valor_unitario=Decimal("10.00"),
+                marca="M",
+                modelo="X",
+                numero_patrimonial=f"003.{i:09d}-0",
+                status=status,
+                criado_por=self.usuario,
+            )
+            for i in range(inicio, inicio + quantidade)
+        ]
+
+    def test_alterar_status_atualiza_bem_e_historico(self):
+        (bem,) = self._mk_bens(1)
+
+        registro = bem.alterar_status(APROVADO, self.usuario, "Conferido")
+
+        self.assertIsNotNone(registro.pk)
+        self.assertEqual(bem.status, APROVADO)
+        bem.refresh_from_db()
+        self.assertEqual(bem.status, APROVADO)
+        historico = HistoricoGeral.objects.get(object_id=str(bem.pk), campo="status")
+        self.assertEqual(
+            (historico.valor_antigo, historico.valor_novo),
+            (AGUARDANDO_APROVACAO, APROVADO),
+        )
+
+    def test_bem_aprovado_nao_muda_de_status(self):
+        (bem,) = self._mk_bens(1, status=APROVADO)
+
+        bem.alterar_status(NAO_APROVADO, self.usuario)
+
+        bem.refresh_from_db()
+        self.assertEqual(bem.status, APROVADO)
+        self.assertTrue(
+            StatusBemPatrimonial.objects.filter(
+                bem_patrimonial=bem, status=NAO_APROVADO
+            ).exists()
+        )
+
+    def test_save_sem_bem_carregado(self):
+        (bem,) = self._mk_bens(1)
+
+        StatusBemPatrimonial.objects.create(bem_patrimonial_id=bem.pk, status=APROVADO)
+
+        bem.refresh_from_db()
+        self.assertEqual(bem.status, APROVADO)
+
+    def test_registrar_em_lote_custa_o_mesmo_para_n_registros(self):
+        def registrar(quantidade, inicio):
+            bens = self._mk_bens(quantidade, inicio=inicio)
+            registros = [
+                StatusBemPatrimonial(
+                    bem_patrimonial=bem, status=APROVADO, atualizado_por=self.usuario
+                )
+                for bem in bens
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                StatusBemPatrimonial.objects.registrar(registros)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(registrar(2, 0), registrar(15, 100))
+        self.assertFalse(
+            BemPatrimonial.objects.exclude(status=APROVADO).exists()
+        )
+
+    def test_registrar_ultimo_status_prevalece_e_envia_email_de_reprovado(self):
+        (bem,) = self._mk_bens(1)
+        existente = StatusBemPatrimonial.objects.filter(bem_patrimonial=bem).get()
+        existente.observacao = "Revisado"
+        mail.outbox = []
+
+        StatusBemPatrimonial.objects.registrar(
+            [
+                existente,
+                StatusBemPatrimonial(bem_patrimonial=bem, status=NAO_APROVADO),
+            ]
+        )
+
+        bem.refresh_from_db()
+        self.assertEqual(bem.status, NAO_APROVADO)
+        existente.refresh_from_db()
+        self.assertEqual(existente.observacao, "Revisado")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["status@test.com"])
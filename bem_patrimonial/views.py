@@ -1,3 +1,55 @@
-from django.shortcuts import render
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
 
-# Create your views here.
+from bem_patrimonial.models import BemPatrimonial, MovimentacaoBemPatrimonial
+from dados_comuns.libs.unidade_administrativa import ids_uas_permitidas
+from dados_comuns.views import UnidadeAdministrativaAutocompleteView
+
+
+class AutocompleteView(UnidadeAdministrativaAutocompleteView):
+    """
+    Acrescenta ao autocomplete do admin a busca de bens movimentáveis do
+    formulário de movimentação, restrita à UA do operador.
+    """
+
+    def responder(self, request, to_field_name):
+        if (
+            self.source_field
+            is not MovimentacaoBemPatrimonial._meta.get_field("bem_patrimonial")
+            or to_field_name != "id"
+        ):
+            return super().responder(request, to_field_name)
+
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        queryset = BemPatrimonial.objects.movimentaveis()
+        ids_permitidos = ids_uas_permitidas(request.user)
+        if ids_permitidos is not None:
+            queryset = queryset.filter(unidade_administrativa_id__in=ids_permitidos)
+        queryset, use_distinct = self.model_admin.get_search_results(
+            request, queryset, self.term
+        )
+        if use_distinct:
+            queryset = queryset.distinct()
+
+        try:
+            pagina = max(int(request.GET.get("page") or 1), 1)
+        except ValueError:
+            pagina = 1
+        inicio = (pagina - 1) * self.paginate_by
+        # Busca um item a mais para saber se há próxima página sem COUNT(*).
+        bens = list(
+            queryset.only("id", "nome", "numero_patrimonial").order_by("-id")[
+                inicio : inicio + self.paginate_by + 1
+            ]
+        )
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": str(bem.id), "text": str(bem)}
+                    for bem in bens[: self.paginate_by]
+                ],
+                "pagination": {"more": len(bens) > self.paginate_by},
+            }
+        )
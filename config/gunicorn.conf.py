@@ -0,0 +1,54 @@
+"""
+Configuração do gunicorn usada pelo entrypoint.sh.
+
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8001")
+
+# Processos x threads: as exportações, o PDF e o envio de e-mail são síncronos,
+# então as threads evitam que uma requisição lenta bloqueie o worker inteiro.
+workers = _env_int("GUNICORN_WORKERS", 3)
+threads = _env_int("GUNICORN_THREADS", 4)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+# Reciclagem dos workers para conter crescimento de memória (ex.: exportações grandes).
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# Exportações de todo o inventário podem levar minutos.
+timeout = _env_int("GUNICORN_TIMEOUT", 300)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-")
+errorlog = os.environ.get("GUNICORN_ERRORLOG", "-")
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
+
+
+def on_starting(server):
+    # Sem diretório compartilhado, cada coleta do /metrics devolve só os valores
+    # do worker que respondeu, e rate() sobre eles não faz sentido.
+    metricas_ativas = os.environ.get("DJANGO_METRICAS_ATIVAS", "True").lower() in (
+        "true", "on", "ok", "y", "yes", "1",
+    )
+    if workers > 1 and metricas_ativas and not os.environ.get("DJANGO_METRICAS_DIRETORIO"):
+        server.log.warning(
+            "%s workers com métricas ativas e sem DJANGO_METRICAS_DIRETORIO: "
+            "o /metrics mostrará apenas os valores do worker que responder.",
+            workers,
+        )
+
+
+def worker_exit(server, worker):
+    # Grava as métricas do worker que está saindo (reciclagem por max_requests).
+    from dados_comuns import metricas
+
+    metricas.gravar()
@@ -82,13 +82,17 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 AUTH_USER_MODEL = "usuario.Usuario"
 
 MIDDLEWARE = [
+    "dados_comuns.middleware.MetricasMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "dados_comuns.middleware.AuditUserMiddleware",
+    "dados_comuns.middleware.InstrumentacaoMiddleware",
+    "dados_comuns.middleware.ReplicaRoutingMiddleware",
     "usuario.middleware.ForcePasswordChangeMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -118,6 +122,11 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Conexões persistentes: https://docs.djangoproject.com/en/4.1/ref/databases/#persistent-connections
+# Com POSTGRES_PGBOUNCER=True (pool em modo transaction) os cursores do lado do
+# servidor usados por QuerySet.iterator() são desabilitados.
+POSTGRES_PGBOUNCER = env.bool("POSTGRES_PGBOUNCER", default=False)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -126,9 +135,82 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        "CONN_MAX_AGE": env.int("POSTGRES_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": env.bool("POSTGRES_CONN_HEALTH_CHECKS", default=True),
+        "DISABLE_SERVER_SIDE_CURSORS": POSTGRES_PGBOUNCER,
     }
 }
 
+# Réplica de leitura (opcional)
+# Exportações, relatórios, histórico e autocomplete leem da réplica quando
+# POSTGRES_REPLICA_HOST estiver definido. Ver dados_comuns/db_router.py.
+
+DATABASE_REPLICA_ALIAS = "replica"
+POSTGRES_REPLICA_HOST = env("POSTGRES_REPLICA_HOST", default="")
+
+if POSTGRES_REPLICA_HOST:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES["default"],
+        "HOST": POSTGRES_REPLICA_HOST,
+        "PORT": env("POSTGRES_REPLICA_PORT", default="")
+        or DATABASES["default"]["PORT"],
+        "USER": env("POSTGRES_REPLICA_USER", default="")
+        or DATABASES["default"]["USER"],
+        "PASSWORD": env("POSTGRES_REPLICA_PASSWORD", default="")
+        or DATABASES["default"]["PASSWORD"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["dados_comuns.db_router.ReplicaRouter"]
+
+REPLICA_LEITURA_PATHS = env.list(
+    "DJANGO_REPLICA_LEITURA_PATHS", default=["/admin/autocomplete/"]
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# DJANGO_CACHE_BACKEND: locmem (padrão; por processo, não compartilhado entre
+# workers), redis, file ou db (exige `python manage.py createcachetable`).
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "db": "django.core.cache.backends.db.DatabaseCache",
+}
+CACHE_LOCATIONS = {
+    "locmem": "bensfisicos",
+    "redis": "redis://localhost:6379/1",
+    "file": "/tmp/bensfisicos_cache",
+    "db": "bensfisicos_cache",
+}
+DJANGO_CACHE_BACKEND = env("DJANGO_CACHE_BACKEND", default="locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[DJANGO_CACHE_BACKEND],
+        "LOCATION": env("DJANGO_CACHE_LOCATION", default="")
+        or CACHE_LOCATIONS[DJANGO_CACHE_BACKEND],
+        "TIMEOUT": env.int("DJANGO_CACHE_TIMEOUT", default=300),
+        "KEY_PREFIX": "bensfisicos",
+    }
+}
+
+# Sessões
+# Com cache compartilhado (redis), cached_db lê a sessão do cache e só vai ao
+# banco quando ela não está lá. Com locmem cada worker teria a sua cópia (um
+# logout não valeria nos outros), então o padrão continua sendo o banco.
+# Também aceita "django.contrib.sessions.backends.signed_cookies".
+SESSION_ENGINE = env(
+    "DJANGO_SESSION_ENGINE",
+    default=(
+        "django.contrib.sessions.backends.cached_db"
+        if DJANGO_CACHE_BACKEND == "redis"
+        else "django.contrib.sessions.backends.db"
+    ),
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -177,6 +259,11 @@ STATIC_URL = "/django_static/"
 STATICFILES_DIRS = [
     str(BASE_DIR.path("static")),
 ]
+# https://whitenoise.readthedocs.io/en/stable/django.html
+# Arquivos com hash no nome e pré-comprimidos (gzip/brotli); exige collectstatic.
+# O entrypoint.sh habilita em modo de produção (gunicorn/uvicorn).
+if env.bool("DJANGO_STATICFILES_COMPRESSED", default=False):
+    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 # MEDIA
 # ------------------------------------------------------------------------------
@@ -185,6 +272,15 @@ STATICFILES_DIRS = [
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
 
+# Fotos dos bens (bem_patrimonial/imagens.py): limite do upload, maior lado do
+# original depois de normalizado e se as miniaturas são geradas numa thread
+# depois do commit (False processa na própria requisição).
+FOTO_TAMANHO_MAXIMO_MB = env.int("DJANGO_FOTO_TAMANHO_MAXIMO_MB", default=10)
+FOTO_DIMENSAO_MAXIMA = env.int("DJANGO_FOTO_DIMENSAO_MAXIMA", default=1600)
+FOTO_PROCESSAMENTO_EM_SEGUNDO_PLANO = env.bool(
+    "DJANGO_FOTO_PROCESSAMENTO_EM_SEGUNDO_PLANO", default=True
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -212,7 +308,8 @@ DEFAULT_TO_EMAIL = env("DJANGO_DEFAULT_TO_EMAIL")
 # https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication"
+        "rest_framework.authentication.BasicAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
     ]
 }
 
@@ -232,20 +329,66 @@ LOGGING = {
     "formatters": {
         "verbose": {
             "format": "%(levelname)s %(asctime)s %(module)s "
-            "%(process)d %(thread)d %(message)s"
+            "%(process)d %(thread)d [%(correlacao)s u=%(usuario_id)s] %(message)s"
         }
     },
+    "filters": {
+        "contexto_auditoria": {"()": "dados_comuns.context.FiltroContextoAuditoria"}
+    },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
             "formatter": "verbose",
+            "filters": ["contexto_auditoria"],
         }
     },
     "root": {"level": "INFO", "handlers": ["console"]},
 }
 
 
+# Extração de número patrimonial
+# Quantidade de bens gravados por transação na ação "Aplicar extração".
+EXTRACAO_NUMERO_TAMANHO_LOTE = env.int("DJANGO_EXTRACAO_NUMERO_TAMANHO_LOTE", default=500)
+
+# Autocomplete de unidades administrativas
+# Tempo (segundos) que o navegador pode reutilizar uma resposta sem revalidar.
+AUTOCOMPLETE_UA_MAX_AGE = env.int("DJANGO_AUTOCOMPLETE_UA_MAX_AGE", default=30)
+
+# Painel do admin (index) para gestores
+# Com True, widgets vencidos são recalculados numa thread enquanto o valor
+# anterior é exibido; com False, a requisição que encontra o valor vencido recalcula.
+PAINEL_ATUALIZACAO_EM_SEGUNDO_PLANO = env.bool(
+    "DJANGO_PAINEL_ATUALIZACAO_EM_SEGUNDO_PLANO", default=True
+)
+
+# Instrumentação de requisições (dados_comuns/instrumentacao.py)
+# Desligada por padrão. Limites por prefixo de URL (vale o prefixo mais longo);
+# acima deles o registro sai como WARNING.
+INSTRUMENTACAO_ATIVA = env.bool("DJANGO_INSTRUMENTACAO_ATIVA", default=False)
+INSTRUMENTACAO_LIMITES = {
+    "/admin/": {"tempo_ms": 1000, "consultas": 50, "repeticoes": 5},
+    "/admin/autocomplete/": {"tempo_ms": 300, "consultas": 10},
+    "/api/": {"tempo_ms": 500, "consultas": 20},
+}
+
+# Métricas no formato do Prometheus (/metrics, dados_comuns/metricas.py)
+# O coletor se autentica com "Authorization: Bearer <METRICAS_TOKEN>"; sem
+# token só usuários da equipe acessam. Com vários workers do gunicorn, aponte
+# METRICAS_DIRETORIO para um diretório local compartilhado por eles (ex.:
+# /tmp/metricas) para o /metrics somar os valores de todos.
+METRICAS_ATIVAS = env.bool("DJANGO_METRICAS_ATIVAS", default=True)
+METRICAS_TOKEN = env.str("DJANGO_METRICAS_TOKEN", default="")
+METRICAS_DIRETORIO = env.str("DJANGO_METRICAS_DIRETORIO", default="")
+
+# Feed de alterações de bens (/api/bens/alteracoes/ e exportar_alteracoes_bens)
+# A janela termina alguns segundos no passado para incluir gravações de
+# transações que ainda não tinham sido confirmadas.
+FEED_ALTERACOES_MARGEM_SEGUNDOS = env.int(
+    "DJANGO_FEED_ALTERACOES_MARGEM_SEGUNDOS", default=60
+)
+
+
 ADMIN_SITE_TITLE = "Bens Físicos"
 ADMIN_SITE_HEADER = "Bens Físicos"
 ADMIN_INDEX_TITLE = "Bens Físicos Admin"
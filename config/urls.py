@@ -14,6 +14,8 @@ from django.shortcuts import redirect
 from django.urls import reverse
 from django.conf.urls.static import static
 from django.conf import settings
+from bem_patrimonial.views import AutocompleteView
+from dados_comuns.views import estatisticas_cache, metricas
 
 
 # Módulo de Suporte desabilitado temporariamente
@@ -73,7 +75,23 @@ urlpatterns = [
         LoginPasswordChangeDoneView.as_view(),
         name="password_change_done",
     ),
+    path(
+        "admin/monitoramento/cache/",
+        estatisticas_cache,
+        name="estatisticas_cache",
+    ),
+    # Substitui o autocomplete padrão do admin (mesma URL); unidades
+    # administrativas e bens movimentáveis têm respostas otimizadas.
+    path(
+        "admin/autocomplete/",
+        admin.site.admin_view(AutocompleteView.as_view(admin_site=admin.site)),
+        name="admin_autocomplete",
+    ),
     path("admin/", admin.site.urls),
+    # Métricas para o Prometheus
+    path("metrics", metricas, name="metricas"),
+    # API somente leitura (bens, movimentações e unidades administrativas)
+    path("api/", include("bem_patrimonial.api.urls")),
 ]
 
 if settings.DEBUG:
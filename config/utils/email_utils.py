@@ -1,8 +1,10 @@
 import sys
+import time
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.template import Context
 from django.template.loader import render_to_string
+from dados_comuns import metricas
 
 
 def send_email_ctrl(subject, dict, template, to_email, from_email=settings.DEFAULT_FROM_EMAIL):
@@ -12,13 +14,19 @@ def send_email_ctrl(subject, dict, template, to_email, from_email=settings.DEFAU
     if not dict:
         dict = {}
 
+    inicio = time.perf_counter()
+    resultado = 'erro'
     try:
-        html_template = template
-        context = Context(dict)
-        content = render_to_string(html_template, {'context': context})
-        send_email = EmailMessage(subject, content, from_email, to_email)
-        send_email.content_subtype = 'html'
-        send_email.send()
+        with metricas.EMAIL_EM_ENVIO.em_andamento():
+            html_template = template
+            context = Context(dict)
+            content = render_to_string(html_template, {'context': context})
+            send_email = EmailMessage(subject, content, from_email, to_email)
+            send_email.content_subtype = 'html'
+            send_email.send()
+        resultado = 'sucesso'
     except Exception:
         print('erro send_email_ctrl', sys.exc_info()[0])
         raise
+    finally:
+        metricas.EMAIL_DURACAO.observar(time.perf_counter() - inicio, resultado=resultado)
@@ -5,3 +5,6 @@ class DadosComunsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dados_comuns'
     verbose_name = 'Dados comuns'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,223 @@
+"""
+Helpers de cache compartilhado (cache-aside) com chaves versionadas por tag.
+
+Cada tag tem uma versão guardada no próprio cache. As chaves incluem a versão
+das tags de que dependem, então invalidar uma tag (incrementar sua versão)
+torna obsoletas todas as chaves derivadas, sem precisar localizá-las.
+As tags são invalidadas pelos signals de post_save/post_delete dos models
+(ver dados_comuns/signals.py, usuario/signals.py e agendamento_suporte/signals.py)
+depois do commit: invalidar antes dele deixaria um leitor concorrente gravar,
+sob a versão nova, o valor anterior à transação.
+"""
+
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from dados_comuns.context import com_contexto
+
+TAG_UNIDADE_ADMINISTRATIVA = "unidade_administrativa"
+TAG_GRUPOS_USUARIO = "grupos_usuario"
+TAG_AGENDA_SUPORTE = "agenda_suporte"
+TAG_AGENDA_CONFIGURACAO = "agenda_configuracao"
+
+PREFIXO = "dc"
+CHAVE_NOMES = f"{PREFIXO}:stats:nomes"
+TAMANHO_MAXIMO_CHAVE = 200
+
+# Valores de obter_com_atualizacao expiram de vez após FATOR_VALIDADE x ttl.
+FATOR_VALIDADE = 10
+
+_AUSENTE = object()
+_nomes_registrados = set()
+
+
+def _chave_versao(tag):
+    return f"{PREFIXO}:versao:{tag}"
+
+
+def _chave_contador(nome, tipo):
+    return f"{PREFIXO}:stats:{nome}:{tipo}"
+
+
+def _nova_versao():
+    # Baseada no relógio: se a chave de versão for despejada do cache, a nova
+    # versão nunca coincide com uma antiga.
+    return time.time_ns()
+
+
+def versoes(*tags):
+    """Retorna {tag: versão}, criando as versões que ainda não existem."""
+    chaves = {_chave_versao(tag): tag for tag in tags}
+    encontradas = cache.get_many(list(chaves))
+    resultado = {}
+    for chave, tag in chaves.items():
+        versao = encontradas.get(chave)
+        if versao is None:
+            cache.add(chave, _nova_versao(), timeout=None)
+            versao = cache.get(chave)
+        resultado[tag] = versao
+    return resultado
+
+
+def versao(tag):
+    return versoes(tag)[tag]
+
+
+def invalidar(*tags):
+    """Invalida todas as chaves que dependem das tags informadas."""
+    for tag in tags:
+        chave = _chave_versao(tag)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.set(chave, _nova_versao(), timeout=None)
+
+
+def invalidar_apos_commit(*tags):
+    """Invalida as tags quando a transação atual for confirmada (ou já, fora dela)."""
+    transaction.on_commit(lambda: invalidar(*tags))
+
+
+def compartilhado():
+    """Se o cache padrão é visto por todos os workers (não é locmem nem dummy)."""
+    backend = settings.CACHES["default"]["BACKEND"]
+    return not backend.endswith(("LocMemCache", "DummyCache"))
+
+
+def chave(nome, *partes, tags=()):
+    """Monta a chave de `nome` para `partes`, versionada pelas `tags`."""
+    versoes_tags = versoes(*tags) if tags else {}
+    sufixo_versao = ".".join(str(versoes_tags[t]) for t in sorted(versoes_tags))
+    sufixo_partes = ":".join(str(p) for p in partes)
+    resultado = f"{PREFIXO}:{nome}:{sufixo_versao}:{sufixo_partes}"
+    if len(resultado) > TAMANHO_MAXIMO_CHAVE:
+        resumo = hashlib.md5(sufixo_partes.encode("utf-8")).hexdigest()
+        resultado = f"{PREFIXO}:{nome}:{sufixo_versao}:{resumo}"
+    return resultado
+
+
+def _incrementar(chave_contador):
+    try:
+        cache.incr(chave_contador)
+    except ValueError:
+        if not cache.add(chave_contador, 1, timeout=None):
+            cache.incr(chave_contador)
+
+
+def _registrar_nome(nome):
+    if nome in _nomes_registrados:
+        return
+    nomes = cache.get(CHAVE_NOMES) or set()
+    if nome not in nomes:
+        cache.set(CHAVE_NOMES, nomes | {nome}, timeout=None)
+    _nomes_registrados.add(nome)
+
+
+def registrar_acesso(nome, acerto):
+    _registrar_nome(nome)
+    _incrementar(_chave_contador(nome, "hits" if acerto else "misses"))
+
+
+def obter_ou_calcular(nome, partes, calcular, timeout=None, tags=()):
+    """
+    Cache-aside: devolve o valor em cache para (`nome`, `partes`) ou calcula
+    com `calcular()` e guarda. `timeout=None` usa o TIMEOUT padrão do cache.
+    """
+    chave_valor = chave(nome, *partes, tags=tags)
+    valor = cache.get(chave_valor, _AUSENTE)
+    if valor is not _AUSENTE:
+        registrar_acesso(nome, True)
+        return valor
+
+    registrar_acesso(nome, False)
+    valor = calcular()
+    if timeout is None:
+        cache.set(chave_valor, valor)
+    else:
+        cache.set(chave_valor, valor, timeout)
+    return valor
+
+
+def atualizar_em_cache(nome, partes, calcular, ttl):
+    """Recalcula e grava o valor de obter_com_atualizacao (ex.: por um comando)."""
+    valor = calcular()
+    cache.set(chave(nome, *partes), (time.time(), valor), ttl * FATOR_VALIDADE)
+    return valor
+
+
+def _agendar_atualizacao(nome, partes, calcular, ttl, em_segundo_plano):
+    trava = f"{chave(nome, *partes)}:atualizando"
+    if not cache.add(trava, 1, timeout=max(ttl, 30)):
+        return  # outro worker/thread já está recalculando
+
+    def executar():
+        try:
+            atualizar_em_cache(nome, partes, calcular, ttl)
+        finally:
+            cache.delete(trava)
+            if em_segundo_plano:
+                connections.close_all()
+
+    if em_segundo_plano:
+        threading.Thread(target=com_contexto(executar), daemon=True).start()
+    else:
+        executar()
+
+
+def obter_com_atualizacao(nome, partes, calcular, ttl, em_segundo_plano=True):
+    """
+    Cache com atualização em segundo plano (stale-while-revalidate): depois de
+    `ttl` segundos o valor antigo continua sendo devolvido enquanto uma thread
+    o recalcula, então só a primeira requisição (cache vazio) espera o cálculo.
+    """
+    guardado = cache.get(chave(nome, *partes))
+    if guardado is None:
+        registrar_acesso(nome, False)
+        return atualizar_em_cache(nome, partes, calcular, ttl)
+
+    registrar_acesso(nome, True)
+    calculado_em, valor = guardado
+    if time.time() - calculado_em >= ttl:
+        _agendar_atualizacao(nome, partes, calcular, ttl, em_segundo_plano)
+    return valor
+
+
+def em_cache(nome, tags=(), timeout=None):
+    """Decorator de obter_ou_calcular; os argumentos posicionais compõem a chave."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            return obter_ou_calcular(
+                nome, args, lambda: func(*args), timeout=timeout, tags=tags
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def estatisticas():
+    """Contadores de acertos/falhas por nome, compartilhados entre os workers."""
+    nomes = sorted((cache.get(CHAVE_NOMES) or set()) | _nomes_registrados)
+    chaves = [
+        _chave_contador(nome, tipo) for nome in nomes for tipo in ("hits", "misses")
+    ]
+    valores = cache.get_many(chaves)
+    resultado = {}
+    for nome in nomes:
+        hits = valores.get(_chave_contador(nome, "hits"), 0)
+        misses = valores.get(_chave_contador(nome, "misses"), 0)
+        total = hits + misses
+        resultado[nome] = {
+            "hits": hits,
+            "misses": misses,
+            "taxa_acerto": round(hits / total, 4) if total else None,
+        }
+    return resultado
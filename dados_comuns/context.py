@@ -1,24 +1,96 @@
-import threading
+"""
+Contexto de auditoria: usuário responsável pelas gravações (HistoricoGeral,
+exclusões, status) e id de correlação da requisição ou tarefa.
 
-_local = threading.local()
+Fica em contextvars, e não em threading.local, para acompanhar a execução
+em views assíncronas e no ASGI (o asgiref copia o contexto entre
+sync_to_async/async_to_sync). Threads e executores novos começam com o
+contexto vazio: use `com_contexto`/`submeter` para levá-lo junto e
+`capturar_contexto`/`restaurar_contexto` para tarefas em outro processo.
+"""
+
+import contextvars
+import functools
+import logging
+import uuid
+from contextlib import contextmanager
+
+_usuario = contextvars.ContextVar("auditoria_usuario", default=None)
+_correlacao = contextvars.ContextVar("auditoria_correlacao", default=None)
 
 
 def set_user(user):
-    _local.user = user
+    return _usuario.set(user)
 
 
 def get_user():
-    return getattr(_local, "user", None)
+    return _usuario.get()
 
 
-from contextlib import contextmanager
+def get_correlacao():
+    return _correlacao.get()
+
+
+def nova_correlacao():
+    return uuid.uuid4().hex
 
 
 @contextmanager
-def audit_as(user):
-    prev = get_user()
+def audit_as(user, correlacao=None):
+    token_usuario = _usuario.set(user)
+    token_correlacao = _correlacao.set(correlacao or get_correlacao() or nova_correlacao())
     try:
-        set_user(user)
         yield
     finally:
-        set_user(prev)
+        _correlacao.reset(token_correlacao)
+        _usuario.reset(token_usuario)
+
+
+def com_contexto(func):
+    """
+    Amarra `func` ao contexto atual, para rodar em outra thread (Thread,
+    executor) com o mesmo usuário e correlação. Cada chamada usa uma cópia,
+    então a função pode rodar em várias threads ao mesmo tempo.
+    """
+    contexto = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def executar(*args, **kwargs):
+        return contexto.copy().run(func, *args, **kwargs)
+
+    return executar
+
+
+def submeter(executor, func, *args, **kwargs):
+    """executor.submit(...) levando o contexto de auditoria atual."""
+    return executor.submit(com_contexto(func), *args, **kwargs)
+
+
+def capturar_contexto():
+    """Contexto serializável (ex.: argumentos de uma tarefa em outro processo)."""
+    usuario = get_user()
+    return {
+        "usuario_id": getattr(usuario, "pk", None),
+        "correlacao": get_correlacao(),
+    }
+
+
+@contextmanager
+def restaurar_contexto(dados):
+    """Recria no worker o contexto de `capturar_contexto`."""
+    from usuario.models import Usuario
+
+    usuario = None
+    if dados.get("usuario_id") is not None:
+        usuario = Usuario.objects.filter(pk=dados["usuario_id"]).first()
+    with audit_as(usuario, dados.get("correlacao")):
+        yield
+
+
+class FiltroContextoAuditoria(logging.Filter):
+    """Inclui `correlacao` e `usuario_id` nos registros de log."""
+
+    def filter(self, record):
+        record.correlacao = get_correlacao() or "-"
+        record.usuario_id = getattr(get_user(), "pk", None) or "-"
+        return True
@@ -0,0 +1,108 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+COMANDOS_DE_ESCRITA = ("INSERT", "UPDATE", "DELETE")
+
+
+def _replica_alias():
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def replica_configurada():
+    return _replica_alias() is not None
+
+
+def fixar_primario():
+    """Leituras seguintes (até o fim da requisição) vão para o banco principal."""
+    _local.primario_fixado = True
+
+
+def primario_fixado():
+    return getattr(_local, "primario_fixado", False)
+
+
+def reiniciar_estado():
+    _local.primario_fixado = False
+    _local.nivel_replica = 0
+
+
+def db_leitura():
+    """
+    Alias para uma leitura somente leitura explícita (`queryset.using(...)`):
+    a réplica quando configurada e sem escrita anterior na requisição.
+    """
+    alias = _replica_alias()
+    if alias is None or primario_fixado():
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+@contextmanager
+def leitura_replica():
+    """
+    Marca um trecho somente leitura (exportações, relatórios, histórico,
+    autocomplete) como elegível para a réplica. Pode ser usado como decorator.
+    """
+    _local.nivel_replica = getattr(_local, "nivel_replica", 0) + 1
+    try:
+        yield
+    finally:
+        _local.nivel_replica -= 1
+
+
+def _detecta_escrita(execute, sql, params, many, context):
+    comando = sql.lstrip()[:6].upper()
+    if comando in COMANDOS_DE_ESCRITA or "FOR UPDATE" in sql.upper():
+        fixar_primario()
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def monitorar_escritas():
+    """Fixa o banco principal assim que o principal receber uma escrita."""
+    if not replica_configurada():
+        yield
+        return
+    with connections[DEFAULT_DB_ALIAS].execute_wrapper(_detecta_escrita):
+        yield
+
+
+class ReplicaRouter:
+    """
+    Envia para a réplica apenas as leituras marcadas com `leitura_replica()`.
+    Depois de uma escrita no principal a requisição passa a ler só do
+    principal, para que o usuário sempre veja o que acabou de gravar.
+    Leituras dentro de transação no principal também ficam no principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_local, "nivel_replica", 0):
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        alias = db_leitura()
+        if alias == DEFAULT_DB_ALIAS:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, _replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == getattr(settings, "DATABASE_REPLICA_ALIAS", None):
+            return False
+        return None
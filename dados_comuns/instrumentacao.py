@@ -0,0 +1,118 @@
+"""
+Instrumentação por requisição (opt-in com DJANGO_INSTRUMENTACAO_ATIVA):
+tempo total, quantidade e tempo das consultas (connection.execute_wrapper)
+e consultas repetidas (N+1), com a pilha do código que as disparou.
+"""
+
+import json
+import logging
+import os
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from dados_comuns.context import get_correlacao
+
+logger = logging.getLogger(__name__)
+
+LIMITES_PADRAO = {"tempo_ms": 1000, "consultas": 50, "repeticoes": 5}
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAMANHO_MAXIMO_SQL = 300
+
+
+def limites_do_caminho(caminho):
+    """Limites do prefixo mais longo de INSTRUMENTACAO_LIMITES que casa com o caminho."""
+    limites = dict(LIMITES_PADRAO)
+    configurados = getattr(settings, "INSTRUMENTACAO_LIMITES", {})
+    prefixos = [p for p in configurados if caminho.startswith(p)]
+    if prefixos:
+        limites.update(configurados[max(prefixos, key=len)])
+    return limites
+
+
+def _pilha_do_projeto():
+    """Quadros da pilha atual que são do projeto (sem Django e bibliotecas)."""
+    return [
+        f"{os.path.relpath(quadro.filename, RAIZ_PROJETO)}:{quadro.lineno} in {quadro.name}"
+        for quadro in traceback.extract_stack()[:-2]
+        if quadro.filename.startswith(RAIZ_PROJETO)
+        and "site-packages" not in quadro.filename
+        and quadro.filename != __file__
+    ]
+
+
+class PerfilConsultas:
+    """execute_wrapper que conta e cronometra as consultas da requisição."""
+
+    def __init__(self, repeticoes):
+        self.repeticoes = repeticoes
+        self.total = 0
+        self.tempo = 0.0
+        self.por_sql = Counter()
+        self.pilhas = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.total += 1
+            self.por_sql[sql] += 1
+            if self.por_sql[sql] == self.repeticoes:
+                self.pilhas[sql] = _pilha_do_projeto()
+
+    def repetidas(self):
+        return [
+            {
+                "sql": sql[:TAMANHO_MAXIMO_SQL],
+                "vezes": self.por_sql[sql],
+                "pilha": pilha,
+            }
+            for sql, pilha in self.pilhas.items()
+        ]
+
+    def monitorar(self):
+        pilha = ExitStack()
+        for conexao in connections.all():
+            pilha.enter_context(conexao.execute_wrapper(self))
+        return pilha
+
+
+def registrar(request, response, duracao, perfil, limites):
+    tempo_ms = round(duracao * 1000, 1)
+    dados = {
+        "metodo": request.method,
+        "caminho": request.path,
+        "status": response.status_code,
+        "tempo_ms": tempo_ms,
+        "consultas": perfil.total,
+        "tempo_consultas_ms": round(perfil.tempo * 1000, 1),
+        "correlacao": get_correlacao(),
+        "usuario_id": getattr(getattr(request, "user", None), "pk", None),
+    }
+    alertas = []
+    if duracao * 1000 > limites["tempo_ms"]:
+        alertas.append("lenta")
+    if perfil.total > limites["consultas"]:
+        alertas.append("muitas_consultas")
+    repetidas = perfil.repetidas()
+    if repetidas:
+        alertas.append("consultas_repetidas")
+        dados["repetidas"] = repetidas
+    dados["alertas"] = alertas
+    logger.log(
+        logging.WARNING if alertas else logging.INFO,
+        json.dumps(dados, ensure_ascii=False),
+    )
+
+
+def server_timing(duracao, perfil):
+    return (
+        f"total;dur={duracao * 1000:.1f}, "
+        f'db;dur={perfil.tempo * 1000:.1f};desc="{perfil.total} consultas"'
+    )
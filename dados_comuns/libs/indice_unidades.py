@@ -0,0 +1,132 @@
+"""
+Índice em memória (por processo) das unidades administrativas ativas, usado
+pelo autocomplete do admin.
+
+Cada busca confere uma assinatura barata da tabela (quantidade de unidades e
+maior updated_at, numa única consulta agregada) e reconstrói o índice quando
+ela muda. A assinatura vem do banco, e não de uma versão no cache, porque o
+cache padrão (locmem) é por processo: um worker não veria a invalidação feita
+por outro. Alterações feitas com QuerySet.update() precisam atualizar
+updated_at para serem percebidas.
+"""
+
+import threading
+from collections import namedtuple
+
+from django.db.models import Count, Max
+from django.utils.text import smart_split, unescape_string_literal
+
+from dados_comuns.models import UnidadeAdministrativa
+
+ItemUnidade = namedtuple("ItemUnidade", ["id", "texto", "busca"])
+
+TAMANHO_NGRAMA = 3
+
+_lock = threading.Lock()
+_indice = None
+
+
+def _ngramas(texto):
+    return {
+        texto[i : i + TAMANHO_NGRAMA]
+        for i in range(len(texto) - TAMANHO_NGRAMA + 1)
+    }
+
+
+class IndiceUnidades:
+    def __init__(self, versao_indice, itens):
+        self.versao = versao_indice
+        self.itens = itens
+        self.posicao_por_id = {item.id: posicao for posicao, item in enumerate(itens)}
+        self.ngramas = {}
+        for posicao, item in enumerate(itens):
+            for ngrama in _ngramas(item.busca):
+                self.ngramas.setdefault(ngrama, set()).add(posicao)
+
+    def _candidatas(self, palavra):
+        if len(palavra) < TAMANHO_NGRAMA:
+            return None
+        candidatas = None
+        for ngrama in _ngramas(palavra):
+            posicoes = self.ngramas.get(ngrama)
+            if not posicoes:
+                return set()
+            candidatas = posicoes if candidatas is None else candidatas & posicoes
+        return candidatas
+
+    def buscar(self, termo, ids_permitidos=None):
+        """
+        Mesma semântica do `search_fields` do admin: cada palavra do termo
+        precisa aparecer (sem diferenciar maiúsculas) na sigla, nome ou código.
+        Devolve os itens na ordenação do model (código, sigla, nome).
+        """
+        palavras = [normalizar_termo(p) for p in smart_split(termo or "")]
+        palavras = [p for p in palavras if p]
+
+        if ids_permitidos is not None:
+            posicoes = {
+                self.posicao_por_id[i] for i in ids_permitidos if i in self.posicao_por_id
+            }
+        else:
+            posicoes = None
+
+        for palavra in palavras:
+            candidatas = self._candidatas(palavra)
+            if candidatas is not None:
+                posicoes = candidatas if posicoes is None else posicoes & candidatas
+
+        if posicoes is None:
+            itens = self.itens
+        else:
+            itens = [self.itens[p] for p in sorted(posicoes)]
+
+        return [
+            item for item in itens if all(palavra in item.busca for palavra in palavras)
+        ]
+
+
+def normalizar_termo(palavra):
+    if palavra.startswith(('"', "'")) and palavra[0] == palavra[-1]:
+        palavra = unescape_string_literal(palavra)
+    return palavra.casefold()
+
+
+def _construir(versao_indice):
+    unidades = UnidadeAdministrativa.objects.filter(
+        status=UnidadeAdministrativa.ATIVA
+    ).order_by("codigo", "sigla", "nome")
+    itens = [
+        ItemUnidade(
+            id=ua.id,
+            texto=str(ua),
+            # Campos separados por \x00 para que nenhuma palavra "atravesse" dois campos.
+            busca="\x00".join((ua.sigla, ua.nome, ua.codigo)).casefold(),
+        )
+        for ua in unidades.only("id", "codigo", "sigla", "nome")
+    ]
+    return IndiceUnidades(versao_indice, itens)
+
+
+def _assinatura():
+    valores = UnidadeAdministrativa.objects.aggregate(
+        total=Count("id"), atualizado_em=Max("updated_at")
+    )
+    return (valores["total"], valores["atualizado_em"])
+
+
+def obter_indice():
+    global _indice
+    versao_atual = _assinatura()
+    indice = _indice
+    if indice is not None and indice.versao == versao_atual:
+        return indice
+    with _lock:
+        if _indice is None or _indice.versao != versao_atual:
+            _indice = _construir(versao_atual)
+        return _indice
+
+
+def descartar_indice():
+    global _indice
+    with _lock:
+        _indice = None
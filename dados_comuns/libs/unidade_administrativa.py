@@ -1,7 +1,45 @@
+from dados_comuns.cache import TAG_GRUPOS_USUARIO, compartilhado, obter_ou_calcular
 from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
 
 
 def uas_do_usuario(user):
     if hasattr(user, "unidade_administrativa_id") and user.unidade_administrativa_id:
         return UnidadeAdministrativa.objects.filter(id=user.unidade_administrativa_id)
-    return UnidadeAdministrativa.objects.none()
\ No newline at end of file
+    return UnidadeAdministrativa.objects.none()
+
+
+def grupos_do_usuario(user):
+    """
+    Nomes dos grupos do usuário, guardados no próprio objeto (uma consulta por
+    requisição). Com cache compartilhado, também ficam no cache até a próxima
+    alteração de grupos; com locmem não, porque a invalidação feita num worker
+    não chega aos outros e a restrição por UA ficaria desatualizada neles.
+    """
+    grupos = getattr(user, "_grupos_do_usuario", None)
+    if grupos is not None:
+        return grupos
+
+    def calcular():
+        return frozenset(user.groups.values_list("name", flat=True))
+
+    if compartilhado():
+        grupos = obter_ou_calcular(
+            "grupos_usuario", [user.pk], calcular, tags=[TAG_GRUPOS_USUARIO]
+        )
+    else:
+        grupos = calcular()
+    user._grupos_do_usuario = grupos
+    return grupos
+
+
+def ids_uas_permitidas(user):
+    """
+    Ids das UAs a que o usuário está restrito (operador que não é gestor),
+    ou None quando não há restrição.
+    """
+    grupos = grupos_do_usuario(user)
+    if GRUPO_OPERADOR_INVENTARIO in grupos and GRUPO_GESTOR_PATRIMONIO not in grupos:
+        ua_id = getattr(user, "unidade_administrativa_id", None)
+        return (ua_id,) if ua_id else ()
+    return None
@@ -0,0 +1,84 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+from dados_comuns.models import UnidadeAdministrativa
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[idx]
+
+
+class Command(BaseCommand):
+    help = """Mede a latência por requisição com e sem conexões persistentes (CONN_MAX_AGE).
+
+Cada "requisição" dispara request_started/request_finished, como o handler
+do Django, e executa algumas queries pequenas, como as telas do admin."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requisicoes", type=int, default=200)
+        parser.add_argument("--queries", type=int, default=5)
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=None,
+            help="CONN_MAX_AGE do cenário com pool (padrão: o configurado, ou 60).",
+        )
+        parser.add_argument("--json", action="store_true")
+
+    def _executar(self, conn_max_age, requisicoes, queries):
+        original = connection.settings_dict["CONN_MAX_AGE"]
+        connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+        connection.close()
+        tempos = []
+        try:
+            for _ in range(requisicoes):
+                inicio = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                for _ in range(queries):
+                    UnidadeAdministrativa.objects.filter(
+                        status=UnidadeAdministrativa.ATIVA
+                    ).exists()
+                request_finished.send(sender=self.__class__)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = original
+
+        return {
+            "conn_max_age": conn_max_age,
+            "requisicoes": requisicoes,
+            "media_ms": round(statistics.mean(tempos), 3),
+            "p50_ms": round(_percentil(tempos, 50), 3),
+            "p95_ms": round(_percentil(tempos, 95), 3),
+        }
+
+    def handle(self, *args, **options):
+        requisicoes = options["requisicoes"]
+        queries = options["queries"]
+        persistente = options["conn_max_age"]
+        if persistente is None:
+            persistente = connection.settings_dict["CONN_MAX_AGE"] or 60
+
+        resultados = [
+            self._executar(0, requisicoes, queries),
+            self._executar(persistente, requisicoes, queries),
+        ]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(resultados, indent=2))
+            return
+
+        for r in resultados:
+            rotulo = "sem pool" if r["conn_max_age"] == 0 else "persistente"
+            self.stdout.write(
+                f"{rotulo:<12} CONN_MAX_AGE={r['conn_max_age']:<5} "
+                f"média={r['media_ms']}ms p50={r['p50_ms']}ms p95={r['p95_ms']}ms "
+                f"({r['requisicoes']} requisições x {queries} queries)"
+            )
@@ -0,0 +1,375 @@
+"""
+Métricas no formato texto do Prometheus, sem dependências externas.
+
+Contadores, histogramas e medidores ficam em memória no processo. Com
+METRICAS_DIRETORIO configurado, cada worker grava periodicamente os seus
+valores em <diretorio>/<pid>.json e o /metrics soma os arquivos de todos os
+workers. Os contadores e histogramas dos workers já encerrados (reciclados
+pelo max_requests do gunicorn) são somados em <diretorio>/encerrados.json e
+os arquivos deles removidos, então os totais não regridem e o diretório não
+cresce a cada reciclagem.
+"""
+
+import ast
+import fcntl
+import functools
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+BALDES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BALDES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+INTERVALO_GRAVACAO = 5
+
+ARQUIVO_ENCERRADOS = "encerrados.json"
+
+_trava = threading.RLock()
+_registro = {}
+_ultima_gravacao = 0.0
+_pid_gravado = None
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.valores = {}
+
+    def _chave(self, rotulos):
+        return tuple(str(rotulos.get(rotulo, "")) for rotulo in self.rotulos)
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with _trava:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+        _gravar_periodicamente()
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with _trava:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+        _gravar_periodicamente()
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    @contextmanager
+    def em_andamento(self, **rotulos):
+        self.inc(**rotulos)
+        try:
+            yield
+        finally:
+            self.dec(**rotulos)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, descricao, rotulos=(), baldes=BALDES_DURACAO):
+        super().__init__(nome, descricao, rotulos)
+        self.baldes = tuple(baldes)
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with _trava:
+            # [contagem por balde..., soma, total]
+            atual = self.valores.setdefault(chave, [0] * len(self.baldes) + [0.0, 0])
+            for i, limite in enumerate(self.baldes):
+                if valor <= limite:
+                    atual[i] += 1
+            atual[-2] += valor
+            atual[-1] += 1
+        _gravar_periodicamente()
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+
+def _registrar(classe, nome, *args, **kwargs):
+    with _trava:
+        if nome not in _registro:
+            _registro[nome] = classe(nome, *args, **kwargs)
+        return _registro[nome]
+
+
+def contador(nome, descricao, rotulos=()):
+    return _registrar(Contador, nome, descricao, rotulos)
+
+
+def medidor(nome, descricao, rotulos=()):
+    return _registrar(Medidor, nome, descricao, rotulos)
+
+
+def histograma(nome, descricao, rotulos=(), baldes=BALDES_DURACAO):
+    return _registrar(Histograma, nome, descricao, rotulos, baldes)
+
+
+# Métricas da aplicação
+REQUISICAO_DURACAO = histograma(
+    "bens_requisicao_duracao_segundos", "Duração das requisições por view.", ["view"]
+)
+REQUISICAO_CONSULTAS = histograma(
+    "bens_requisicao_consultas",
+    "Consultas ao banco por requisição.",
+    ["view"],
+    BALDES_CONSULTAS,
+)
+EXPORTACAO_DURACAO = histograma(
+    "bens_exportacao_duracao_segundos", "Duração das exportações por formato.", ["formato"]
+)
+EXPORTACAO_LINHAS = contador(
+    "bens_exportacao_linhas_total", "Linhas exportadas por formato.", ["formato"]
+)
+EMAIL_DURACAO = histograma(
+    "bens_email_envio_duracao_segundos", "Duração do envio de e-mails.", ["resultado"]
+)
+EMAIL_EM_ENVIO = medidor(
+    "bens_email_envios_em_andamento", "E-mails sendo enviados neste momento."
+)
+SIGNAL_DURACAO = histograma(
+    "bens_signal_duracao_segundos", "Duração dos handlers de signals.", ["handler"]
+)
+MOVIMENTACOES = contador(
+    "bens_movimentacoes_total",
+    "Movimentações por ação (criada, aprovada, rejeitada, cancelada).",
+    ["acao"],
+)
+ACAO_ADMIN_DURACAO = histograma(
+    "bens_acao_admin_duracao_segundos", "Duração das ações do admin.", ["acao"]
+)
+
+
+def cronometrado(metrica, **rotulos):
+    """Decorator que observa em `metrica` (histograma) a duração da função."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def executar(*args, **kwargs):
+            with metrica.cronometrar(**rotulos):
+                return func(*args, **kwargs)
+
+        return executar
+
+    return decorator
+
+
+def medir_handler(func):
+    """Decorator para handlers de signals (usar abaixo do @receiver)."""
+    return cronometrado(SIGNAL_DURACAO, handler=func.__name__)(func)
+
+
+def _diretorio():
+    return getattr(settings, "METRICAS_DIRETORIO", "") or None
+
+
+def _instantaneo():
+    with _trava:
+        return {
+            nome: {repr(chave): valor for chave, valor in metrica.valores.items()}
+            for nome, metrica in _registro.items()
+        }
+
+
+@contextmanager
+def _travado(diretorio):
+    """Trava entre processos para arquivar e ler os arquivos do diretório."""
+    with open(os.path.join(diretorio, ".trava"), "a") as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(trava, fcntl.LOCK_UN)
+
+
+def _ler(caminho):
+    try:
+        with open(caminho) as entrada:
+            return json.load(entrada)
+    except (OSError, ValueError):
+        return None
+
+
+def _escrever(diretorio, nome, valores):
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    with os.fdopen(descritor, "w") as arquivo:
+        json.dump(valores, arquivo)
+    os.replace(temporario, os.path.join(diretorio, nome))
+
+
+def _arquivar(diretorio, caminhos):
+    """
+    Soma os contadores e histogramas dos arquivos em encerrados.json e os
+    remove. Medidores são descartados. Chamar com _travado(diretorio).
+    """
+    if not caminhos:
+        return
+    encerrados = _ler(os.path.join(diretorio, ARQUIVO_ENCERRADOS)) or {}
+    for caminho in caminhos:
+        _somar(encerrados, _ler(caminho) or {}, incluir_medidores=False)
+    _escrever(diretorio, ARQUIVO_ENCERRADOS, encerrados)
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def gravar():
+    """Grava os valores deste processo em METRICAS_DIRETORIO (se configurado)."""
+    global _ultima_gravacao, _pid_gravado
+    diretorio = _diretorio()
+    if not diretorio:
+        return
+    os.makedirs(diretorio, exist_ok=True)
+    pid = os.getpid()
+    caminho = os.path.join(diretorio, f"{pid}.json")
+    if _pid_gravado != pid:
+        # Primeira gravação deste processo: um arquivo com o mesmo pid é de um
+        # worker encerrado (pid reutilizado) e não pode ser sobrescrito.
+        with _travado(diretorio):
+            if os.path.exists(caminho):
+                _arquivar(diretorio, [caminho])
+        _pid_gravado = pid
+    _escrever(diretorio, f"{pid}.json", _instantaneo())
+    _ultima_gravacao = time.monotonic()
+
+
+def _gravar_periodicamente():
+    if _diretorio() and time.monotonic() - _ultima_gravacao > INTERVALO_GRAVACAO:
+        gravar()
+
+
+def _processo_ativo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _somar(destino, origem, incluir_medidores=True):
+    for nome, valores in origem.items():
+        metrica = _registro.get(nome)
+        if metrica is None or (metrica.tipo == "gauge" and not incluir_medidores):
+            continue
+        for chave, valor in valores.items():
+            if isinstance(valor, list):
+                atual = destino.setdefault(nome, {}).setdefault(chave, [0] * len(valor))
+                for i, parcela in enumerate(valor):
+                    atual[i] += parcela
+            else:
+                destino.setdefault(nome, {})[chave] = (
+                    destino.get(nome, {}).get(chave, 0) + valor
+                )
+
+
+def _valores_agregados():
+    diretorio = _diretorio()
+    if not diretorio:
+        return _instantaneo()
+    gravar()
+    agregado = {}
+    with _travado(diretorio):
+        ativos, encerrados = [], []
+        for arquivo in os.listdir(diretorio):
+            pid = arquivo[: -len(".json")]
+            if not arquivo.endswith(".json") or not pid.isdigit():
+                continue
+            caminho = os.path.join(diretorio, arquivo)
+            (ativos if _processo_ativo(int(pid)) else encerrados).append(caminho)
+        _arquivar(diretorio, encerrados)
+        _somar(
+            agregado,
+            _ler(os.path.join(diretorio, ARQUIVO_ENCERRADOS)) or {},
+            incluir_medidores=False,
+        )
+        for caminho in ativos:
+            _somar(agregado, _ler(caminho) or {})
+    return agregado
+
+
+def _formatar_rotulos(nomes, chave, extras=()):
+    pares = list(zip(nomes, chave)) + list(extras)
+    if not pares:
+        return ""
+    texto = ",".join(
+        '{}="{}"'.format(
+            nome, str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for nome, valor in pares
+    )
+    return "{" + texto + "}"
+
+
+def _formatar_numero(valor):
+    if isinstance(valor, float) and math.isinf(valor):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def formatar(nome, tipo, descricao, amostras):
+    """Linhas de uma métrica calculada na hora; `amostras`: [(rotulos, valor)]."""
+    linhas = [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}"]
+    for rotulos, valor in amostras:
+        texto = _formatar_rotulos(list(rotulos), list(rotulos.values()))
+        linhas.append(f"{nome}{texto} {_formatar_numero(valor)}")
+    return linhas
+
+
+def gerar_texto(extras=()):
+    """
+    Exposição no formato texto do Prometheus. `extras` são linhas já
+    formatadas de métricas calculadas na hora (ex.: acertos do cache).
+    """
+    agregado = _valores_agregados()
+    linhas = []
+    for nome, metrica in sorted(_registro.items()):
+        linhas.append(f"# HELP {nome} {metrica.descricao}")
+        linhas.append(f"# TYPE {nome} {metrica.tipo}")
+        for chave_texto, valor in sorted(agregado.get(nome, {}).items()):
+            chave = ast.literal_eval(chave_texto)
+            if metrica.tipo == "histogram":
+                for limite, quantidade in zip(metrica.baldes, valor):
+                    rotulos = _formatar_rotulos(metrica.rotulos, chave, [("le", limite)])
+                    linhas.append(f"{nome}_bucket{rotulos} {quantidade}")
+                rotulos = _formatar_rotulos(metrica.rotulos, chave, [("le", "+Inf")])
+                linhas.append(f"{nome}_bucket{rotulos} {valor[-1]}")
+                rotulos = _formatar_rotulos(metrica.rotulos, chave)
+                linhas.append(f"{nome}_sum{rotulos} {_formatar_numero(valor[-2])}")
+                linhas.append(f"{nome}_count{rotulos} {valor[-1]}")
+            else:
+                rotulos = _formatar_rotulos(metrica.rotulos, chave)
+                linhas.append(f"{nome}{rotulos} {_formatar_numero(valor)}")
+    linhas.extend(extras)
+    return "\n".join(linhas) + "\n"
+
+
+def reiniciar():
+    """Zera os valores deste processo (usado nos testes)."""
+    with _trava:
+        for metrica in _registro.values():
+            metrica.valores.clear()
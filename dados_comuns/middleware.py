@@ -1,13 +1,124 @@
-from dados_comuns.context import set_user
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from dados_comuns.context import audit_as, nova_correlacao
+from dados_comuns import instrumentacao, metricas
+from dados_comuns.db_router import (
+    leitura_replica,
+    monitorar_escritas,
+    reiniciar_estado,
+)
+
+
+CABECALHO_CORRELACAO = "X-Request-ID"
+CORRELACAO_VALIDA = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
 
 
 class AuditUserMiddleware:
+    """
+    Define o usuário e o id de correlação (X-Request-ID recebido ou um novo)
+    do contexto de auditoria durante a requisição.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        correlacao = request.headers.get(CABECALHO_CORRELACAO, "")
+        if not CORRELACAO_VALIDA.match(correlacao):
+            correlacao = nova_correlacao()
+        with audit_as(getattr(request, "user", None), correlacao):
+            response = self.get_response(request)
+        response[CABECALHO_CORRELACAO] = correlacao
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Reinicia o estado do roteamento de réplica a cada requisição e marca como
+    leitura de réplica os GETs dos caminhos em REPLICA_LEITURA_PATHS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reiniciar_estado()
         try:
-            set_user(getattr(request, "user", None))
-            return self.get_response(request)
+            with monitorar_escritas():
+                prefixos = tuple(getattr(settings, "REPLICA_LEITURA_PATHS", ()))
+                if request.method in ("GET", "HEAD") and prefixos and (
+                    request.path.startswith(prefixos)
+                ):
+                    with leitura_replica():
+                        return self.get_response(request)
+                return self.get_response(request)
         finally:
-            set_user(None)
+            reiniciar_estado()
+
+
+class InstrumentacaoMiddleware:
+    """
+    Opt-in (INSTRUMENTACAO_ATIVA): mede tempo, consultas e consultas
+    repetidas de cada requisição, registra em JSON no logger
+    dados_comuns.instrumentacao (WARNING acima dos limites de
+    INSTRUMENTACAO_LIMITES) e devolve o cabeçalho Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTACAO_ATIVA", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        limites = instrumentacao.limites_do_caminho(request.path)
+        perfil = instrumentacao.PerfilConsultas(limites["repeticoes"])
+        inicio = time.perf_counter()
+        with perfil.monitorar():
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+        response["Server-Timing"] = instrumentacao.server_timing(duracao, perfil)
+        instrumentacao.registrar(request, response, duracao, perfil, limites)
+        return response
+
+
+class ContadorConsultas:
+    """execute_wrapper que só conta as consultas (custo mínimo por consulta)."""
+
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class MetricasMiddleware:
+    """
+    Histogramas de duração e de consultas ao banco por view (nome da URL
+    resolvida), expostos em /metrics. Desligado com METRICAS_ATIVAS=False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICAS_ATIVAS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contador = ContadorConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(contador))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "nao_resolvida"
+        metricas.REQUISICAO_DURACAO.observar(duracao, view=view)
+        metricas.REQUISICAO_CONSULTAS.observar(contador.total, view=view)
+        return response
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dados_comuns.cache import TAG_UNIDADE_ADMINISTRATIVA, invalidar_apos_commit
+from dados_comuns.models import UnidadeAdministrativa
+
+
+@receiver(post_save, sender=UnidadeAdministrativa)
+@receiver(post_delete, sender=UnidadeAdministrativa)
+def invalida_cache_unidade_administrativa(sender, instance, **kwargs):
+    invalidar_apos_commit(TAG_UNIDADE_ADMINISTRATIVA)
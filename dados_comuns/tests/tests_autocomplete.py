@@ -0,0 +1,133 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from dados_comuns.libs.indice_unidades import descartar_indice
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.constants import GRUPO_OPERADOR_INVENTARIO
+from usuario.models import Usuario
+
+
+class UnidadeAdministrativaAutocompleteTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        descartar_indice()
+        self.ua_a = UnidadeAdministrativa.objects.create(
+            nome="Diretoria Regional Butantã", codigo="001", sigla="DRE-BT"
+        )
+        self.ua_b = UnidadeAdministrativa.objects.create(
+            nome="Diretoria Regional Penha", codigo="002", sigla="DRE-PE"
+        )
+        self.ua_inativa = UnidadeAdministrativa.objects.create(
+            nome="Diretoria Regional Antiga",
+            codigo="003",
+            sigla="DRE-AN",
+            status=UnidadeAdministrativa.INATIVA,
+        )
+        self.admin = Usuario.objects.create_superuser(
+            username="admin_auto",
+            password="test123",
+            must_change_password=False,
+            last_login=timezone.now(),
+        )
+
+    def _buscar(self, term="", field_name="unidade_administrativa_destino", **headers):
+        return self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": term,
+                "app_label": "bem_patrimonial",
+                "model_name": "movimentacaobempatrimonial",
+                "field_name": field_name,
+            },
+            **headers,
+        )
+
+    def _ids(self, response):
+        return [int(r["id"]) for r in response.json()["results"]]
+
+    def test_lista_apenas_unidades_ativas(self):
+        self.client.force_login(self.admin)
+
+        response = self._buscar()
+
+        self.assertEqual(self._ids(response), [self.ua_a.id, self.ua_b.id])
+        self.assertEqual(response.json()["results"][0]["text"], str(self.ua_a))
+
+    def test_busca_por_palavras_em_campos_diferentes(self):
+        self.client.force_login(self.admin)
+
+        self.assertEqual(self._ids(self._buscar("penha 002")), [self.ua_b.id])
+        self.assertEqual(self._ids(self._buscar("dre-bt")), [self.ua_a.id])
+        self.assertEqual(self._ids(self._buscar("ta")), [self.ua_a.id])
+        self.assertEqual(self._ids(self._buscar("inexistente")), [])
+
+    def test_operador_ve_apenas_sua_unidade_na_origem(self):
+        operador = Usuario.objects.create_user(
+            username="operador_auto",
+            password="test123",
+            unidade_administrativa=self.ua_b,
+            must_change_password=False,
+            last_login=timezone.now(),
+            is_staff=True,
+        )
+        operador.user_permissions.add(
+            Permission.objects.get(codename="view_unidadeadministrativa")
+        )
+        grupo, _ = Group.objects.get_or_create(name=GRUPO_OPERADOR_INVENTARIO)
+        operador.groups.add(grupo)
+        self.client.force_login(operador)
+
+        origem = self._buscar("diretoria", field_name="unidade_administrativa_origem")
+        destino = self._buscar("diretoria")
+
+        self.assertEqual(self._ids(origem), [self.ua_b.id])
+        self.assertEqual(self._ids(destino), [self.ua_a.id, self.ua_b.id])
+
+    def test_indice_reconstruido_apos_alterar_unidade(self):
+        self.client.force_login(self.admin)
+        self._buscar()
+
+        self.ua_b.status = UnidadeAdministrativa.INATIVA
+        self.ua_b.save()
+
+        self.assertEqual(self._ids(self._buscar()), [self.ua_a.id])
+
+    def test_indice_percebe_alteracao_feita_por_outro_processo(self):
+        self.client.force_login(self.admin)
+        self._buscar()
+
+        # Sem signals nem invalidação no cache local, como num outro worker.
+        UnidadeAdministrativa.objects.filter(pk=self.ua_a.pk).update(
+            status=UnidadeAdministrativa.INATIVA, updated_at=timezone.now()
+        )
+
+        self.assertEqual(self._ids(self._buscar()), [self.ua_b.id])
+
+    def test_cabecalhos_http_e_revalidacao(self):
+        self.client.force_login(self.admin)
+
+        response = self._buscar("dre")
+        repetida = self._buscar("dre", HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+        self.assertEqual(repetida.status_code, 304)
+
+    def test_outros_models_usam_autocomplete_padrao(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "",
+                "app_label": "bem_patrimonial",
+                "model_name": "movimentacaobempatrimonial",
+                "field_name": "bem_patrimonial",
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from dados_comuns.cache import (
+    TAG_GRUPOS_USUARIO,
+    TAG_UNIDADE_ADMINISTRATIVA,
+    chave,
+    compartilhado,
+    em_cache,
+    estatisticas,
+    invalidar,
+    obter_com_atualizacao,
+    obter_ou_calcular,
+    versao,
+)
+from dados_comuns.libs.unidade_administrativa import grupos_do_usuario
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.models import Usuario
+
+
+class CacheVersionadoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidar_muda_a_chave(self):
+        antes = chave("teste", 1, tags=[TAG_UNIDADE_ADMINISTRATIVA])
+        invalidar(TAG_UNIDADE_ADMINISTRATIVA)
+        depois = chave("teste", 1, tags=[TAG_UNIDADE_ADMINISTRATIVA])
+
+        self.assertNotEqual(antes, depois)
+
+    def test_chave_longa_e_resumida(self):
+        self.assertLessEqual(len(chave("teste", "x" * 500)), 200)
+
+    def test_obter_ou_calcular_conta_acertos_e_falhas(self):
+        chamadas = []
+
+        def calcular():
+            chamadas.append(1)
+            return "valor"
+
+        for _ in range(3):
+            valor = obter_ou_calcular("teste", ["a"], calcular)
+
+        self.assertEqual(valor, "valor")
+        self.assertEqual(len(chamadas), 1)
+        self.assertEqual(
+            estatisticas()["teste"], {"hits": 2, "misses": 1, "taxa_acerto": 0.6667}
+        )
+
+    def test_decorator_recalcula_apos_invalidar(self):
+        chamadas = []
+
+        @em_cache("teste_decorator", tags=[TAG_UNIDADE_ADMINISTRATIVA])
+        def dobro(valor):
+            chamadas.append(valor)
+            return valor * 2
+
+        self.assertEqual(dobro(2), 4)
+        self.assertEqual(dobro(2), 4)
+        invalidar(TAG_UNIDADE_ADMINISTRATIVA)
+        self.assertEqual(dobro(2), 4)
+
+        self.assertEqual(chamadas, [2, 2])
+
+    def test_obter_com_atualizacao_devolve_valor_vencido_e_recalcula(self):
+        valores = iter(["primeiro", "segundo"])
+
+        def obter():
+            return obter_com_atualizacao(
+                "teste_atualizacao", (), lambda: next(valores), 60, em_segundo_plano=False
+            )
+
+        with mock.patch("dados_comuns.cache.time.time", return_value=1000):
+            self.assertEqual(obter(), "primeiro")
+            self.assertEqual(obter(), "primeiro")
+        with mock.patch("dados_comuns.cache.time.time", return_value=1061):
+            # O valor vencido ainda é devolvido; o recálculo fica para a próxima leitura.
+            self.assertEqual(obter(), "primeiro")
+            self.assertEqual(obter(), "segundo")
+
+
+class InvalidacaoPorSignalTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_salvar_unidade_invalida_tag_apos_o_commit(self):
+        antes = versao(TAG_UNIDADE_ADMINISTRATIVA)
+        with self.captureOnCommitCallbacks(execute=True):
+            UnidadeAdministrativa.objects.create(nome="UA Cache", codigo="UAC", sigla="C")
+            self.assertEqual(versao(TAG_UNIDADE_ADMINISTRATIVA), antes)
+
+        self.assertNotEqual(versao(TAG_UNIDADE_ADMINISTRATIVA), antes)
+
+    def test_alterar_grupos_do_usuario_invalida_tag(self):
+        usuario = Usuario.objects.create_user(username="cache", password="test123")
+        grupo = Group.objects.create(name="Grupo cache")
+        antes = versao(TAG_GRUPOS_USUARIO)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            usuario.groups.add(grupo)
+
+        self.assertNotEqual(versao(TAG_GRUPOS_USUARIO), antes)
+
+
+class GruposDoUsuarioTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(username="grupos", password="test123")
+        self.usuario.groups.add(Group.objects.create(name="Grupo A"))
+
+    def test_locmem_nao_guarda_grupos_no_cache(self):
+        self.assertFalse(compartilhado())
+
+        self.assertEqual(grupos_do_usuario(self.usuario), {"Grupo A"})
+        self.assertNotIn("grupos_usuario", estatisticas())
+
+    def test_grupos_ficam_no_objeto_durante_a_requisicao(self):
+        grupos_do_usuario(self.usuario)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(grupos_do_usuario(self.usuario), {"Grupo A"})
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/1",
+            }
+        }
+    )
+    def test_redis_e_compartilhado(self):
+        self.assertTrue(compartilhado())
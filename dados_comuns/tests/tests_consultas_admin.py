@@ -0,0 +1,113 @@
+"""
+Regressão de consultas das telas do admin.
+
+Renderiza a lista, a inclusão e a edição de todos os models registrados no
+admin com dois volumes de dados e verifica que a quantidade de consultas não
+cresce com o número de linhas (N+1). As quantidades ficam em
+consultas_admin.json: o teste falha se alguma tela passar a fazer mais
+consultas. Depois de uma melhoria (ou de registrar um model novo), atualize
+o arquivo com:
+
+    ATUALIZAR_CONSULTAS_ADMIN=1 python manage.py test dados_comuns.tests.tests_consultas_admin
+"""
+
+import json
+import os
+from contextlib import ExitStack
+
+from django.contrib import admin
+from django.db import connections
+from django.test import TestCase
+from django.urls import reverse
+
+from bem_patrimonial import dados_sinteticos
+from dados_comuns.middleware import ContadorConsultas
+from usuario.models import Usuario
+
+ARQUIVO_ESPERADO = os.path.join(os.path.dirname(__file__), "consultas_admin.json")
+
+
+class ConsultasAdminTest(TestCase):
+    def setUp(self):
+        usuario = Usuario.objects.create(
+            username="consultas_admin",
+            is_staff=True,
+            is_superuser=True,
+            must_change_password=False,
+        )
+        self.client.force_login(usuario)
+
+    def _telas(self):
+        telas = {}
+        for model in admin.site._registry:
+            info = (model._meta.app_label, model._meta.model_name)
+            nome = "%s.%s" % info
+            telas[f"{nome}.changelist"] = reverse("admin:%s_%s_changelist" % info)
+            telas[f"{nome}.add"] = reverse("admin:%s_%s_add" % info)
+            # O último registro é o que tem mais dados relacionados no volume maior.
+            obj = model._default_manager.order_by("pk").last()
+            if obj is not None:
+                telas[f"{nome}.change"] = reverse(
+                    "admin:%s_%s_change" % info, args=[obj.pk]
+                )
+        return telas
+
+    def _contar(self, url):
+        # Uma requisição antes para aquecer os caches (content types, índices).
+        self.client.get(url)
+        contador = ContadorConsultas()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(contador))
+            response = self.client.get(url)
+        return response.status_code, contador.total
+
+    def _medir(self):
+        consultas = {}
+        for tela, url in self._telas().items():
+            status, total = self._contar(url)
+            if status == 403:
+                continue  # tela desabilitada no admin (ex.: inclusão do resumo)
+            self.assertEqual(status, 200, f"{tela} ({url}) respondeu {status}")
+            consultas[tela] = total
+        return consultas
+
+    def test_consultas_nao_crescem_com_o_volume(self):
+        dados_sinteticos.gerar(
+            unidades=2, bens_por_unidade=3, historico=1, usuarios=2,
+            movimentacoes=0.5, prefixo="POUCO",
+        )
+        pouco = self._medir()
+        dados_sinteticos.gerar(
+            unidades=4, bens_por_unidade=8, historico=4, usuarios=6,
+            movimentacoes=0.5, prefixo="MUITO",
+        )
+        muito = self._medir()
+
+        for tela, total in muito.items():
+            with self.subTest(tela=tela):
+                self.assertEqual(
+                    total,
+                    pouco.get(tela),
+                    f"{tela}: {pouco.get(tela)} consultas com poucos dados e "
+                    f"{total} com mais dados (consulta por linha?)",
+                )
+
+        if os.environ.get("ATUALIZAR_CONSULTAS_ADMIN"):
+            with open(ARQUIVO_ESPERADO, "w") as arquivo:
+                json.dump(muito, arquivo, indent=2, sort_keys=True)
+                arquivo.write("\n")
+            return
+
+        with open(ARQUIVO_ESPERADO) as arquivo:
+            esperado = json.load(arquivo)
+        for tela, total in muito.items():
+            with self.subTest(tela=tela):
+                self.assertIn(
+                    tela, esperado, f"{tela} sem quantidade esperada em consultas_admin.json"
+                )
+                self.assertLessEqual(
+                    total,
+                    esperado[tela],
+                    f"{tela}: {total} consultas (esperado até {esperado[tela]})",
+                )
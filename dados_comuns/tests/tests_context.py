@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from dados_comuns.context import (
+    audit_as,
+    capturar_contexto,
+    com_contexto,
+    get_correlacao,
+    get_user,
+    restaurar_contexto,
+    submeter,
+)
+from dados_comuns.middleware import AuditUserMiddleware
+from usuario.models import Usuario
+
+
+class ContextoAuditoriaTest(SimpleTestCase):
+    def setUp(self):
+        self.usuario = Usuario(pk=42, username="auditor")
+
+    def test_executor_recebe_o_contexto_com_submeter(self):
+        with audit_as(self.usuario, "job-1"):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                resultados = [
+                    submeter(executor, lambda: (get_user(), get_correlacao())).result()
+                    for _ in range(4)
+                ]
+                sem_propagacao = executor.submit(get_user).result()
+
+        self.assertEqual(set(resultados), {(self.usuario, "job-1")})
+        self.assertIsNone(sem_propagacao)
+        self.assertIsNone(get_user())
+
+    def test_thread_com_contexto(self):
+        resultado = []
+        with audit_as(self.usuario):
+            alvo = com_contexto(lambda: resultado.append(get_user()))
+        thread = threading.Thread(target=alvo)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(resultado, [self.usuario])
+
+    def test_codigo_assincrono_mantem_o_usuario(self):
+        async def view():
+            await asyncio.sleep(0)
+            return await sync_to_async(get_user)()
+
+        with audit_as(self.usuario):
+            self.assertEqual(asyncio.run(view()), self.usuario)
+
+    def test_middleware_define_e_devolve_a_correlacao(self):
+        vistos = []
+
+        def get_response(request):
+            vistos.append((get_user(), get_correlacao()))
+            return HttpResponse()
+
+        request = RequestFactory().get("/", HTTP_X_REQUEST_ID="abc-123")
+        request.user = self.usuario
+        response = AuditUserMiddleware(get_response)(request)
+
+        self.assertEqual(vistos, [(self.usuario, "abc-123")])
+        self.assertEqual(response["X-Request-ID"], "abc-123")
+        self.assertIsNone(get_user())
+
+        request = RequestFactory().get("/", HTTP_X_REQUEST_ID="inválido <script>")
+        request.user = self.usuario
+        response = AuditUserMiddleware(get_response)(request)
+        self.assertNotEqual(response["X-Request-ID"], "inválido <script>")
+
+
+class RestaurarContextoTest(TestCase):
+    def test_restaura_usuario_e_correlacao_pelo_id(self):
+        usuario = Usuario.objects.create_user(username="worker", password="x")
+        with audit_as(usuario, "tarefa-7"):
+            dados = capturar_contexto()
+
+        with restaurar_contexto(dados):
+            self.assertEqual(get_user(), usuario)
+            self.assertEqual(get_correlacao(), "tarefa-7")
+        self.assertIsNone(get_user())
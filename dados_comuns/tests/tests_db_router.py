@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from dados_comuns import db_router
+from dados_comuns.db_router import ReplicaRouter, leitura_replica
+from dados_comuns.middleware import ReplicaRoutingMiddleware
+from dados_comuns.models import HistoricoGeral
+
+DATABASES_COM_REPLICA = {
+    "default": settings.DATABASES["default"],
+    "replica": {**settings.DATABASES["default"], "TEST": {"MIRROR": "default"}},
+}
+
+
+@override_settings(
+    DATABASES=DATABASES_COM_REPLICA,
+    DATABASE_REPLICA_ALIAS="replica",
+    REPLICA_LEITURA_PATHS=["/admin/autocomplete/"],
+)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        db_router.reiniciar_estado()
+        self.router = ReplicaRouter()
+
+    def tearDown(self):
+        db_router.reiniciar_estado()
+
+    def test_leitura_fora_do_escopo_usa_principal(self):
+        self.assertIsNone(self.router.db_for_read(HistoricoGeral))
+
+    def test_leitura_marcada_usa_replica(self):
+        with leitura_replica():
+            self.assertEqual(self.router.db_for_read(HistoricoGeral), "replica")
+
+    def test_decorator_marca_leitura(self):
+        @leitura_replica()
+        def exportar():
+            return self.router.db_for_read(HistoricoGeral)
+
+        self.assertEqual(exportar(), "replica")
+        self.assertIsNone(self.router.db_for_read(HistoricoGeral))
+
+    def test_escrita_fixa_principal(self):
+        db_router._detecta_escrita(
+            lambda *args: None, "UPDATE bem SET nome = %s", [], False, {}
+        )
+        with leitura_replica():
+            self.assertIsNone(self.router.db_for_read(HistoricoGeral))
+        self.assertEqual(db_router.db_leitura(), "default")
+
+    def test_select_nao_fixa_principal(self):
+        db_router._detecta_escrita(lambda *args: None, "SELECT 1", [], False, {})
+        self.assertEqual(db_router.db_leitura(), "replica")
+
+    def test_escrita_sempre_no_principal(self):
+        with leitura_replica():
+            self.assertEqual(self.router.db_for_write(HistoricoGeral), "default")
+
+    def test_nao_migra_replica(self):
+        self.assertFalse(self.router.allow_migrate("replica", "dados_comuns"))
+        self.assertIsNone(self.router.allow_migrate("default", "dados_comuns"))
+
+    @override_settings(DATABASES={"default": settings.DATABASES["default"]})
+    def test_sem_replica_configurada_usa_principal(self):
+        with leitura_replica():
+            self.assertIsNone(self.router.db_for_read(HistoricoGeral))
+        self.assertEqual(db_router.db_leitura(), "default")
+
+    def test_middleware_roteia_caminhos_configurados(self):
+        vistos = []
+
+        def view(request):
+            vistos.append(self.router.db_for_read(HistoricoGeral))
+            return HttpResponse("OK")
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        middleware(factory.get("/admin/autocomplete/?term=ua"))
+        middleware(factory.get("/admin/bem_patrimonial/bempatrimonial/"))
+        middleware(factory.post("/admin/autocomplete/"))
+
+        self.assertEqual(vistos, ["replica", None, None])
+
+    def test_middleware_reinicia_primario_fixado_entre_requisicoes(self):
+        def view_que_escreve(request):
+            db_router.fixar_primario()
+            return HttpResponse("OK")
+
+        ReplicaRoutingMiddleware(view_que_escreve)(RequestFactory().get("/admin/"))
+
+        self.assertEqual(db_router.db_leitura(), "replica")
+
+    def test_historico_do_bem_no_admin_usa_principal(self):
+        # O GET após salvar o bem precisa ver a alteração recém-gravada.
+        from django.contrib import admin
+
+        from bem_patrimonial.admins.bem_patrimonial import HistoricoGeralInline
+        from bem_patrimonial.models import BemPatrimonial
+
+        inline = HistoricoGeralInline(BemPatrimonial, admin.site)
+
+        qs = inline.get_queryset(RequestFactory().get("/admin/"))
+
+        self.assertEqual(db_router.db_leitura(), "replica")
+        self.assertEqual(qs.db, "default")
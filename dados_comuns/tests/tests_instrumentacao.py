@@ -0,0 +1,57 @@
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from dados_comuns.instrumentacao import limites_do_caminho
+from dados_comuns.middleware import InstrumentacaoMiddleware
+from dados_comuns.models import UnidadeAdministrativa
+
+
+def view_com_n_mais_1(request):
+    for pk in range(6):
+        list(UnidadeAdministrativa.objects.filter(pk=pk))
+    return HttpResponse()
+
+
+@override_settings(
+    INSTRUMENTACAO_ATIVA=True,
+    INSTRUMENTACAO_LIMITES={
+        "/admin/": {"consultas": 50},
+        "/admin/lento/": {"tempo_ms": 0},
+    },
+)
+class InstrumentacaoMiddlewareTest(TestCase):
+    def _chamar(self, caminho, view):
+        request = RequestFactory().get(caminho)
+        with self.assertLogs("dados_comuns.instrumentacao") as logs:
+            response = InstrumentacaoMiddleware(view)(request)
+        return response, logs.records[0], json.loads(logs.records[0].getMessage())
+
+    def test_limites_pelo_prefixo_mais_longo(self):
+        self.assertEqual(limites_do_caminho("/admin/lento/x/")["tempo_ms"], 0)
+        self.assertEqual(limites_do_caminho("/admin/x/")["consultas"], 50)
+        self.assertEqual(limites_do_caminho("/outro/")["repeticoes"], 5)
+
+    def test_detecta_consultas_repetidas_com_a_pilha(self):
+        response, registro, dados = self._chamar("/admin/x/", view_com_n_mais_1)
+
+        self.assertEqual(registro.levelname, "WARNING")
+        self.assertEqual(dados["consultas"], 6)
+        self.assertEqual(dados["alertas"], ["consultas_repetidas"])
+        self.assertEqual(dados["repetidas"][0]["vezes"], 6)
+        self.assertTrue(
+            any("view_com_n_mais_1" in quadro for quadro in dados["repetidas"][0]["pilha"])
+        )
+        self.assertIn('desc="6 consultas"', response["Server-Timing"])
+
+    def test_requisicao_dentro_dos_limites_e_info(self):
+        _, registro, dados = self._chamar("/admin/x/", lambda request: HttpResponse())
+
+        self.assertEqual(registro.levelname, "INFO")
+        self.assertEqual((dados["consultas"], dados["alertas"]), (0, []))
+
+    def test_limite_de_tempo_por_prefixo(self):
+        _, registro, dados = self._chamar("/admin/lento/", lambda request: HttpResponse())
+
+        self.assertEqual(dados["alertas"], ["lenta"])
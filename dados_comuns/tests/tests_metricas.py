@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core import mail
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+
+from config.utils.email_utils import send_email_ctrl
+from dados_comuns import metricas
+from dados_comuns.middleware import MetricasMiddleware
+from dados_comuns.models import UnidadeAdministrativa
+from usuario.models import Usuario
+
+PID_INEXISTENTE = 2**22 + 1
+
+
+def view_com_consultas(request):
+    request.resolver_match = resolve("/metrics")
+    list(UnidadeAdministrativa.objects.all())
+    list(UnidadeAdministrativa.objects.all())
+    return HttpResponse()
+
+
+class MetricasTest(TestCase):
+    def setUp(self):
+        metricas.reiniciar()
+
+    def test_formato_texto_de_contador_e_histograma(self):
+        metricas.EXPORTACAO_LINHAS.inc(10, formato="csv")
+        metricas.EXPORTACAO_LINHAS.inc(5, formato="csv")
+        metricas.EXPORTACAO_DURACAO.observar(0.2, formato="csv")
+
+        texto = metricas.gerar_texto()
+
+        self.assertIn("# TYPE bens_exportacao_linhas_total counter", texto)
+        self.assertIn('bens_exportacao_linhas_total{formato="csv"} 15', texto)
+        self.assertIn(
+            'bens_exportacao_duracao_segundos_bucket{formato="csv",le="0.1"} 0', texto
+        )
+        self.assertIn(
+            'bens_exportacao_duracao_segundos_bucket{formato="csv",le="0.25"} 1', texto
+        )
+        self.assertIn(
+            'bens_exportacao_duracao_segundos_bucket{formato="csv",le="+Inf"} 1', texto
+        )
+        self.assertIn('bens_exportacao_duracao_segundos_count{formato="csv"} 1', texto)
+
+    def test_soma_os_workers_e_ignora_medidores_de_processos_encerrados(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            with open(os.path.join(diretorio, f"{PID_INEXISTENTE}.json"), "w") as arquivo:
+                json.dump(
+                    {
+                        "bens_movimentacoes_total": {"('criada',)": 3},
+                        "bens_email_envios_em_andamento": {"()": 2},
+                    },
+                    arquivo,
+                )
+            metricas.MOVIMENTACOES.inc(acao="criada")
+
+            with self.settings(METRICAS_DIRETORIO=diretorio):
+                texto = metricas.gerar_texto()
+                repetido = metricas.gerar_texto()
+
+            arquivos = set(os.listdir(diretorio))
+        self.assertIn('bens_movimentacoes_total{acao="criada"} 4', texto)
+        self.assertNotIn("bens_email_envios_em_andamento 2", texto)
+        # O arquivo do worker encerrado foi somado em encerrados.json e removido.
+        self.assertIn('bens_movimentacoes_total{acao="criada"} 4', repetido)
+        self.assertIn(f"{os.getpid()}.json", arquivos)
+        self.assertIn(metricas.ARQUIVO_ENCERRADOS, arquivos)
+        self.assertNotIn(f"{PID_INEXISTENTE}.json", arquivos)
+
+    def test_pid_reutilizado_nao_sobrescreve_os_valores_anteriores(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            with open(os.path.join(diretorio, f"{os.getpid()}.json"), "w") as arquivo:
+                json.dump({"bens_movimentacoes_total": {"('criada',)": 3}}, arquivo)
+            metricas.MOVIMENTACOES.inc(acao="criada")
+
+            with mock.patch.object(metricas, "_pid_gravado", None):
+                with self.settings(METRICAS_DIRETORIO=diretorio):
+                    texto = metricas.gerar_texto()
+
+        self.assertIn('bens_movimentacoes_total{acao="criada"} 4', texto)
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_envio_de_email(self):
+        send_email_ctrl("Assunto", {}, "simple_message.html", "a@a.com")
+
+        self.assertEqual(len(mail.outbox), 1)
+        valores = metricas.EMAIL_DURACAO.valores[("sucesso",)]
+        self.assertEqual(valores[-1], 1)
+        self.assertEqual(metricas.EMAIL_EM_ENVIO.valores[()], 0)
+
+
+@override_settings(METRICAS_ATIVAS=True, METRICAS_TOKEN="segredo")
+class MetricasEndpointTest(TestCase):
+    def setUp(self):
+        metricas.reiniciar()
+
+    def test_middleware_mede_duracao_e_consultas_por_view(self):
+        MetricasMiddleware(view_com_consultas)(RequestFactory().get("/x/"))
+
+        self.assertEqual(metricas.REQUISICAO_DURACAO.valores[("metricas",)][-1], 1)
+        consultas = metricas.REQUISICAO_CONSULTAS.valores[("metricas",)]
+        self.assertEqual(consultas[-2], 2)
+
+    def test_exige_token_ou_equipe(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(
+            self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer errado").status_code,
+            401,
+        )
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer segredo")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"# TYPE bens_requisicao_duracao_segundos histogram", response.content)
+        self.assertIn(b"# TYPE bens_cache_hits_total counter", response.content)
+
+        usuario = Usuario.objects.create_user(
+            username="metricas", password="test123", is_staff=True
+        )
+        usuario.must_change_password = False
+        usuario.save()
+        self.client.force_login(usuario)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICAS_ATIVAS=False)
+    def test_desativado(self):
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer segredo")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from dados_comuns.models import UnidadeAdministrativa
+from dados_comuns.utils import iterar_em_lotes
+
+
+class IterarEmLotesTest(TestCase):
+    def setUp(self):
+        for i in range(7):
+            UnidadeAdministrativa.objects.create(
+                codigo=str(i), sigla=f"UA{i}", nome=f"Unidade {i}"
+            )
+
+    def test_percorre_todos_os_registros_em_ordem(self):
+        esperado = list(
+            UnidadeAdministrativa.objects.order_by("pk").values_list("pk", flat=True)
+        )
+
+        obtido = [
+            ua.pk
+            for ua in iterar_em_lotes(UnidadeAdministrativa.objects.all(), 3)
+        ]
+
+        self.assertEqual(obtido, esperado)
+
+    def test_uma_query_por_lote(self):
+        with self.assertNumQueries(3):
+            list(iterar_em_lotes(UnidadeAdministrativa.objects.all(), 3))
+
+    def test_respeita_filtros(self):
+        UnidadeAdministrativa.objects.filter(codigo="0").update(
+            status=UnidadeAdministrativa.INATIVA
+        )
+
+        obtido = list(
+            iterar_em_lotes(
+                UnidadeAdministrativa.objects.filter(
+                    status=UnidadeAdministrativa.ATIVA
+                ),
+                2,
+            )
+        )
+
+        self.assertEqual(len(obtido), 6)
@@ -28,3 +28,21 @@ def dict_changes(original, updated, fields, only=None, ignore=None):
         if repr_value(old) != repr_value(new):
             changes[f] = (repr_value(old), repr_value(new))
     return changes
+
+
+def iterar_em_lotes(queryset, tamanho_lote=2000):
+    """
+    Percorre o queryset em páginas por pk (keyset), sem cursor do lado do
+    servidor: funciona atrás do PgBouncer e mantém a memória limitada.
+    """
+    queryset = queryset.order_by("pk")
+    ultimo_pk = None
+    while True:
+        pagina = queryset
+        if ultimo_pk is not None:
+            pagina = pagina.filter(pk__gt=ultimo_pk)
+        lote = list(pagina[:tamanho_lote])
+        yield from lote
+        if len(lote) < tamanho_lote:
+            return
+        ultimo_pk = lote[-1].pk
@@ -1,3 +1,134 @@
-from django.shortcuts import render
+import hashlib
+import hmac
 
-# Create your views here.
+from django.conf import settings
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+    quote_etag,
+)
+
+from dados_comuns.admin import UNIDADE_ADMINISTRATIVA_ORIGEM_AUTOCOMPLETE
+from dados_comuns import metricas as registro_metricas
+from dados_comuns.cache import estatisticas
+from dados_comuns.libs.indice_unidades import obter_indice
+from dados_comuns.libs.unidade_administrativa import ids_uas_permitidas
+from dados_comuns.models import UnidadeAdministrativa
+
+
+@staff_member_required
+def estatisticas_cache(request):
+    return JsonResponse({"cache": estatisticas()})
+
+
+def _autorizado_metricas(request):
+    token = getattr(settings, "METRICAS_TOKEN", "")
+    if token:
+        cabecalho = request.headers.get("Authorization", "")
+        if hmac.compare_digest(cabecalho.encode(), f"Bearer {token}".encode()):
+            return True
+    usuario = request.user
+    return usuario.is_active and usuario.is_staff
+
+
+def _metricas_do_cache():
+    dados = estatisticas()
+    linhas = []
+    for tipo in ("hits", "misses"):
+        linhas += registro_metricas.formatar(
+            f"bens_cache_{tipo}_total",
+            "counter",
+            f"{'Acertos' if tipo == 'hits' else 'Falhas'} do cache por nome.",
+            [({"nome": nome}, valores[tipo]) for nome, valores in dados.items()],
+        )
+    return linhas
+
+
+def metricas(request):
+    """
+    Métricas no formato texto do Prometheus. Acesso com
+    "Authorization: Bearer <METRICAS_TOKEN>" (coletor) ou usuário da equipe.
+    """
+    if not getattr(settings, "METRICAS_ATIVAS", False):
+        raise Http404
+    if not _autorizado_metricas(request):
+        response = HttpResponse("Não autorizado.", status=401)
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+    return HttpResponse(
+        registro_metricas.gerar_texto(_metricas_do_cache()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class UnidadeAdministrativaAutocompleteView(AutocompleteJsonView):
+    """
+    Autocomplete do admin. Para unidades administrativas responde a partir do
+    índice em memória (dados_comuns/libs/indice_unidades.py), aplicando em
+    Python as mesmas regras de UnidadeAdministrativaAdmin.get_search_results;
+    os demais models seguem o fluxo padrão do Django.
+    """
+
+    def get(self, request, *args, **kwargs):
+        (
+            self.term,
+            self.model_admin,
+            self.source_field,
+            to_field_name,
+        ) = self.process_request(request)
+
+        response = self.responder(request, to_field_name)
+        if response is None:
+            return super().get(request, *args, **kwargs)
+        return response
+
+    def responder(self, request, to_field_name):
+        """Resposta otimizada para o campo, ou None para usar o fluxo padrão."""
+        if (
+            self.model_admin.model is not UnidadeAdministrativa
+            or to_field_name != "id"
+            or self.source_field.get_limit_choices_to()
+        ):
+            return None
+
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        indice = obter_indice()
+        ids_permitidos = None
+        if self.source_field.name == UNIDADE_ADMINISTRATIVA_ORIGEM_AUTOCOMPLETE:
+            ids_permitidos = ids_uas_permitidas(request.user)
+        etag = quote_etag(
+            hashlib.md5(
+                repr(
+                    (indice.versao, ids_permitidos, self.term, request.GET.get("page"))
+                ).encode("utf-8")
+            ).hexdigest()
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            itens = indice.buscar(self.term, ids_permitidos)
+            pagina = Paginator(itens, self.paginate_by).get_page(
+                request.GET.get("page")
+            )
+            response = JsonResponse(
+                {
+                    "results": [
+                        {"id": str(item.id), "text": item.texto} for item in pagina
+                    ],
+                    "pagination": {"more": pagina.has_next()},
+                }
+            )
+            response["ETag"] = etag
+
+        patch_cache_control(
+            response, private=True, max_age=settings.AUTOCOMPLETE_UA_MAX_AGE
+        )
+        patch_vary_headers(response, ["Cookie"])
+        return response
@@ -1,5 +1,26 @@
 #!/bin/sh
 set -e
 python manage.py migrate --noinput
+python manage.py createcachetable
 
-exec python manage.py runserver 0.0.0.0:8001
\ No newline at end of file
+# DJANGO_SERVER_MODE: gunicorn (WSGI, padrão), uvicorn (ASGI via gunicorn) ou runserver
+SERVER_MODE="${DJANGO_SERVER_MODE:-gunicorn}"
+
+if [ "$SERVER_MODE" = "runserver" ]; then
+    exec python manage.py runserver 0.0.0.0:8001
+fi
+
+export DJANGO_STATICFILES_COMPRESSED="${DJANGO_STATICFILES_COMPRESSED:-True}"
+python manage.py collectstatic --noinput
+
+if [ "$SERVER_MODE" = "uvicorn" ]; then
+    # Sob ASGI as views síncronas rodam em threads do executor e a conexão
+    # persistente de cada thread não é fechada no fim da requisição: as
+    # conexões se acumulam até o limite do PostgreSQL. Use um pool externo
+    # (PgBouncer) em vez de CONN_MAX_AGE.
+    export POSTGRES_CONN_MAX_AGE=0
+    exec gunicorn config.asgi:application -c config/gunicorn.conf.py \
+        -k uvicorn.workers.UvicornWorker
+fi
+
+exec gunicorn config.wsgi:application -c config/gunicorn.conf.py
@@ -4,6 +4,7 @@ from django_admin_listfilter_dropdown.filters import DropdownFilter
 from rangefilter.filters import DateRangeFilter
 from django.shortcuts import redirect
 from django.urls import reverse
+from usuario.constants import GRUPO_GESTOR_PATRIMONIO, GRUPO_OPERADOR_INVENTARIO
 from usuario.models import Usuario
 from dados_comuns.models import UnidadeAdministrativa
 
@@ -17,6 +18,8 @@ class CustomUserModelAdmin(UserAdmin):
         "unidade_administrativa",
         "get_grupo",
     )
+    # O FK é nullable: o select_related() automático da lista não o inclui.
+    list_select_related = ("unidade_administrativa",)
     search_fields = ("nome",)
     search_help_text = "Pesquise por nome."
     ordering = ("unidade_administrativa__codigo",)
@@ -89,11 +92,16 @@ class CustomUserModelAdmin(UserAdmin):
             )
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("groups")
+
     @admin.display(description="Grupo")
     def get_grupo(self, obj):
-        if obj.is_gestor_patrimonio:
+        # Usa os grupos pré-carregados em get_queryset (sem consulta por linha).
+        grupos = {grupo.name for grupo in obj.groups.all()}
+        if GRUPO_GESTOR_PATRIMONIO in grupos:
             return "GESTOR_PATRIMONIO"
-        elif obj.is_operador_inventario:
+        elif GRUPO_OPERADOR_INVENTARIO in grupos:
             return "OPERADOR_INVENTARIO"
         return "-"
 
@@ -38,7 +38,10 @@ class Command(BaseCommand):
         # ===== Models =====
         UA = get_model("dados_comuns.UnidadeAdministrativa")
         Bem = get_model("bem_patrimonial.BemPatrimonial")
-        Through = "Ajustar" #get_model("bem_patrimonial.UnidadeAdministrativaBemPatrimonial")
+        # O vínculo bem x unidade é o FK BemPatrimonial.unidade_administrativa;
+        # não há mais model intermediário. Para volumes maiores, use o comando
+        # gerar_dados_sinteticos.
+        Through = None
 
         if not UA or not Bem:
             raise CommandError(
@@ -4,32 +4,33 @@ from django.urls import reverse
 from urllib.parse import urlencode
 
 ADMIN_PREFIX = "/admin/"
+PASSWORD_CHANGE_PREFIX = "/admin/password-change/"
 PASSWORD_CHANGE_URLNAME = "password_change"
 
 
 class ForcePasswordChangeMiddleware:
+    """
+    Redireciona para a troca de senha os usuários com must_change_password
+    (novos usuários e senhas redefinidas). O estado fica no usuário: o
+    middleware não lê nem grava a sessão, e fora do /admin/ nem carrega o
+    usuário.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        user = getattr(request, "user", None)
         path = request.path
+        if not path.startswith(ADMIN_PREFIX) or path.startswith(PASSWORD_CHANGE_PREFIX):
+            return self.get_response(request)
 
+        user = getattr(request, "user", None)
         if (
             user is not None
             and getattr(user, "is_authenticated", False)
-            and path.startswith(ADMIN_PREFIX)
+            and getattr(user, "must_change_password", False)
         ):
-            if path.startswith("/admin/password-change/"):
-                return self.get_response(request)
-
-            if request.session.get("force_pw_change_first_admin"):
-                request.session.pop("force_pw_change_first_admin", None)
-                params = urlencode({"next": request.get_full_path()})
-                return redirect(f"{reverse(PASSWORD_CHANGE_URLNAME)}?{params}")
-
-            if getattr(user, "must_change_password", False):
-                params = urlencode({"next": request.get_full_path()})
-                return redirect(f"{reverse(PASSWORD_CHANGE_URLNAME)}?{params}")
+            params = urlencode({"next": request.get_full_path()})
+            return redirect(f"{reverse(PASSWORD_CHANGE_URLNAME)}?{params}")
 
         return self.get_response(request)
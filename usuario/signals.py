@@ -1,13 +1,16 @@
-from django.contrib.auth.signals import user_logged_in
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
+from dados_comuns.cache import TAG_GRUPOS_USUARIO, invalidar_apos_commit
+
 User = get_user_model()
 
 
-@receiver(user_logged_in, dispatch_uid="mark_first_admin_login", weak=False)
-def mark_first_admin_login(sender, user, request, **kwargs):
-    # lê do banco o valor prévio
-    prev = User.objects.filter(pk=user.pk).values_list("last_login", flat=True).first()
-    if prev is None:
-        request.session["force_pw_change_first_admin"] = True
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalida_cache_grupos_usuario(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        invalidar_apos_commit(TAG_GRUPOS_USUARIO)
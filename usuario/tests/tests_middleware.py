@@ -1,4 +1,6 @@
-from django.test import TestCase, RequestFactory
+from django.db import connection
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.contrib.auth.middleware import AuthenticationMiddleware
 from django.contrib.sessions.middleware import SessionMiddleware
@@ -40,16 +42,27 @@ class ForcePasswordChangeMiddlewareTests(TestCase):
         self.assertEqual(resp.status_code, 302)
         self.assertIn("/admin/password-change/?next=%2Fadmin%2F", resp["Location"])
 
-    def test_redirects_when_session_flag_set(self):
+    def test_nao_acessa_a_sessao(self):
         u = User.objects.create_user(
-            username="joao", password="x", must_change_password=False
+            username="joao", password="x", must_change_password=True
         )
         req = get_request_with_user("/admin/", u)
-        req.session["force_pw_change_first_admin"] = True
-        req.session.save()
+        req.user.pk  # o AuthenticationMiddleware carrega o usuário da sessão
+        req.session.accessed = req.session.modified = False
         resp = self.get_mw()(req)
         self.assertEqual(resp.status_code, 302)
-        self.assertIn("/admin/password-change/?next=%2Fadmin%2F", resp["Location"])
+        self.assertFalse(req.session.accessed)
+        self.assertFalse(req.session.modified)
+
+    def test_fora_do_admin_nao_carrega_o_usuario(self):
+        u = User.objects.create_user(
+            username="api", password="x", must_change_password=True
+        )
+        req = get_request_with_user("/api/bens/", u)
+        req.session.accessed = False
+        resp = self.get_mw()(req)
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(req.session.accessed)
 
     def test_allows_when_ok(self):
         u = User.objects.create_user(
@@ -59,3 +72,25 @@ class ForcePasswordChangeMiddlewareTests(TestCase):
         resp = self.get_mw()(req)
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.content, b"OK")
+
+
+@override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+class ConsultasAutocompleteTests(TestCase):
+    def test_autocomplete_sem_consultas_de_sessao(self):
+        u = User.objects.create_user(
+            username="auto", password="x", is_staff=True, is_superuser=True,
+            must_change_password=False,
+        )
+        self.client.force_login(u)
+        url = (
+            "/admin/autocomplete/?app_label=bem_patrimonial"
+            "&model_name=bempatrimonial&field_name=unidade_administrativa&term=a"
+        )
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        sessao = [q["sql"] for q in consultas if "django_session" in q["sql"]]
+        self.assertEqual(sessao, [])
@@ -28,6 +28,7 @@ def setup_grupos_e_permissoes():
         "_bempatrimonial": ["add", "change", "delete", "view"],
         "_movimentacaobempatrimonial": ["add", "change", "delete", "view"],
         "_statusbempatrimonial": ["add", "change", "delete", "view"],
+        "_resumoinventariounidade": ["view"],
         "_usuario": ["add", "change", "view"],
         "_unidadeadministrativa": ["add", "change", "delete", "view"],
         # Módulo de Suporte desabilitado temporariamente
@@ -44,6 +45,7 @@ def setup_grupos_e_permissoes():
         "_bempatrimonial": ["add", "change", "delete", "view"],
         "_movimentacaobempatrimonial": ["add", "change", "view"],
         "_statusbempatrimonial": ["view"],
+        "_resumoinventariounidade": ["view"],
         "_unidadeadministrativa": ["view"],
         # Módulo de Suporte desabilitado temporariamente
         # '_agendamentosuporte': ['add', 'change', 'delete', 'view'],